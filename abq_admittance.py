@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# A program to compare the topography and gravity of whole families of models at
+# once, as a function of wavelength. Each model's surface profile (from the
+# plot_surface*.gmt.py .csv files) and gravity anomaly (from the .xy files) are
+# resampled onto a uniform grid and transformed - by FFT for flat models, or by
+# Legendre transform for curved ones - and the admittance (mGal/km) and
+# coherence between them are written out in wavelength bands.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+from math import pi
+import sys, os, glob, optparse
+import numpy as np
+import abq_legendre, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# File endings for the topography and gravity profiles of each model, and for
+# the files written here
+topo_suffix = "_surfacecoords.csv"
+grav_suffix = "_freeair.xy"
+admittance_suffix = "_admittance.xy"
+summary_filename = "admittance_summary.txt"
+
+# Is the model curved?
+curved_mode = False
+
+# For curved models, we'll need this:
+planet_radius = 1740e3 #m
+
+# Number of points in the uniform grid each profile is resampled onto
+num_points = 1024
+
+# Number of (logarithmically spaced) wavelength bands to report
+num_bands = 20
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def model_finder(paths):
+    """
+    Turns a list of directories and/or topography files into a sorted list of
+    model base names that have both a topography and a gravity profile
+    """
+
+    candidates = []
+    for path in paths:
+        if os.path.isdir(path):
+            candidates.extend(glob.glob(os.path.join(path, "*" + topo_suffix)))
+        else:
+            candidates.append(path)
+
+    basenames = []
+    for candidate in candidates:
+        if candidate.endswith(topo_suffix):
+            candidate = candidate[:-len(topo_suffix)]
+        if os.path.exists(candidate + topo_suffix) and \
+           os.path.exists(candidate + grav_suffix):
+            basenames.append(candidate)
+        elif verbose_mode:
+            print("Skipping %s (needs both %s and %s files)"%(candidate,
+                                                            topo_suffix,
+                                                            grav_suffix))
+    return sorted(set(basenames))
+
+
+def profile_resampler(basenames, grid):
+    """
+    Reads the topography (km) and gravity (mGal) profiles of every model and
+    resamples them all onto the same uniform grid of distances (km). Returns two
+    (models x points) arrays. Beyond the end of a profile, its last value is
+    carried on (i.e. the far field is taken to be flat).
+    """
+
+    topo = np.empty((len(basenames), len(grid)))
+    grav = np.empty((len(basenames), len(grid)))
+    for i, basename in enumerate(basenames):
+        for data, suffix in ((topo, topo_suffix), (grav, grav_suffix)):
+            profile = np.loadtxt(abq_fileio.open_input(basename + suffix), ndmin=2)
+            profile = profile[np.argsort(profile[:, 0])]
+            data[i] = np.interp(grid, profile[:, 0], profile[:, 1])
+    return topo, grav
+
+
+def fourier_spectra(topo, grav, spacing):
+    """
+    Transforms every (flat, radial) profile at once. Each profile is mirrored
+    about the axis of symmetry so that its transform is that of an even
+    function, with its mean removed. Returns the wavelengths (km) and the
+    (models x wavenumbers) spectra.
+    """
+
+    def mirror(data):
+        data = np.hstack((data[:, :0:-1], data))
+        return data - data.mean(axis=1)[:, None]
+
+    T = np.fft.rfft(mirror(topo), axis=1)
+    G = np.fft.rfft(mirror(grav), axis=1)
+    length = (2*topo.shape[1] - 1) * spacing
+    with np.errstate(divide="ignore"):
+        wavelengths = length / np.arange(T.shape[1])
+
+    return wavelengths, T, G
+
+
+def legendre_spectra(topo, grav, colatitudes, lmax):
+    """
+    Transforms every (curved) profile at once into zonal Legendre coefficients,
+        a_l = (2l+1)/2 integral of f(theta) P_l(cos theta) sin(theta) dtheta
+    Returns the equivalent wavelengths (km, 2 pi R / sqrt(l(l+1))) and the
+    (models x degrees) spectra.
+    """
+
+    P = abq_legendre.legendre_table(lmax, np.cos(colatitudes))
+    weights = np.sin(colatitudes) * np.gradient(colatitudes)
+    scale = (2*np.arange(lmax + 1) + 1) / 2.0
+
+    T = np.dot(topo * weights, P.T) * scale
+    G = np.dot(grav * weights, P.T) * scale
+    l = np.arange(lmax + 1)
+    with np.errstate(divide="ignore"):
+        wavelengths = 2*pi*planet_radius/1000.0 / np.sqrt(l*(l + 1))
+
+    return wavelengths, T, G
+
+
+def band_averager(wavelengths, T, G, num_bands):
+    """
+    Adds up cross- and auto-spectra in logarithmically spaced wavelength bands
+    (the same bands for every model), and returns the band centers (km) plus
+    (models x bands) arrays of admittance (mGal/km) and coherence
+    """
+
+    usable = np.isfinite(wavelengths) & (wavelengths > 0)
+    edges = np.logspace(np.log10(wavelengths[usable].min()),
+                        np.log10(wavelengths[usable].max()), num_bands + 1)
+    band = np.digitize(wavelengths, edges) - 1
+    band[~usable | (band < 0)] = num_bands
+    band = np.minimum(band, num_bands)
+
+    # Sum over each band for all models at once (the last band collects the
+    # wavelengths that aren't used)
+    def band_sum(values):
+        offsets = np.arange(values.shape[0])[:, None] * (num_bands + 1)
+        totals = np.bincount((band[None, :] + offsets).ravel(), values.ravel(),
+                             values.shape[0] * (num_bands + 1))
+        return totals.reshape(values.shape[0], num_bands + 1)[:, :num_bands]
+
+    cross = band_sum((G * np.conj(T)).real) + 1j*band_sum((G * np.conj(T)).imag)
+    topo_power = band_sum(np.abs(T)**2)
+    grav_power = band_sum(np.abs(G)**2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        admittance = cross.real / topo_power
+        coherence = np.abs(cross)**2 / (topo_power * grav_power)
+
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    return centers, admittance, coherence
+
+
+def admittance_analyzer(basenames):
+    """
+    Runs the whole analysis for a family of models, returning the band centers
+    and (models x bands) admittance and coherence
+    """
+
+    if curved_mode:
+        colatitudes = np.linspace(0.0, pi, num_points)
+        grid = colatitudes * planet_radius / 1000.0
+        topo, grav = profile_resampler(basenames, grid)
+        wavelengths, T, G = legendre_spectra(topo, grav, colatitudes,
+                                             num_points // 4)
+    else:
+        # Every model goes onto the same grid, out to the farthest any of
+        # them reaches
+        extent = max(np.loadtxt(abq_fileio.open_input(basename + suffix), ndmin=2)[:, 0].max()
+                     for basename in basenames
+                     for suffix in (topo_suffix, grav_suffix))
+        grid = np.linspace(0.0, extent, num_points)
+        topo, grav = profile_resampler(basenames, grid)
+        wavelengths, T, G = fourier_spectra(topo, grav, grid[1] - grid[0])
+
+    return band_averager(wavelengths, T, G, num_bands)
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] directory|foo_surfacecoords.csv [...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved",default=False,
+                      help="run for curved instead of flat models")
+    parser.add_option("-n",type="int",dest="num_points",default=None,
+                      help="number of points in the resampled profiles [%d]"%num_points)
+    parser.add_option("-b","--bands",type="int",dest="num_bands",default=None,
+                      help="number of wavelength bands [%d]"%num_bands)
+    parser.add_option("--grav_suffix",dest="grav_suffix",default=None,
+                      help="file ending of the gravity profiles [%s]"%grav_suffix)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.curved:
+        curved_mode = True
+    if options.num_points:
+        num_points = options.num_points
+    if options.num_bands:
+        num_bands = options.num_bands
+    if options.grav_suffix:
+        grav_suffix = options.grav_suffix
+
+    if len(args) < 1:
+        args = ["."]
+    basenames = model_finder(args)
+    if not basenames:
+        print("ERROR: No models with both topography and gravity profiles found")
+        sys.exit()
+
+    if verbose_mode:
+        print("Analyzing %d models..."%len(basenames))
+    centers, admittance, coherence = admittance_analyzer(basenames)
+
+    # One file per model...
+    for i, basename in enumerate(basenames):
+        outfile = open(basename + admittance_suffix, 'w')
+        for j in range(len(centers)):
+            if np.isfinite(admittance[i, j]):
+                outfile.write("%14f %14.6g %14.6f\n"%(centers[j],
+                                                     admittance[i, j],
+                                                     coherence[i, j]))
+        outfile.close()
+
+    # ...and one table with every model side by side
+    if verbose_mode:
+        print("Generating summary table %s..."%summary_filename)
+    outfile = open(summary_filename, 'w')
+    outfile.write("%-14s"%"Wavelength")
+    for basename in basenames:
+        outfile.write(" %-14s"%os.path.basename(basename)[:14])
+    outfile.write("\n")
+    for j in range(len(centers)):
+        outfile.write("%-14.2f"%centers[j])
+        for i in range(len(basenames)):
+            outfile.write(" %-14.6g"%admittance[i, j])
+        outfile.write("\n")
+    outfile.close()
@@ -9,6 +9,7 @@
 
 from __future__ import division
 import re, sys, optparse
+import abq_fileio
 # Note - I'm using the deprecated "optparse" instead of the newer "argparse"
 # because Taylor is running Python 2.6, and argparse wasn't introduced until
 # Python 2.7
@@ -26,6 +27,11 @@ gravity = 1.622 #m.s-2
 infile_tag = "_noload"
 outfile_tag = ""
 
+# Should gravity decrease with depth? If so, this is a list of load groups from
+# abq_radialgrav (each material split into radial bins, with its own load
+# magnitude) instead of None
+radial_groups = None
+
 # Print lots of stuff while running?
 verbose_mode = True
 
@@ -37,21 +43,30 @@ def inpfile_parser(infile,outfile):
     Goes through an Abaqus .inp file and inserts a new *Dload for gravity in a
     spherical reference frame, based on data it found earlier in the file.
     """
+    outfile.writelines(load_stage(infile))
+
+
+def load_stage(infilelines):
+    """
+    Goes through the lines of an Abaqus .inp file, handing back the lines of
+    the new file (with the gravity loads inserted) one at a time, so it can be
+    one stage of abq_builddeck's pipeline
+    """
 
-    # Read all of the data into a set
-    infilelines = infile.readlines()
+    # Radially-varying gravity writes its own sets and loads
+    if radial_groups:
+        import abq_radialgrav
 
     # Go through all of the lines, and take appropriate actions. There is some
     # bit-switching going on here, too, to keep track of what part of the .inp
-    # file we're looking at (in the read/write_* variables). The newlines
-    # variable holds a complete set of lines for a new output file, with added
-    # content inserted where appropriate into lines copied over one-by-one from
-    # the original input file.
+    # file we're looking at (in the read/write_* variables). Each line of the
+    # new file is handed back as soon as it's ready: lines copied over
+    # one-by-one from the original input file, with added content inserted
+    # where appropriate.
     read_dens = False       # Behavioral switch for reading densities
     write_load = False      # Behavioral switch for writing out load definitions
     material_densities = {} # Each material, and its density
     set_materials = {}      # Each set, and the material it's made of
-    newlines = ""
     for line in infilelines:
         # Always make a[Ma>n exact copy of the line we're on, because this is going
         # to go into the new file verbatim
@@ -67,17 +82,21 @@ def inpfile_parser(infile,outfile):
             # the coming section of the file (this_material)
             if line.upper().startswith("*INSTANCE"):
                 instance_name = line.split(",")[1].split("=")[-1]
-                newlines += line
+                yield line
+                continue
+            elif radial_groups and line.upper().startswith("*END PART"):
+                yield "".join(abq_radialgrav.elset_lines(radial_groups))
+                yield line
                 continue
             elif line.upper().startswith("*SOLID SECTION"):
                 this_set = line.split(",")[1].split("=")[-1]
                 this_set_material = line.split(",")[2].split("=")[-1].strip()
                 set_materials[this_set] = this_set_material
-                newlines += line
+                yield line
                 continue
             elif line.upper().startswith("*MATERIAL, NAME"):
                 this_material = line.split("=")[-1].strip()
-                newlines += line
+                yield line
                 continue
 
             # If it's a Density declaration, we set a flag so we know to do
@@ -85,7 +104,7 @@ def inpfile_parser(infile,outfile):
             elif line.upper().startswith("*DENSITY"):
                 read_dens  = True
                 write_load = False
-                newlines += line
+                yield line
                 continue
 
             # Here, we're going to look for this line, write out a bunch of crap
@@ -107,7 +126,7 @@ def inpfile_parser(infile,outfile):
         # Read in the density of each material
         if read_dens:
             material_densities[this_material] = eval(line)[0]
-            newlines += line
+            yield line
 
         # Write out the loads, using the sets, sections, and material densities
         elif write_load:
@@ -121,8 +140,8 @@ def inpfile_parser(infile,outfile):
                 set_densities[set] = material_densities[this_material]
 
             # Start writing out our load declarations, one for each density
-            newlines += "** LOADS\n"
-            newlines += "**\n"
+            yield "** LOADS\n"
+            yield "**\n"
 
             # Write out the loads using each unit's original density
             #for this_set in set_densities.keys():
@@ -131,30 +150,33 @@ def inpfile_parser(infile,outfile):
             #    # Write in a comment line to make sure this has gone correctly
             #    # Then the load definition: this is for curved models
             #    # Real density values
-            #    newlines += "**\n"
-            #    newlines += "** MATERIAL: %s, DENSITY: %f\n"%(this_set, this_density)
-            #    newlines += "*Dload\n"
-            #    newlines += "%s.%s, BRNU, %f\n"%(instance_name,
+            #    yield "**\n"
+            #    yield "** MATERIAL: %s, DENSITY: %f\n"%(this_set, this_density)
+            #    yield "*Dload\n"
+            #    yield "%s.%s, BRNU, %f\n"%(instance_name,
             #                                      this_set,
             #                                      this_density)
-            #    newlines += "%s.%s, BZNU, %f\n"%(instance_name,
+            #    yield "%s.%s, BZNU, %f\n"%(instance_name,
             #                                      this_set,
             #                                      this_density)
 
+            # Write out the loads with gravity varying with radius, one for
+            # each material and radial bin
+            if radial_groups:
+                yield "** with gravity varying with radius\n"
+                yield "".join(abq_radialgrav.dload_lines(radial_groups,
+                                                         instance_name))
+
             # Finish up the load section with a commented-out line, and then
             # add in the "** OUTPUT REQUESTS" marker that we're still
             # holding in "line"
-            newlines += "**\n"
-            newlines += line
+            yield "**\n"
+            yield line
 
         # If we're not in a keyword section, and nothing else is going on, then
         # just copy the current line over to the new set
         else:
-            newlines += line
-
-    # As the output of this function, write all of the lines we've just
-    # accumulated, including the copied-over ones, to the output file
-    outfile.write(newlines)
+            yield line
 
 
 
@@ -167,6 +189,10 @@ if __name__ == "__main__":
     parser.add_option("-v","--verbose",action="store_true",
                       dest="verbose",default=False,
                       help="print extra information while running")
+    parser.add_option("-r","--radialgrav",type="int",
+                      dest="radial_bins",default=None,
+                      help="write loads with gravity varying with radius, "
+                           "grouping elements into this many radial bins")
 
     # Run the parser, collecting the options and positional arguments
     (options,args) = parser.parse_args()
@@ -184,19 +210,35 @@ if __name__ == "__main__":
         print "ERROR: More than one file specified. Please specify only one .inp file."
         sys.exit()
     else:
-        infilename = args[0]
+        infilename = abq_fileio.plain_name(args[0])
 
     # Use that filename we grabbed above to open the inp file, and create and
     # open the output file we're going to write to
-    infile = open(infilename, 'r')
+    infile = abq_fileio.open_input(args[0])
     #outfilename = infilename.split(".")[0] + "_withgrav.inp"
     outfilename = re.sub(infile_tag,outfile_tag,infilename)
-    outfile = open(outfilename, 'w')
+    outfile = abq_fileio.open_output(outfilename)
 
     # Print out status about the files we're acting on
     if verbose_mode:
         print "Reading file %s..."%infilename
         print "Creating (or overwriting!) file %s..."%outfilename
 
+    # Work out the radially-varying gravity loads from the mesh and the
+    # densities in the .inp file
+    if options.radial_bins:
+        import abq_mesh, abq_radialgrav
+        if verbose_mode:
+            print "Using gravity varying with radius (%d bins)..."%options.radial_bins
+        try:
+            radial_groups = abq_radialgrav.radial_load_groups(
+                abq_mesh.mesh_loader(args[0]), None,
+                options.radial_bins)
+        except KeyError as error:
+            print "ERROR: %s"%error.args[0]
+            outfile.abort()
+            sys.exit()
+
     # Run the processor
     inpfile_parser(infile,outfile)
+    outfile.close()
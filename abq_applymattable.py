@@ -10,6 +10,7 @@
 
 from __future__ import division
 import sys, re, argparse
+import abq_fileio, abq_rheology
 
 __version__ = "2015.01.30"
 
@@ -39,6 +40,15 @@ grav_density = "final"
 geoid_mode = False
 forbidden_names = ["POOL", "CAP", "ANNULUS"]
 
+# Should gravity in the load definitions decrease with depth? If so, this is a
+# list of load groups from abq_radialgrav (each material split into radial bins,
+# with its own load magnitude) instead of None
+radial_groups = None
+
+# Which creep profile (from abq_rheology.py) fills in the viscosity dummy
+# variable?
+creep_profile = abq_rheology.default_profile
+
 
 
 ######## Main Program ##########################################################
@@ -91,14 +101,41 @@ def mattable_parser(mattable_file):
     return materials
 
 
+def density_finder(materials, which):
+    """
+    The density of each material, picking the "initial", "final" or "average"
+    one
+    """
+    densities = {}
+    for material_name in materials.keys():
+        if which == "final":
+            densities[material_name] = materials[material_name].densf
+        elif which == "average":
+            densities[material_name] = (materials[material_name].densi +
+                                        materials[material_name].densf)/2.0
+        elif which == "initial":
+            densities[material_name] = materials[material_name].densi
+    return densities
+
+
 def inpfile_processor(inpfile, materials, outfile):
     """
     Goes through an Abaqus .inp file and inserts material properties where
     needed
     """
+    outfile.writelines(mattable_stage(inpfile, materials))
+
+
+def mattable_stage(inpfilelines, materials):
+    """
+    Goes through the lines of an Abaqus .inp file, handing back the lines of
+    the new file (with material properties inserted where needed) one at a
+    time, so it can be one stage of abq_builddeck's pipeline
+    """
 
-    # Read all of the data into a set
-    inpfilelines = inpfile.readlines()
+    # Radially-varying gravity writes its own sets and loads
+    if radial_groups:
+        import abq_radialgrav
 
     # Go through the inp file. If we run into one of our dummy variables, make
     # the necessary change. Also, as we go through, we'll keep track of what
@@ -108,218 +145,46 @@ def inpfile_processor(inpfile, materials, outfile):
     #       42.42 for density
     #       0.00042 for thermal expansion
 
+    # Creep tables for every material in the table at once (the pressure
+    # at the top of each can matter), and any others as they come up
+    names = sorted(materials.keys())
+    creep_tables = abq_rheology.creep_tables(
+        names, [materials[name].depth for name in names],
+        [materials[name].densi for name in names],
+        abq_rheology.profiles[creep_profile])
+
     current_material = ""
     for line in inpfilelines:
 
+        # Radially-varying gravity needs its own element sets, one for each
+        # material and radial bin, defined inside the part
+        if radial_groups and line.upper().startswith("*END PART"):
+            for new_line in abq_radialgrav.elset_lines(radial_groups):
+                yield new_line
+            yield line
+            continue
+
         # Take note of any material definitions
         if line.upper().startswith("*MATERIAL"):
             current_material = line.split("=")[-1].strip()
-            outfile.write(line)
+            yield line
             continue
 
         # Viscosity dummy variable response
         if line.strip().upper().startswith("4.2E-42"):
 
-            # It's different for the crust vs. other regions:
-            # DEPRECATED
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-30,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-30,     1.0,    0.,  1200.\n")
-            #    outfile.write("    1.0e-30,     1.0,    0.,  1201.\n")
-            #    outfile.write("    1.0e-30,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-30,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-30,     1.0,    0.,  1200.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  1201.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  2000.\n")
-            #continue
-
-            # 3-viscosity setup (ori60km30Ka,b,c,NOT D,e,f
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-30,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-30,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-30,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-30,     1.0,    0.,  1100.\n")
-            #    outfile.write("    3.0e-26,     1.0,    0.,  1101.\n")
-            #    outfile.write("    3.0e-26,     1.0,    0.,  1300.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  1301.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  2000.\n")
-            #continue
-
-            # Viscosity setup with gradients: minimum 1e23
-            # FIRST USED 2013-05-17 in model ori60km30K
-            # Models: ... oriC02, oriC02b
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  1100.\n")
-            #    outfile.write("    1.0e-27,     1.0,    0.,  1101.\n")
-            #    outfile.write("    3.0e-26,     1.0,    0.,  1300.\n")
-            #    outfile.write("    1.0e-24,     1.0,    0.,  1350.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  1351.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  2000.\n")
-            #continue
-
-            # Mantle & melt: gradients with a minimum of 1e24 Pa.s
-            # Crust: Elastic crust
-            # Models: oriC02c, oriC03a, oriC04/a/b/c/d/e/f/g, oriC05/a,
-            # oriC09b_*_gradientvisco
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  1100.\n")
-            #    outfile.write("    1.0e-27,     1.0,    0.,  1101.\n")
-            #    outfile.write("    3.0e-26,     1.0,    0.,  1300.\n")
-            #    outfile.write("    1.0e-24,     1.0,    0.,  1350.\n")
-            #    outfile.write("    1.0e-24,     1.0,    0.,  2000.\n")
-            #continue
-
-            # Mantle & melt: gradients with a minimum of 1e22 Pa.s
-            # Crust: Elastic crust
-            # Models: oriC04i/j
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  1100.\n")
-            #    outfile.write("    1.0e-27,     1.0,    0.,  1101.\n")
-            #    outfile.write("    3.0e-26,     1.0,    0.,  1300.\n")
-            #    outfile.write("    1.0e-22,     1.0,    0.,  1350.\n")
-            #    outfile.write("    1.0e-22,     1.0,    0.,  2000.\n")
-            #continue
-
-            # Mantle & melt: new-style single-rollover structure, with the
-            #                rollover point = 1250 K
-            # Crust: Elastic crust
-            # Models: oriC05b
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  1250.\n")
-            #    outfile.write("    1.0e-22,     1.0,    0.,  1251.\n")
-            #    outfile.write("    1.0e-22,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle & melt: new-style single-rollover structure, with the
-            ##                rollover point = 1100 K
-            ## Crust: Elastic crust
-            ## Models: oriC05c, oriC06-09
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  1100.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  1101.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle & melt: new-style single-rollover structure, with the
-            ##                rollover point = 1300 K
-            ## Crust: Elastic crust
-            ## Models: oriC05c
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  1300.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  1301.\n")
-            #    outfile.write("    1.0e-23,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle & melt: new-style single-rollover structure, with the
-            ##                rollover region from 1075-1125 K
-            ## Crust: Elastic crust
-            ## Models: oriC09c_visco_ps7_1e26Pas, oriF01a-c
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    1.0e-40,     1.0,    0.,     0.\n")
-            #    outfile.write("    1.0e-40,     1.0,    0.,  2000.\n")
-            #else:
-            #    outfile.write("    2.5e-41,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-41,     1.0,    0.,  1075.\n")
-            #    outfile.write("    2.5e-27,     1.0,    0.,  1125.\n")
-            #    outfile.write("    2.5e-27,     1.0,    0.,  3000.\n")
-            #continue
-
-            ## Mantle & melt: 2 layers at 1e30 and 1e22 plus transition
-            ##                zone; minimum viscosity at > 1280 K;
-            ##                transition from 1101-1280 K
-            ## Crust: Elastic crust
-            ## Models: oriF01d
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    2.5e-41,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-40,     1.0,    0.,  9999.\n")
-            #else:
-            #    outfile.write("    2.5e-31,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-31,     1.0,    0.,  1100.\n")
-            #    outfile.write("    2.5e-23,     1.0,    0.,  1280.\n")
-            #    outfile.write("    2.5e-23,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle & melt: 2 layers at 1e30 and 1e22 plus transition
-            ##                zone; minimum viscosity at > 1250 K;
-            ##                transition from 1100-1250 K
-            ## Crust: Elastic crust
-            ## Models: oriF01j, oriF02a, oriF03a
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    2.5e-41,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-40,     1.0,    0.,  9999.\n")
-            #else:
-            #    outfile.write("    2.5e-31,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-31,     1.0,    0.,  1100.\n")
-            #    outfile.write("    2.5e-23,     1.0,    0.,  1250.\n")
-            #    outfile.write("    2.5e-23,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle & melt: 2 layers at 1e30 and 1e22 plus transition
-            ##                zone; minimum viscosity at > 1250 K;
-            ##                transition from 1100-1250 K
-            ## Crust: Elastic crust
-            ## Models: oriF03b, oriF03d
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    2.5e-41,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-40,     1.0,    0.,  9999.\n")
-            #else:
-            #    outfile.write("    2.5e-31,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-31,     1.0,    0.,  1100.\n")
-            #    outfile.write("    2.5e-24,     1.0,    0.,  1250.\n")
-            #    outfile.write("    2.5e-24,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle & melt: 2 layers at 1e30 and 1e22 plus transition
-            ##                zone; minimum viscosity at > 1250 K;
-            ##                transition from 1100-1250 K
-            ## Crust: Elastic crust
-            ## Models: oriF03c, oriF03e, oriF04a, oriF04b, oriF05a/b/c,
-            ##         oriC10a
-            #if "CRUST" in current_material.upper():
-            #    outfile.write("    2.5e-41,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-40,     1.0,    0.,  9999.\n")
-            #else:
-            #    outfile.write("    2.5e-31,     1.0,    0.,     0.\n")
-            #    outfile.write("    2.5e-31,     1.0,    0.,  1100.\n")
-            #    outfile.write("    2.5e-25,     1.0,    0.,  1250.\n")
-            #    outfile.write("    2.5e-25,     1.0,    0.,  9999.\n")
-            #continue
-
-            ## Mantle, melt, and crust: 2 layers at 1e30 and 1e24 plus
-            ##      transition zone; minimum viscosity at > 800 K;
-            ##      transition from 700-800 K
-            ## Models: oriC11i, oriC11j, oriC12*
-            if True:
-                outfile.write("    2.5e-31,     1.0,    0.,     0.\n")
-                outfile.write("    2.5e-31,     1.0,    0.,   700.\n")
-                outfile.write("    2.5e-25,     1.0,    0.,   800.\n")
-                outfile.write("    2.5e-25,     1.0,    0.,  9999.\n")
+            # The creep table comes from the chosen profile (see
+            # abq_rheology.py for them all, and the models they were used in)
+            if current_material not in creep_tables:
+                creep_tables.update(abq_rheology.creep_tables(
+                    [current_material], [0.0], [0.0],
+                    abq_rheology.profiles[creep_profile]))
+            if current_material not in creep_tables:
+                yield line
+                continue
+            for new_line in abq_rheology.creep_lines(
+                    creep_tables[current_material]):
+                yield new_line
             continue
 
         # Material density assignment. Check for a density dummy variable, and
@@ -337,13 +202,13 @@ def inpfile_processor(inpfile, materials, outfile):
                 this_density = (materials[current_material].densi +
                                materials[current_material].densf ) / 2.0
 
-            outfile.write("    %f,\n"%this_density)
+            yield "    %f,\n"%this_density
             continue
 
         # Expansion dummy variable response
         if line.strip().startswith("0.00042"):
             this_alpha_l = materials[current_material].alpha_l
-            outfile.write("    %.12f,\n"%this_alpha_l)
+            yield "    %.12f,\n"%this_alpha_l
             continue
 
         # Load section; fill in loads for each material, with the correct
@@ -366,32 +231,39 @@ def inpfile_processor(inpfile, materials, outfile):
                                for forbidden_name in forbidden_names):
                             continue
 
-                    outfile.write("** Name: %s_grav  Type: Body force\n"%material_name)
+                    yield "** Name: %s_grav  Type: Body force\n"%material_name
 
                     # Gravity based on final density (best results)
                     if grav_density == "final":
                         this_density = materials[material_name].densf
-                        outfile.write("** using material's final density for Fg\n")
+                        yield "** using material's final density for Fg\n"
                     # Gravity based on average density
                     elif grav_density == "average":
                         this_density = (materials[material_name].densi +
                                         materials[material_name].densf)/2.0
-                        outfile.write("** using material's average density for Fg\n")
+                        yield "** using material's average density for Fg\n"
                     # Gravity based on initial density
                     elif grav_density == "initial":
                         this_density = materials[material_name].densi
-                        outfile.write("** using material's initial density for Fg\n")
-
-                    # Write the load
-                    outfile.write("*Dload\n")
-                    outfile.write("%s.%s, BRNU, %f\n"%(assembly_name, material_name,
-                                               this_density))
-                    outfile.write("%s.%s, BZNU, %f\n"%(assembly_name, material_name,
-                                               this_density))
-            outfile.write(line)
+                        yield "** using material's initial density for Fg\n"
+
+                    # Write the load, either with gravity varying with radius
+                    # (one load per radial bin) or constant
+                    if radial_groups:
+                        yield "** with gravity varying with radius\n"
+                        for new_line in abq_radialgrav.dload_lines(
+                                radial_groups, assembly_name, material_name):
+                            yield new_line
+                        continue
+                    yield "*Dload\n"
+                    yield "%s.%s, BRNU, %f\n"%(assembly_name, material_name,
+                                              this_density)
+                    yield "%s.%s, BZNU, %f\n"%(assembly_name, material_name,
+                                              this_density)
+            yield line
 
         else:
-            outfile.write(line)
+            yield line
 
 
 ######## Command-line Implementation############################################
@@ -424,6 +296,12 @@ if __name__ == "__main__":
         help = "Write load definitions as well as material properties " +\
                "(necessary for curved models)")
 
+    # Add a parser argument for making gravity decrease with depth, using the
+    # model's own mass distribution
+    parser.add_argument("--radialgrav", metavar = "NBINS", type = int,
+        help = "Write loads with gravity varying with radius, grouping " +\
+               "elements into NBINS radial bins (curved models only)")
+
     # Add a parser argument for doing this to geoid files, which automatically
     # omits non-applicable materials
     parser.add_argument("--geoid",
@@ -431,6 +309,11 @@ if __name__ == "__main__":
         help = "Run in geoid mode, ommitting melt pool, crustal cap, and "+\
                "mantle annulus units")
 
+    # Add a parser argument for picking the creep profile
+    parser.add_argument("--creep", metavar = "PROFILE",
+        help = "Fill in viscosities from this creep profile " +\
+               "(see abq_rheology.py -l) [%s]"%creep_profile)
+
     # Run the parser
     #(options, args) = parser.parse_args()
     args = parser.parse_args()
@@ -465,6 +348,17 @@ if __name__ == "__main__":
         print "Writing LOAD definitions as well as material properties..."
         write_loads = True
 
+    # Check for a creep profile
+    if args.creep:
+        if args.creep not in abq_rheology.profiles:
+            print "ERROR: No creep profile %s (see abq_rheology.py -l)"%args.creep
+            sys.exit()
+        creep_profile = args.creep
+    if abq_rheology.np is None and \
+       abq_rheology.needs_numpy(abq_rheology.profiles[creep_profile]):
+        print "ERROR: Creep profile %s has Arrhenius laws, which need numpy"%creep_profile
+        sys.exit()
+
     # Check for geoid mode
     if args.geoid:
         print "Running in geoid model mode..."
@@ -478,10 +372,10 @@ if __name__ == "__main__":
     #out_file = open(out_filename,'w')
 
     ## Open the files that correspond to the input and material file names given
-    out_filename = re.sub(inp_tag,out_tag,args.inp_filename)
-    inp_file = open(inp_filename,'r')
-    mattable_file = open(args.mattable_filename,'r')
-    out_file = open(out_filename,'w')
+    out_filename = re.sub(inp_tag,out_tag,abq_fileio.plain_name(args.inp_filename))
+    inp_file = abq_fileio.open_input(inp_filename)
+    mattable_file = abq_fileio.open_input(args.mattable_filename)
+    out_file = abq_fileio.open_output(out_filename)
 
     # Print out some info about what's going on
     print "Reading files %s and %s..."%(inp_filename,mattable_filename)
@@ -495,5 +389,20 @@ if __name__ == "__main__":
     #for material in materials:
      #print material.name
 
+    # Work out the radially-varying gravity loads from the mesh and the
+    # densities the loads are going to use
+    if args.radialgrav:
+        import abq_mesh, abq_radialgrav
+        print "Writing loads with gravity varying with radius (%d bins)..."%args.radialgrav
+        try:
+            radial_groups = abq_radialgrav.radial_load_groups(
+                abq_mesh.mesh_loader(inp_filename),
+                density_finder(materials, grav_density), args.radialgrav)
+        except KeyError as error:
+            print "ERROR: %s"%error.args[0]
+            out_file.abort()
+            sys.exit()
+
     # Create the new input file
     inpfile_processor(inp_file, materials, out_file)
+    out_file.close()
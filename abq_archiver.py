@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# A program to pack up the files from Abaqus runs into archives that single files
+# can be pulled back out of quickly. Each file is compressed on its own (using
+# all the cores on the machine at once), and an index of where every file is
+# goes at the end of the archive, so reading one file back only means reading
+# the index and that file's bytes - not decompressing the whole archive, like
+# with a .tar.gz. Nothing is deleted until every file in the new archive has
+# been read back and checked against the original.
+#
+# Archive layout:
+#   "ABQZ0001"  |  compressed files, one after another  |  compressed index
+#   (JSON: name, offset, length, size, sha1, mtime for every file)  |  footer
+#   (index offset and length, as 8-byte little-endian integers, then
+#   "ABQZ0001" again)
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, glob, json, zlib, struct, hashlib, optparse, multiprocessing
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# What goes into which archive, and what gets deleted afterwards (the same
+# groups abq_file_archiver.sh has always used)
+archive_groups = (
+    ("runfiles.abqz", ("com", "dat", "log", "msg", "sim", "sta"),
+                      ("ipm", "lck")),
+    ("grav_anomaly_files.abqz", ("xy", "csv", "grav"), ()),
+)
+
+# zlib compression level (1 is fastest, 9 is smallest)
+compression_level = 6
+
+# How much of a file to read, compress or check at once
+chunk_size = 1 << 22
+
+# Number of processes compressing files at once
+num_processes = multiprocessing.cpu_count()
+
+# Delete the original files once they've been archived and checked?
+delete_mode = False
+
+# Print out extra text while running?
+verbose_mode = True
+
+# Marks the start and end of every archive
+magic = b"ABQZ0001"
+footer_format = "<QQ8s"
+
+
+######## Main Program ##########################################################
+
+def file_chunks(filename):
+    """
+    Reads a file a chunk at a time (as bytes)
+    """
+    infile = open(filename, 'rb')
+    try:
+        while True:
+            data = infile.read(chunk_size)
+            if not data:
+                break
+            yield data
+    finally:
+        infile.close()
+
+
+def member_compressor(names):
+    """
+    Compresses one file into a temporary file of its own, a chunk at a time,
+    so that no file (.sim files can be many GB) is ever held in memory whole.
+    Takes (file name, temporary file name), and returns the file's index
+    entry (without an offset yet).
+    """
+
+    filename, tempname = names
+    compressor = zlib.compressobj(compression_level)
+    checksum = hashlib.sha1()
+    size = 0
+    outfile = open(tempname, 'wb')
+    try:
+        for data in file_chunks(filename):
+            size += len(data)
+            checksum.update(data)
+            outfile.write(compressor.compress(data))
+        outfile.write(compressor.flush())
+    finally:
+        outfile.close()
+    return {"name": os.path.basename(filename), "size": size,
+            "length": os.path.getsize(tempname), "sha1": checksum.hexdigest(),
+            "mtime": os.path.getmtime(filename)}
+
+
+def archive_writer(archivename, filenames):
+    """
+    Compresses a list of files in parallel and writes them into a new archive
+    (to a temporary file, which is renamed once it's complete). Returns the
+    index.
+    """
+
+    tempname = archivename + ".tmp"
+    membernames = ["%s.%d.tmp"%(archivename, i) for i in range(len(filenames))]
+    outfile = open(tempname, 'wb')
+    outfile.write(magic)
+
+    index = []
+    pool = multiprocessing.Pool(max(1, num_processes))
+    try:
+        # imap hands the files back in order as they're done, so they can be
+        # copied in while the rest are still compressing
+        for entry, membername in zip(pool.imap(member_compressor,
+                                               zip(filenames, membernames)),
+                                     membernames):
+            entry["offset"] = outfile.tell()
+            for data in file_chunks(membername):
+                outfile.write(data)
+            os.remove(membername)
+            index.append(entry)
+    finally:
+        pool.close()
+        pool.join()
+        for membername in membernames:
+            if os.path.exists(membername):
+                os.remove(membername)
+
+    index_offset = outfile.tell()
+    index_bytes = zlib.compress(json.dumps(index).encode("utf-8"))
+    outfile.write(index_bytes)
+    outfile.write(struct.pack(footer_format, index_offset, len(index_bytes), magic))
+    outfile.close()
+    os.rename(tempname, archivename)
+
+    return index
+
+
+def index_reader(archivefile):
+    """
+    Reads the index from the end of an open archive, as a dictionary of index
+    entries by file name
+    """
+
+    footer_size = struct.calcsize(footer_format)
+    archivefile.seek(-footer_size, os.SEEK_END)
+    index_offset, index_length, footer_magic = struct.unpack(
+        footer_format, archivefile.read(footer_size))
+    if footer_magic != magic:
+        raise ValueError("%s is not an archive made by abq_archiver"%archivefile.name)
+    archivefile.seek(index_offset)
+    index = json.loads(zlib.decompress(archivefile.read(index_length)).decode("utf-8"))
+    return dict((entry["name"], entry) for entry in index)
+
+
+def member_reader(archivename, name):
+    """
+    Reads one file back out of an archive, checking it against its checksum,
+    and returns its contents (as bytes)
+    """
+
+    archivefile = open(archivename, 'rb')
+    index = index_reader(archivefile)
+    if name not in index:
+        raise KeyError("%s is not in %s"%(name, archivename))
+    entry = index[name]
+    archivefile.seek(entry["offset"])
+    data = zlib.decompress(archivefile.read(entry["length"]))
+    archivefile.close()
+    if hashlib.sha1(data).hexdigest() != entry["sha1"]:
+        raise ValueError("%s in %s is corrupted"%(name, archivename))
+    return data
+
+
+def member_chunks(archivename, name, chunk_size=1 << 20):
+    """
+    Reads one file back out of an archive a piece at a time (as bytes), so big
+    files never have to be held in memory all at once. The checksum is checked
+    at the end.
+    """
+
+    archivefile = open(archivename, 'rb')
+    try:
+        index = index_reader(archivefile)
+        if name not in index:
+            raise KeyError("%s is not in %s"%(name, archivename))
+        entry = index[name]
+        archivefile.seek(entry["offset"])
+        decompressor = zlib.decompressobj()
+        checksum = hashlib.sha1()
+        remaining = entry["length"]
+        while remaining > 0:
+            data = decompressor.decompress(archivefile.read(min(chunk_size, remaining)))
+            remaining -= min(chunk_size, remaining)
+            checksum.update(data)
+            yield data
+        data = decompressor.flush()
+        checksum.update(data)
+        yield data
+    finally:
+        archivefile.close()
+    if checksum.hexdigest() != entry["sha1"]:
+        raise ValueError("%s in %s is corrupted"%(name, archivename))
+
+
+def archive_verifier(archivename, filenames):
+    """
+    Reads every file back out of an archive and checks that it matches both its
+    checksum and the original file on disk, a chunk at a time. Returns a list
+    of the files that don't.
+    """
+
+    archivefile = open(archivename, 'rb')
+    index = index_reader(archivefile)
+    archivefile.close()
+    bad = []
+    for filename in filenames:
+        name = os.path.basename(filename)
+        if name not in index:
+            bad.append(filename)
+            continue
+        original = hashlib.sha1()
+        for data in file_chunks(filename):
+            original.update(data)
+        try:
+            for data in member_chunks(archivename, name, chunk_size):
+                pass
+        except (ValueError, zlib.error):
+            bad.append(filename)
+            continue
+        if original.hexdigest() != index[name]["sha1"]:
+            bad.append(filename)
+    return bad
+
+
+def run_archiver(dirname="."):
+    """
+    Archives the files of a run directory in their groups, deleting the
+    originals (and leftovers like .ipm and .lck files) only if every archived
+    file checks out
+    """
+
+    for archivename, suffixes, extra_suffixes in archive_groups:
+        archivename = os.path.join(dirname, archivename)
+        filenames = sorted(filename for suffix in suffixes
+                           for filename in glob.glob(os.path.join(dirname, "*." + suffix)))
+        if not filenames:
+            continue
+        if os.path.exists(archivename):
+            print("ERROR: %s already exists, skipping"%archivename)
+            continue
+
+        if verbose_mode:
+            print("Archiving %d files (%s) into %s..."%(len(filenames),
+                                                       ", ".join(suffixes),
+                                                       archivename))
+        index = archive_writer(archivename, filenames)
+        bad = archive_verifier(archivename, filenames)
+        if bad:
+            print("ERROR: %d files didn't archive correctly (e.g. %s); "
+                  "nothing deleted"%(len(bad), bad[0]))
+            continue
+        if verbose_mode:
+            total = sum(entry["size"] for entry in index)
+            print("    %d bytes -> %d bytes, all checked"%(
+                total, os.path.getsize(archivename)))
+
+        if delete_mode:
+            if verbose_mode:
+                print("Deleting un-archived copies...")
+            for filename in filenames + [filename for suffix in extra_suffixes
+                                         for filename in glob.glob(
+                                             os.path.join(dirname, "*." + suffix))]:
+                os.remove(filename)
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] [run_directory ...]\n" \
+            "       %prog -l archive.abqz [...]\n" \
+            "       %prog -x member archive.abqz [...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-d","--delete",action="store_true",
+                      dest="delete",default=False,
+                      help="delete the originals once they're archived and checked")
+    parser.add_option("-j","--processes",type="int",dest="processes",default=None,
+                      help="number of processes compressing at once [%d]"%num_processes)
+    parser.add_option("-l","--list",action="store_true",
+                      dest="list",default=False,
+                      help="list what's in archives")
+    parser.add_option("-x","--extract",dest="extract",default=None,
+                      help="pull this file out of each archive given")
+    parser.add_option("-o","--outdir",dest="outdir",default=None,
+                      help="write extracted files into this directory, named "
+                           "after their archive's directory (default: write "
+                           "to the screen)")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.delete:
+        delete_mode = True
+    if options.processes:
+        num_processes = options.processes
+
+    # Looking inside archives
+    if options.list:
+        for archivename in args:
+            for name, entry in sorted(index_reader(open(archivename, 'rb')).items()):
+                print("%-40s %12d %12d"%(os.path.join(archivename, name),
+                                        entry["size"], entry["length"]))
+        sys.exit()
+    if options.extract:
+        for archivename in args:
+            if options.outdir:
+                runname = os.path.basename(os.path.dirname(os.path.abspath(archivename)))
+                outfile = open(os.path.join(options.outdir, "%s_%s"%(
+                    runname, options.extract)), 'wb')
+            else:
+                outfile = getattr(sys.stdout, "buffer", sys.stdout)
+            for data in member_chunks(archivename, options.extract, chunk_size):
+                outfile.write(data)
+            if options.outdir:
+                outfile.close()
+        sys.exit()
+
+    # Archiving run directories
+    if len(args) < 1:
+        args = ["."]
+    for dirname in args:
+        run_archiver(dirname)
@@ -11,3 +11,7 @@ done
 
 #This will hang if you have other files with the same name, while it waits for
 #you to enter Y or N for overwriting those files, so be careful
+
+#To run several jobs at once, each in its own scratch directory (so nothing
+#needs overwriting), use abq_scheduler.py instead, or abq_dispatch.py to send
+#them to a cluster
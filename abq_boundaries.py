@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# A program to find the free surface and the Moho of a model straight from its
+# .inp file, instead of exporting them from CAE by hand: the surface is made of
+# the element faces with no neighbour that face upwards (or outwards, in curved
+# models), and the Moho of the faces shared by a crust element and a mantle
+# element. The nodes along each are written out as .rpt files in the same form
+# as CAE's (foo.SURFACErpt and foo.MOHOrpt), ready for
+# plot_crustalthickness.gmt.py, e.g.
+#   abq_boundaries.py -c foo.inp foo.Urpt
+# where the optional report of nodal displacements gives the deformed
+# boundaries instead of the original ones.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, optparse
+import numpy as np
+import abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Which materials are crust and which are mantle (by the start of their names)
+crust_prefixes = ("CRUST",)
+mantle_prefixes = ("MANTLE",)
+
+# Is the model curved? (Curved models' boundaries are written as radius and
+# angle from the axis, in radians; flat ones as x and y.)
+curved_mode = False
+
+# How close to straight up (or straight out) a face without a neighbour has to
+# face to be part of the surface, as the cosine of the angle
+surface_tolerance = 0.5
+
+# File endings for the output files
+moho_suffix = ".MOHOrpt"
+surface_suffix = ".SURFACErpt"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+# The corners (in the order abq_mesh gives them) of each face of an element:
+# the edges of a quadrilateral, or the faces of a hexahedron
+face_corners = {2: [[0, 1], [1, 2], [2, 3], [3, 0]],
+                3: [[0, 3, 2, 1], [4, 5, 6, 7], [0, 1, 5, 4],
+                    [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]]}
+
+
+def face_finder(mesh):
+    """
+    Finds every face in a mesh, and which elements share it, all at once: the
+    faces of every element are put into a table with their (sorted) nodes as
+    the key, and np.unique matches up the ones that are the same. Faces that
+    have collapsed (in triangles, tetrahedra and wedges) are left out. Returns
+    (faces as node rows, element rows on each side (-1 where there's no
+    neighbour), element labels, element connectivity).
+    """
+
+    labels, types, conn = mesh.elements()
+    dimensions = mesh.coords.shape[1]
+    corners = np.array(face_corners[dimensions])
+    num_faces = len(corners)
+
+    # Every face of every element, as (elements x faces) rows of node rows
+    faces = conn[:, corners].reshape(-1, corners.shape[1])
+    owners = np.repeat(np.arange(len(labels)), num_faces)
+
+    # Keys: the distinct nodes of each face, sorted, with repeats blanked out
+    keys = np.sort(faces, axis=1)
+    repeats = np.zeros(keys.shape, dtype=bool)
+    repeats[:, 1:] = keys[:, 1:] == keys[:, :-1]
+    keys[repeats] = -1
+    keys = np.sort(keys, axis=1)
+    real = (keys >= 0).sum(axis=1) >= dimensions
+    faces, owners, keys = faces[real], owners[real], keys[real]
+
+    # Match up faces with the same key
+    unique_keys, where, counts = np.unique(keys, axis=0, return_inverse=True,
+                                           return_counts=True)
+    where = where.ravel()
+    order = np.argsort(where, kind="mergesort")
+    first = np.searchsorted(where[order], np.arange(len(unique_keys)))
+    sides = np.empty((len(unique_keys), 2), dtype=int)
+    sides.fill(-1)
+    sides[:, 0] = owners[order[first]]
+    shared = counts == 2
+    sides[shared, 1] = owners[order[first[shared] + 1]]
+
+    return faces[order[first]], sides, labels, conn
+
+
+def element_materials(mesh, labels):
+    """
+    The material (upper case) of each element, from the section assignments
+    ("" for elements without a section)
+    """
+    materials = np.empty(len(labels), dtype=object)
+    materials.fill("")
+    row_of = abq_mesh.id_mapper(labels)
+    for this_set, this_material in mesh.sections.items():
+        if this_set in mesh.elsets:
+            materials[row_of(mesh.elsets[this_set])] = this_material.upper()
+    return materials
+
+
+def boundary_finder(mesh):
+    """
+    Picks out the faces on the surface and on the Moho. Returns the node rows
+    of each, as (surface nodes, Moho nodes).
+    """
+
+    faces, sides, labels, conn = face_finder(mesh)
+    dimensions = mesh.coords.shape[1]
+
+    # The Moho: faces between a crust element and a mantle element
+    materials = element_materials(mesh, labels)
+    is_crust = np.array([material.startswith(crust_prefixes) for material in materials])
+    is_mantle = np.array([material.startswith(mantle_prefixes) for material in materials])
+    shared = sides[:, 1] >= 0
+    moho = shared.copy()
+    moho[shared] = (is_crust[sides[shared, 0]] & is_mantle[sides[shared, 1]]) | \
+                   (is_mantle[sides[shared, 0]] & is_crust[sides[shared, 1]])
+
+    # The surface: faces without a neighbour whose outward normal points up
+    # (or out from the centre of a curved model)
+    outer = np.nonzero(~shared)[0]
+    points = mesh.coords[faces[outer]]
+    middles = points.mean(axis=1)
+    if dimensions == 2:
+        edges = points[:, 1] - points[:, 0]
+        normals = np.column_stack((edges[:, 1], -edges[:, 0]))
+    else:
+        normals = np.cross(points[:, 2] - points[:, 0], points[:, 3] - points[:, 1])
+    centroids = mesh.coords[conn[sides[outer, 0]]].mean(axis=1)
+    normals *= np.sign((normals*(middles - centroids)).sum(axis=1))[:, None]
+    normals /= np.sqrt((normals**2).sum(axis=1))[:, None]
+    if curved_mode:
+        up = middles / np.sqrt((middles**2).sum(axis=1))[:, None]
+    else:
+        up = np.zeros(middles.shape)
+        up[:, -1] = 1.0
+    surface = outer[(normals*up).sum(axis=1) > surface_tolerance]
+
+    return np.unique(faces[surface]), np.unique(faces[moho])
+
+
+def rptfile_writer(rptfile, mesh, rows, coords, sourcename):
+    """
+    Writes the nodes along a boundary as a CAE-style report: node label, then
+    x and y (and z), or radius and angle from the axis for curved models -
+    sorted along the boundary
+    """
+
+    points = coords[rows]
+    if curved_mode:
+        radius = np.sqrt((points**2).sum(axis=1))
+        angle = np.arctan2(np.sqrt((points[:, :-1]**2).sum(axis=1)), points[:, -1])
+        values = np.column_stack((radius, angle))
+        names = ["COORD.COOR1", "COORD.COOR2"]
+    else:
+        values = points
+        names = ["COORD.COOR%d"%(i + 1) for i in range(points.shape[1])]
+    if curved_mode:
+        order = np.argsort(values[:, 1], kind="mergesort")
+    else:
+        order = np.lexsort(values.T[::-1])
+
+    rptfile.write("*" * 80 + "\n")
+    rptfile.write("Field Output Report, written by abq_boundaries.py from %s\n"%sourcename)
+    rptfile.write("\n")
+    rptfile.write("%16s"%"Node Label" + "".join("%20s"%name for name in names) + "\n")
+    rptfile.write("-" * (16 + 20*len(names)) + "\n")
+    labels = mesh.node_ids[rows]
+    for i in order:
+        rptfile.write("%16d"%labels[i] + "".join("%20.10E"%value for value in values[i]) + "\n")
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp [foo.Urpt]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved",default=False,
+                      help="the model is curved (write radius and angle)")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.curved:
+        curved_mode = True
+
+    # Process positional arguments: the .inp file, and maybe a report of
+    # nodal displacements for the deformed state
+    if len(args) not in (1, 2):
+        print("ERROR: Please specify a .inp file and (optionally) a displacement .rpt file")
+        sys.exit()
+    inpfilename = args[0]
+    urptfilename = args[1] if len(args) > 1 else None
+
+    if verbose_mode:
+        print("Reading file %s..."%inpfilename)
+    mesh = abq_mesh.mesh_loader(inpfilename)
+    surface_rows, moho_rows = boundary_finder(mesh)
+    if verbose_mode:
+        print("Found %d surface nodes and %d Moho nodes"%(len(surface_rows),
+                                                          len(moho_rows)))
+
+    # Move the nodes to where they ended up, if there's a displacement report
+    coords = np.array(mesh.coords, dtype=float)
+    if urptfilename:
+        import abq_ringgrav
+        if verbose_mode:
+            print("Reading file %s..."%urptfilename)
+        node_labels, displacements = abq_ringgrav.rptfile_parser_displacements(
+            abq_fileio.open_input(urptfilename), coords.shape[1])
+        try:
+            coords[mesh.node_rows()(node_labels)] += displacements
+        except KeyError as error:
+            print("ERROR: %s doesn't match %s: %s"%(urptfilename, inpfilename,
+                                                    error.args[0]))
+            sys.exit()
+
+    # The output names follow the displacement report if there is one
+    basename = os.path.splitext(abq_fileio.plain_name(urptfilename or inpfilename))[0]
+    for suffix, rows in ((surface_suffix, surface_rows), (moho_suffix, moho_rows)):
+        if verbose_mode:
+            print("Writing file %s..."%(basename + suffix))
+        with abq_fileio.open_output(basename + suffix) as rptfile:
+            rptfile_writer(rptfile, mesh, rows, coords, abq_fileio.plain_name(
+                urptfilename or inpfilename))
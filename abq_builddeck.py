@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# A program to build a run deck in one go: the material table, gravity loads
+# and prestress are put into the .inp file in a single pass, instead of
+# abq_applymattable.py, abq_applyloads.py and abq_prestress.py each reading and
+# writing the whole deck in turn. Each of those steps is a "stage" - a function
+# that takes the lines of the deck and hands back the lines of the new one -
+# and the stages are chained together, so every line goes through all of them
+# on its way from the input file to the output file, e.g.
+#   abq_builddeck.py -m foo.mattable -r foo_ps0.rpt -c foo_nomat_ps0.inp
+#   abq_builddeck.py -s mattable,prestress -m foo.mattable -r foo_ps2.rpt foo_nomat_ps2.inp
+#
+# Initial temperatures (abq_tempic.py) can be added the same way, with a
+# "temperature" stage, materials and sections (abq_sections.py) with a
+# "sections" stage ahead of the mattable one, e.g.
+#   abq_builddeck.py -s sections,mattable,loads -m foo_mat.txt foo_nosect.inp
+# and other stages can be added with stage_registrar, the same way these are.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, re, optparse
+import abq_fileio
+import abq_applymattable, abq_applyloads, abq_prestress, abq_tempic, abq_rheology
+import abq_sections
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Which stages to run, in order, unless told otherwise
+default_stages = "mattable,loads,prestress"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+# Every stage that can be run, by name. Each entry is a "stage maker": a
+# function of (options, input file name, output file name) that reads whatever
+# else the stage needs and returns (stage, new output file name), where the
+# stage is a function from an iterable of lines to an iterable of lines.
+stages = {}
+
+def stage_registrar(name):
+    """
+    Adds a stage maker to the stages that can be run, under a name
+    """
+    def registrar(maker):
+        stages[name] = maker
+        return maker
+    return registrar
+
+
+def pipeline_builder(lines, stage_functions):
+    """
+    Chains stages together, so that lines go through each of them in turn, and
+    returns the lines that come out of the last one
+    """
+    for stage in stage_functions:
+        lines = stage(lines)
+    return lines
+
+
+def deck_builder(inpfilename, outfilename, stage_functions):
+    """
+    Reads a deck, sends every line through the stages, and writes the new deck
+    (which only appears once it's complete)
+    """
+    inpfile = abq_fileio.open_input(inpfilename)
+    with abq_fileio.open_output(outfilename) as outfile:
+        outfile.writelines(pipeline_builder(inpfile, stage_functions))
+
+
+def elset_checker(lines):
+    """
+    Passes lines straight through, stopping with an error if any of
+    abq_radialgrav's grav_* element sets is defined twice (stages may hand
+    back several lines at once)
+    """
+    seen = set()
+    for line in lines:
+        if "elset=grav_" in line.lower():
+            for name in re.findall(r"^\*elset,\s*elset=(grav_[^,\s]+)", line,
+                                   re.I | re.M):
+                if name.upper() in seen:
+                    raise ValueError("Set %s is written twice"%name)
+                seen.add(name.upper())
+        yield line
+
+
+@stage_registrar("sections")
+def sections_maker(options, inpfilename, outfilename):
+    """
+    Gives every material set a section and a material with dummy variables
+    (only the materials in the material table, if there is one), like
+    abq_sections.py
+    """
+    material_names = None
+    if options.mattable:
+        material_names = list(abq_applymattable.mattable_parser(
+            abq_fileio.open_input(options.mattable)).keys())
+    outfilename = re.sub(abq_sections.inp_tag, abq_sections.out_tag, outfilename)
+    return (lambda lines: abq_sections.section_stage(lines, material_names),
+            outfilename)
+
+
+@stage_registrar("mattable")
+def mattable_maker(options, inpfilename, outfilename):
+    """
+    Fills in material properties (and loads, at a "** LOADS" line) from a
+    material table, like abq_applymattable.py
+    """
+    if not options.mattable:
+        raise ValueError("The mattable stage needs a material table (-m)")
+    if abq_applymattable.creep_profile not in abq_rheology.profiles:
+        raise ValueError("No creep profile %s (see abq_rheology.py -l)"%
+                         abq_applymattable.creep_profile)
+    if abq_rheology.np is None and abq_rheology.needs_numpy(
+            abq_rheology.profiles[abq_applymattable.creep_profile]):
+        raise ValueError("Creep profile %s has Arrhenius laws, which need numpy"%
+                         abq_applymattable.creep_profile)
+    materials = abq_applymattable.mattable_parser(
+        abq_fileio.open_input(options.mattable))
+    outfilename = re.sub(abq_applymattable.inp_tag, abq_applymattable.out_tag,
+                         outfilename)
+    return (lambda lines: abq_applymattable.mattable_stage(lines, materials),
+            outfilename)
+
+
+@stage_registrar("loads")
+def loads_maker(options, inpfilename, outfilename):
+    """
+    Adds gravity loads before the output requests, using the densities in the
+    deck, like abq_applyloads.py
+    """
+    outfilename = re.sub(abq_applyloads.infile_tag, abq_applyloads.outfile_tag,
+                         outfilename)
+    return abq_applyloads.load_stage, outfilename
+
+
+@stage_registrar("prestress")
+def prestress_maker(options, inpfilename, outfilename):
+    """
+    Adds the stresses from a report file as initial conditions before the first
+    step, and steps up the iteration number, like abq_prestress.py
+    """
+    if not options.rptfile:
+        raise ValueError("The prestress stage needs a report file (-r)")
+    rptfilename = abq_fileio.plain_name(options.rptfile)
+    old_tag, this_tag, next_tag = abq_prestress.iteration_tagger(outfilename,
+                                                                 rptfilename)
+    if old_tag == "ERROR" or next_tag == "ERROR":
+        raise ValueError("%s or %s doesn't have an iteration tag listed in "
+                         "abq_prestress's Options section"%(outfilename,
+                                                            rptfilename))
+
+    stresses = abq_prestress.stress_reader(abq_fileio.open_input(options.rptfile),
+                                           inpfilename)
+    if abq_prestress.update_mode != "plain":
+        stresses = abq_prestress.stress_accelerator(stresses, outfilename,
+                                                    old_tag, this_tag, next_tag)
+
+    outfilename = re.sub(old_tag, next_tag, outfilename)
+    return (lambda lines: abq_prestress.prestress_stage(lines, stresses),
+            outfilename)
+
+
+@stage_registrar("temperature")
+def temperature_maker(options, inpfilename, outfilename):
+    """
+    Adds initial temperatures for every node from a nodal temperature report
+    before the first step, like abq_tempic.py
+    """
+    import abq_mesh, abq_probe
+    if not options.temperatures:
+        raise ValueError("The temperature stage needs a temperature report (-T)")
+    mesh = abq_mesh.mesh_loader(inpfilename)
+    thermal_mesh = abq_mesh.mesh_loader(options.thermal) if options.thermal else None
+    labels, values, names = abq_probe.rptfile_parser_nodal(
+        abq_fileio.open_input(options.temperatures))
+    temperatures = abq_tempic.temperature_mapper(
+        mesh, labels, values, "thermal" if options.thermal else "label", thermal_mesh)
+    block = list(abq_tempic.tempic_writer(mesh.node_ids, temperatures,
+                                          mesh.instance_name))
+    return (lambda lines: abq_tempic.tempic_stage(lines, block)), outfilename
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo_nomat_ps0.inp"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-s","--stages",dest="stages",default=default_stages,
+                      help="stages to run, in order [%default]")
+    parser.add_option("-o","--output",dest="output",default=None,
+                      help="name of the new deck (default: the input file's "
+                           "name, renamed by each stage like its own tool does)")
+    parser.add_option("-m","--mattable",dest="mattable",default=None,
+                      help="material table, for the mattable (and sections) stage")
+    parser.add_option("-d","--mat_density",dest="mat_density",default=None,
+                      help="density for materials: initial, average or final")
+    parser.add_option("-g","--grav_density",dest="grav_density",default=None,
+                      help="density for loads written by the mattable stage: "
+                           "initial, average or final")
+    parser.add_option("--creep",dest="creep_profile",default=None,
+                      help="creep profile for the mattable stage's viscosities "
+                           "(see abq_rheology.py -l) [%s]"%
+                           abq_applymattable.creep_profile)
+    parser.add_option("--geoid",action="store_true",
+                      dest="geoid",default=False,
+                      help="geoid model: leave out the melt pool, crustal cap "
+                           "and mantle annulus loads")
+    parser.add_option("--radialgrav",type="int",dest="radial_bins",default=None,
+                      help="write loads with gravity varying with radius, "
+                           "grouping elements into this many radial bins")
+    parser.add_option("-r","--rptfile",dest="rptfile",default=None,
+                      help="stress report file, for the prestress stage")
+    parser.add_option("-T","--temperatures",dest="temperatures",default=None,
+                      help="nodal temperature report, for the temperature stage")
+    parser.add_option("--thermal",dest="thermal",default=None,
+                      help="the thermal model's .inp file, if the temperature "
+                           "report is on a different mesh")
+    parser.add_option("-f","--flat",action="store_true",
+                      dest="flat_mode",default=False,
+                      help="the .rpt file is axisymmetric with a flat surface")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved_mode",default=False,
+                      help="the .rpt file is axisymmetric with a curved surface")
+    parser.add_option("-3","--3D",action="store_true",
+                      dest="threedee_mode",default=False,
+                      help="the .rpt file is 3D and not axisymmetric")
+    parser.add_option("-t","--tensor",action="store_true",
+                      dest="tensor",default=False,
+                      help="the .rpt file has the whole stress tensor in the "
+                           "global frame, to be rotated into the radial frame")
+    parser.add_option("--full",action="store_true",
+                      dest="full",default=False,
+                      help="with -t, write the whole tensor as the prestress")
+    parser.add_option("-u","--update",dest="update_mode",default=None,
+                      help="prestress update: plain, relax, aitken, or anderson")
+    parser.add_option("-w","--relaxation",type="float",
+                      dest="relaxation_factor",default=None,
+                      help="relaxation factor for the accelerated update modes")
+    parser.add_option("--depth",type="int",dest="anderson_depth",default=None,
+                      help="number of earlier iterations to mix in anderson mode")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options, passing the settings for each stage on to
+    # the tool it comes from
+    if options.verbose:
+        verbose_mode = True
+    if options.mat_density:
+        abq_applymattable.mat_density = options.mat_density
+    if options.grav_density:
+        abq_applymattable.grav_density = options.grav_density
+    if options.geoid:
+        abq_applymattable.geoid_mode = True
+    if options.creep_profile:
+        abq_applymattable.creep_profile = options.creep_profile
+    if options.flat_mode:
+        abq_prestress.mode = "flat"
+    if options.curved_mode:
+        abq_prestress.mode = "curved"
+    if options.threedee_mode:
+        abq_prestress.mode = "threedee"
+    if options.tensor:
+        abq_prestress.report_components = "tensor"
+    if options.full:
+        abq_prestress.prestress_components = "full"
+    if options.update_mode:
+        abq_prestress.update_mode = options.update_mode.lower()
+    if options.relaxation_factor is not None:
+        abq_prestress.relaxation_factor = options.relaxation_factor
+    if options.anderson_depth is not None:
+        abq_prestress.anderson_depth = options.anderson_depth
+    abq_prestress.verbose_mode = verbose_mode
+
+    if len(args) != 1:
+        print("ERROR: Please specify one .inp file")
+        sys.exit(1)
+    inpfilename = args[0]
+    stage_names = [name for name in options.stages.split(",") if name]
+    for name in stage_names:
+        if name not in stages:
+            print("ERROR: No stage %s (stages are %s)"%(name, ", ".join(sorted(stages))))
+            sys.exit(1)
+
+    # Gravity varying with radius needs the mesh, and the densities the loads
+    # are going to use. Only one stage writes the loads (and their sets): the
+    # mattable stage if it's writing loads, with its grav_density, and the
+    # loads stage otherwise, with the densities in the deck, which are the
+    # material table's mat_density ones if the mattable stage runs first.
+    # Sets the sections stage is going to give sections to count as having
+    # them already.
+    if options.radial_bins:
+        import abq_mesh, abq_radialgrav
+        mesh = abq_mesh.mesh_loader(inpfilename)
+        materials = None
+        if "mattable" in stage_names and options.mattable:
+            materials = abq_applymattable.mattable_parser(
+                abq_fileio.open_input(options.mattable))
+        if "sections" in stage_names:
+            material_names = None
+            if options.mattable:
+                material_names = list(abq_applymattable.mattable_parser(
+                    abq_fileio.open_input(options.mattable)).keys())
+            pairs, unmatched = abq_sections.set_matcher(
+                [name for name in mesh.elsets if name not in mesh.sections],
+                material_names)
+            for set_name, material_name in pairs:
+                mesh.sections[set_name] = material_name.upper()
+        try:
+            if materials is not None and abq_applymattable.write_loads:
+                abq_applymattable.radial_groups = abq_radialgrav.radial_load_groups(
+                    mesh, abq_applymattable.density_finder(
+                        materials, abq_applymattable.grav_density),
+                    options.radial_bins)
+            elif "loads" in stage_names:
+                densities = None
+                if materials is not None and \
+                   stage_names.index("mattable") < stage_names.index("loads"):
+                    densities = abq_applymattable.density_finder(
+                        materials, abq_applymattable.mat_density)
+                abq_applyloads.radial_groups = abq_radialgrav.radial_load_groups(
+                    mesh, densities, options.radial_bins)
+        except KeyError as error:
+            print("ERROR: %s"%error.args[0])
+            sys.exit(1)
+        if [] in (abq_applymattable.radial_groups, abq_applyloads.radial_groups):
+            print("ERROR: No element sets with both a section and a density for "
+                  "--radialgrav to group")
+            sys.exit(1)
+
+    # Set up each stage, working out the new deck's name as we go
+    stage_functions = []
+    outfilename = abq_fileio.plain_name(inpfilename)
+    try:
+        for name in stage_names:
+            stage, outfilename = stages[name](options, inpfilename, outfilename)
+            stage_functions.append(stage)
+    except ValueError as error:
+        print("ERROR: %s"%error)
+        sys.exit(1)
+    if options.output:
+        outfilename = options.output
+    if outfilename == abq_fileio.plain_name(inpfilename):
+        print("ERROR: The new deck would overwrite %s; please give a name with -o"%
+              inpfilename)
+        sys.exit(1)
+
+    # Make sure no radial gravity set has been written twice
+    if options.radial_bins:
+        stage_functions.append(elset_checker)
+
+    if verbose_mode:
+        print("Reading %s, running %s..."%(inpfilename, " -> ".join(stage_names)))
+        print("Creating (or overwriting!) file %s..."%outfilename)
+    try:
+        deck_builder(inpfilename, outfilename, stage_functions)
+    except ValueError as error:
+        print("ERROR: %s"%error)
+        sys.exit(1)
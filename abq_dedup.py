@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# A program to store whole families of .inp files (prestress iterations,
+# material variants, geoid/non-geoid copies...) without keeping the same nodes
+# and elements over and over. Each deck is cut into blocks at *KEYWORD lines,
+# each different block is stored once (compressed, and named by its checksum),
+# and the deck itself is stored as a list of the blocks it's made of, so it can
+# be put back together, byte for byte, whenever it's needed.
+#
+# A store is a directory (e.g. decks.abqstore) holding
+#   blocks/ab/abcdef...    one compressed file per different block
+#   decks/foo_ps3.inp.json the block list (and size and checksum) of each deck
+# Tools that use abq_fileio can read decks straight out of it, as e.g.
+# "decks.abqstore:foo_ps3.inp".
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, json, zlib, hashlib, optparse
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Where the store is, unless told otherwise
+store_dirname = "decks.abqstore"
+
+# Blocks are only cut at a *KEYWORD line once they're at least this big, so
+# that runs of small keywords (*Elset, *Solid Section...) are stored together
+# instead of as thousands of tiny files. Before these keywords, though, a new
+# block is always started, so that the big blocks line up the same way in
+# every deck.
+min_block_size = 16384 #bytes
+boundary_keywords = ("*NODE", "*ELEMENT", "*MATERIAL", "*INITIAL CONDITIONS",
+                     "*STEP", "*PART", "*ASSEMBLY", "*END PART")
+
+# zlib compression level for stored blocks
+compression_level = 6
+
+# How much of a deck is read at a time when checking it against the store
+chunk_size = 1 << 22 #bytes
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def block_splitter(inpfile):
+    """
+    Goes through an open .inp file (in binary mode) and hands back its blocks,
+    one at a time, as bytes
+    """
+
+    block = []
+    block_size = 0
+    for line in inpfile:
+        if line.startswith(b"*") and not line.startswith(b"**") and block:
+            upper = line.upper()
+            if block_size >= min_block_size or \
+               any(upper.startswith(keyword.encode()) for keyword in boundary_keywords):
+                yield b"".join(block)
+                block = []
+                block_size = 0
+        block.append(line)
+        block_size += len(line)
+    if block:
+        yield b"".join(block)
+
+
+def block_filename(storedir, checksum):
+    """
+    Where a block with this checksum is kept
+    """
+    return os.path.join(storedir, "blocks", checksum[:2], checksum)
+
+
+def deck_filename(storedir, name):
+    """
+    Where the block list for a deck with this name is kept
+    """
+    return os.path.join(storedir, "decks", name + ".json")
+
+
+def atomic_writer(filename, data):
+    """
+    Writes a file all at once (to a temporary file, then renamed), so that a
+    store is never left with half a block in it
+    """
+    dirname = os.path.dirname(filename)
+    if not os.path.exists(dirname):
+        os.makedirs(dirname)
+    tempname = "%s.%d.tmp"%(filename, os.getpid())
+    tempfile = open(tempname, 'wb')
+    tempfile.write(data)
+    tempfile.close()
+    os.rename(tempname, filename)
+
+
+def file_checksum(filename):
+    """
+    The sha1 checksum of a file, read a chunk at a time
+    """
+    checksum = hashlib.sha1()
+    with open(filename, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(chunk_size), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def deck_adder(storedir, inpfilename, name=None):
+    """
+    Stores a deck, writing only the blocks the store doesn't have yet. Returns
+    (the name it's stored under, deck size, bytes of new blocks written).
+    Refuses (with a ValueError) to store a deck under a name the store already
+    has a different deck under.
+    """
+
+    name = name or os.path.basename(inpfilename)
+    checksums = []
+    deck_checksum = hashlib.sha1()
+    size = 0
+    written = 0
+    for block in block_splitter(open(inpfilename, 'rb')):
+        checksum = hashlib.sha1(block).hexdigest()
+        checksums.append(checksum)
+        deck_checksum.update(block)
+        size += len(block)
+        filename = block_filename(storedir, checksum)
+        if not os.path.exists(filename):
+            compressed = zlib.compress(block, compression_level)
+            atomic_writer(filename, compressed)
+            written += len(compressed)
+
+    recipe = {"name": name, "size": size, "sha1": deck_checksum.hexdigest(),
+              "blocks": checksums}
+    if os.path.exists(deck_filename(storedir, name)):
+        stored = json.load(open(deck_filename(storedir, name), 'r'))
+        if stored["sha1"] != recipe["sha1"]:
+            raise ValueError("The store already has a different %s (remove "
+                             "it first to replace it)"%name)
+    atomic_writer(deck_filename(storedir, name), json.dumps(recipe).encode("utf-8"))
+    return name, size, written
+
+
+def deck_chunks(storedir, name):
+    """
+    Puts a deck back together a block at a time (as bytes), checking it
+    against its checksum at the end
+    """
+
+    recipe = json.load(open(deck_filename(storedir, name), 'r'))
+    deck_checksum = hashlib.sha1()
+    for checksum in recipe["blocks"]:
+        block = zlib.decompress(open(block_filename(storedir, checksum), 'rb').read())
+        deck_checksum.update(block)
+        yield block
+    if deck_checksum.hexdigest() != recipe["sha1"]:
+        raise ValueError("%s in %s is corrupted"%(name, storedir))
+
+
+def deck_lister(storedir):
+    """
+    The names of every deck in a store
+    """
+    decksdir = os.path.join(storedir, "decks")
+    if not os.path.exists(decksdir):
+        return []
+    return sorted(filename[:-len(".json")] for filename in os.listdir(decksdir)
+                  if filename.endswith(".json"))
+
+
+def store_statistics(storedir):
+    """
+    Adds up how big the stored decks are, and how much space the store
+    actually takes. Returns (number of decks, deck bytes, number of blocks,
+    store bytes).
+    """
+
+    deck_bytes = 0
+    names = deck_lister(storedir)
+    store_bytes = 0
+    for name in names:
+        deck_bytes += json.load(open(deck_filename(storedir, name), 'r'))["size"]
+        store_bytes += os.path.getsize(deck_filename(storedir, name))
+    num_blocks = 0
+    for dirpath, dirnames, filenames in os.walk(os.path.join(storedir, "blocks")):
+        for filename in filenames:
+            num_blocks += 1
+            store_bytes += os.path.getsize(os.path.join(dirpath, filename))
+    return len(names), deck_bytes, num_blocks, store_bytes
+
+
+def garbage_collector(storedir):
+    """
+    Deletes blocks that no deck uses any more. Returns how many were deleted.
+    """
+
+    used = set()
+    for name in deck_lister(storedir):
+        used.update(json.load(open(deck_filename(storedir, name), 'r'))["blocks"])
+    deleted = 0
+    for dirpath, dirnames, filenames in os.walk(os.path.join(storedir, "blocks")):
+        for filename in filenames:
+            if filename not in used:
+                os.remove(os.path.join(dirpath, filename))
+                deleted += 1
+    return deleted
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] add foo.inp [...]\n" \
+            "       %prog [options] get foo.inp [...]\n" \
+            "       %prog [options] remove foo.inp [...]\n" \
+            "       %prog [options] list|gc"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-s","--store",dest="store",default=None,
+                      help="store directory [%s]"%store_dirname)
+    parser.add_option("-o","--outdir",dest="outdir",default=None,
+                      help="write decks that are got into this directory "
+                           "(default: write to the screen)")
+    parser.add_option("-d","--delete",action="store_true",
+                      dest="delete",default=False,
+                      help="delete the original decks once they're stored and checked")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.store:
+        store_dirname = options.store
+
+    if len(args) < 1 or args[0] not in ("add", "get", "remove", "list", "gc"):
+        print("ERROR: Please specify add, get, remove, list or gc")
+        sys.exit(1)
+    command, names = args[0], args[1:]
+
+    if command == "add":
+        for inpfilename in names:
+            try:
+                name, size, written = deck_adder(store_dirname, inpfilename)
+            except ValueError as error:
+                print("ERROR: %s not stored: %s"%(inpfilename, error))
+                continue
+            if verbose_mode:
+                print("%-40s %12d bytes, %12d new"%(inpfilename, size, written))
+
+            # Check that it comes back out exactly, before deleting anything
+            if options.delete:
+                stored = hashlib.sha1()
+                for block in deck_chunks(store_dirname, name):
+                    stored.update(block)
+                if stored.hexdigest() == file_checksum(inpfilename):
+                    os.remove(inpfilename)
+                else:
+                    print("ERROR: %s didn't store correctly; not deleted"%inpfilename)
+
+    elif command == "get":
+        for name in names:
+            if options.outdir:
+                outfile = open(os.path.join(options.outdir, name), 'wb')
+            else:
+                outfile = getattr(sys.stdout, "buffer", sys.stdout)
+            for block in deck_chunks(store_dirname, name):
+                outfile.write(block)
+            if options.outdir:
+                outfile.close()
+
+    elif command == "remove":
+        for name in names:
+            os.remove(deck_filename(store_dirname, name))
+        if verbose_mode:
+            print("Removed %d decks; 'gc' deletes the blocks nothing uses any more"%
+                  len(names))
+
+    elif command == "gc":
+        deleted = garbage_collector(store_dirname)
+        if verbose_mode:
+            print("Deleted %d unused blocks"%deleted)
+
+    # Report the savings after anything that changes the store
+    if command in ("add", "list", "remove", "gc"):
+        if command == "list":
+            for name in deck_lister(store_dirname):
+                recipe = json.load(open(deck_filename(store_dirname, name), 'r'))
+                print("%-40s %12d bytes %6d blocks"%(name, recipe["size"],
+                                                    len(recipe["blocks"])))
+        num_decks, deck_bytes, num_blocks, store_bytes = store_statistics(store_dirname)
+        print("%d decks, %d bytes in all, stored as %d blocks in %d bytes (%.1fx smaller)"%(
+            num_decks, deck_bytes, num_blocks, store_bytes,
+            deck_bytes / max(store_bytes, 1)))
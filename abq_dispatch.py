@@ -0,0 +1,410 @@
+#!/usr/bin/env python
+# A program to send a list of Abaqus jobs off to a cluster's batch scheduler
+# (SLURM or PBS) as array jobs, and to keep track of them through state files
+# that each job writes as it starts and finishes. Jobs that need the same
+# resources go into the same array. A "local" backend runs the same array
+# scripts here, as subprocesses, so everything can be tried out without a
+# cluster.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, time, json, shlex, socket, subprocess, optparse
+import abq_scheduler
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Which batch scheduler to submit to: "slurm", "pbs", or "local"
+backend = "slurm"
+
+# Where the array scripts, job lists, logs, state files and scratch
+# directories go
+dispatch_dirname = "dispatch"
+
+# CPUs and wall time for each job, unless they're predicted from past runs
+cpus_per_job = 8
+default_walltime = 24*3600.0 #s
+
+# Predicted wall times are padded by this much, to be safe
+walltime_safety = 2.0
+
+# Most cores the local backend uses at once
+local_cores = abq_scheduler.max_cores
+
+# How often to check on jobs
+poll_interval = 5.0 #s
+
+# Print out extra text while running?
+verbose_mode = True
+
+# Array script templates. Each array task runs this program again to do one
+# job, picked out of the array's job list by its task number.
+script_headers = {
+"slurm": """#!/bin/bash
+#SBATCH --job-name=%(name)s
+#SBATCH --array=1-%(tasks)d
+#SBATCH --nodes=1
+#SBATCH --ntasks=1
+#SBATCH --cpus-per-task=%(cpus)d
+#SBATCH --time=%(walltime)s
+%(memory_line)s#SBATCH --output=%(logdir)s/%(name)s_%%a.out
+TASK_ID=$SLURM_ARRAY_TASK_ID
+""",
+"pbs": """#!/bin/bash
+#PBS -N %(name)s
+#PBS -J 1-%(tasks)d
+#PBS -l select=1:ncpus=%(cpus)d%(memory_select)s
+#PBS -l walltime=%(walltime)s
+#PBS -j oe
+#PBS -o %(logdir)s/
+TASK_ID=$PBS_ARRAY_INDEX
+""",
+"local": """#!/bin/bash
+# Run by abq_dispatch.py's local backend, which sets ABQ_ARRAY_TASK_ID
+TASK_ID=$ABQ_ARRAY_TASK_ID
+""",
+}
+script_body = """cd %(workdir)s
+%(python)s %(program)s --task %(listfilename)s $TASK_ID
+"""
+
+submit_commands = {"slurm": "sbatch", "pbs": "qsub"}
+
+
+######## Main Program ##########################################################
+
+def walltime_formatter(seconds):
+    """
+    Writes a wall time the way batch schedulers want it, e.g. "26:15:00"
+    """
+    seconds = int(seconds + 59) // 60 * 60
+    return "%d:%02d:%02d"%(seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+
+
+def manifest_loader(dispatchdir):
+    """
+    Reads the record of every array submitted from a dispatch directory
+    """
+    manifestname = os.path.join(dispatchdir, "manifest.json")
+    if not os.path.exists(manifestname):
+        return {"arrays": []}
+    return json.load(open(manifestname, 'r'))
+
+
+def json_saver(filename, data):
+    """
+    Writes out a JSON file all at once (to a temporary file, then renamed), so
+    nothing ever reads a half-written one
+    """
+    tempname = "%s.%d.tmp"%(filename, os.getpid())
+    tempfile = open(tempname, 'w')
+    json.dump(data, tempfile, indent=1, sort_keys=True)
+    tempfile.close()
+    os.rename(tempname, filename)
+
+
+def job_grouper(jobs):
+    """
+    Puts jobs that need the same CPUs, wall time and memory into the same
+    group, since every task in an array asks for the same resources. Returns a
+    list of ((cpus, walltime, memory), [jobs]).
+    """
+
+    groups = {}
+    for job in jobs:
+        walltime = default_walltime if job.walltime is None else \
+                   job.walltime * walltime_safety
+        # Round up to the hour (or GB) so similar jobs share an array
+        walltime = 3600.0 * -(-walltime // 3600)
+        memory = None if job.memory is None else 1024 * -(-job.memory // 1024)
+        groups.setdefault((job.cpus, walltime, memory), []).append(job)
+    return sorted(groups.items(), key=lambda item: (item[0][0], item[0][1]))
+
+
+def array_writer(dispatchdir, number, resources, jobs):
+    """
+    Writes the job list and array script for one group of jobs, and returns the
+    script's name
+    """
+
+    cpus, walltime, memory = resources
+    name = "abq_array%02d"%number
+    logdir = os.path.join(dispatchdir, "logs")
+    if not os.path.exists(logdir):
+        os.makedirs(logdir)
+
+    listfilename = os.path.join(dispatchdir, "%s.jobs"%name)
+    listfile = open(listfilename, 'w')
+    for job in jobs:
+        listfile.write("%s %d\n"%(os.path.abspath(job.inpfilename), job.cpus))
+    listfile.close()
+
+    settings = {"name": name, "tasks": len(jobs), "cpus": cpus,
+                "walltime": walltime_formatter(walltime),
+                "memory_line": "" if memory is None else "#SBATCH --mem=%dM\n"%memory,
+                "memory_select": "" if memory is None else ":mem=%dmb"%memory,
+                "logdir": os.path.abspath(logdir),
+                "workdir": os.path.abspath(dispatchdir),
+                "python": sys.executable or "python",
+                "program": os.path.abspath(__file__).replace(".pyc", ".py"),
+                "listfilename": os.path.abspath(listfilename)}
+    scriptname = os.path.join(dispatchdir, "%s.sh"%name)
+    scriptfile = open(scriptname, 'w')
+    scriptfile.write(script_headers[backend]%settings)
+    scriptfile.write(script_body%settings)
+    scriptfile.close()
+    os.chmod(scriptname, 0o755)
+
+    return scriptname
+
+
+def dispatcher(jobs, dispatchdir, submit=True):
+    """
+    Writes an array script for each group of jobs and submits it (or, for the
+    local backend, starts a runner in the background to work through them)
+    """
+
+    if not os.path.exists(os.path.join(dispatchdir, "state")):
+        os.makedirs(os.path.join(dispatchdir, "state"))
+    manifest = manifest_loader(dispatchdir)
+    scriptnames = []
+
+    for resources, group in job_grouper(jobs):
+        number = len(manifest["arrays"]) + 1
+        scriptname = array_writer(dispatchdir, number, resources, group)
+        array = {"script": os.path.abspath(scriptname), "backend": backend,
+                 "tasks": len(group), "cpus": resources[0],
+                 "walltime": resources[1], "memory": resources[2],
+                 "jobs": [job.name for job in group],
+                 "command": abq_scheduler.abaqus_command, "submission": None}
+
+        if submit and backend in submit_commands:
+            output = subprocess.check_output([submit_commands[backend], scriptname])
+            array["submission"] = output.decode().strip()
+        manifest["arrays"].append(array)
+        scriptnames.append(array["script"])
+
+        if verbose_mode:
+            print("%s: %d jobs on %d cpus for %s%s"%(
+                os.path.basename(scriptname), len(group), resources[0],
+                walltime_formatter(resources[1]),
+                " (%s)"%array["submission"] if array["submission"] else ""))
+
+    json_saver(os.path.join(dispatchdir, "manifest.json"), manifest)
+
+    if submit and backend == "local":
+        runlog = open(os.path.join(dispatchdir, "logs", "local_runner.log"), 'a')
+        subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                          "--local-runner", "-d", dispatchdir] + scriptnames,
+                         stdout=runlog, stderr=subprocess.STDOUT,
+                         preexec_fn=os.setsid)
+
+
+def state_filename(dispatchdir, scriptname, task_id):
+    """
+    Where the state of one array task is kept (by array and task, since jobs
+    from different directories can have the same name)
+    """
+    return os.path.join(dispatchdir, "state", "%s.%d.json"%(
+        os.path.splitext(os.path.basename(scriptname))[0], task_id))
+
+
+def task_runner(listfilename, task_id):
+    """
+    Does the work of one array task: runs one job from the list in its own
+    scratch directory, writing its state file as it starts and finishes. A
+    job whose command can't be run at all is marked as failed (exit status
+    -1), with the reason in its log.
+    """
+
+    dispatchdir = os.path.dirname(listfilename)
+    scriptname = listfilename[:-len(".jobs")] + ".sh"
+    inpfilename, cpus = open(listfilename, 'r').readlines()[task_id - 1].split()
+    for array in manifest_loader(dispatchdir)["arrays"]:
+        if array["script"] == scriptname:
+            abq_scheduler.abaqus_command = array["command"]
+    abq_scheduler.scratch_dirname = os.path.join(dispatchdir, "scratch")
+
+    job = abq_scheduler.Job(inpfilename, int(cpus))
+    statename = state_filename(dispatchdir, scriptname, task_id)
+    state = {"job": job.name, "status": "running", "host": socket.gethostname(),
+             "start": time.time(), "end": None, "returncode": None}
+    job.workdir = abq_scheduler.scratch_maker(job)
+    state["workdir"] = os.path.abspath(job.workdir)
+    json_saver(statename, state)
+
+    command = shlex.split(abq_scheduler.abaqus_command%{"job": job.name,
+                                                        "cpus": job.cpus})
+    logfile = open(os.path.join(job.workdir, "%s.scheduler.log"%job.name), 'w')
+    try:
+        returncode = subprocess.call(command, cwd=job.workdir, stdout=logfile,
+                                     stderr=subprocess.STDOUT)
+    except OSError as error:
+        returncode = -1
+        logfile.write("could not start: %s\n"%error)
+        print("WARNING: Could not start %s (%s): %s"%(job.name, command[0], error))
+    logfile.close()
+
+    state.update(status="done" if returncode == 0 else "failed",
+                 end=time.time(), returncode=returncode)
+    json_saver(statename, state)
+    return returncode
+
+
+def local_runner(dispatchdir, scriptnames):
+    """
+    Stands in for a batch scheduler: works through the tasks of the given
+    arrays in a dispatch directory, as many at once as the local cores allow
+    """
+
+    manifest = manifest_loader(dispatchdir)
+    tasks = [(array["script"], array["cpus"], task_id)
+             for array in manifest["arrays"] if array["script"] in scriptnames
+             for task_id in range(1, array["tasks"] + 1)]
+    running = []
+    while tasks or running:
+        running = [(process, cpus) for process, cpus in running
+                   if process.poll() is None]
+        free_cores = local_cores - sum(cpus for process, cpus in running)
+        for task in list(tasks):
+            scriptname, cpus, task_id = task
+            if cpus <= free_cores or not running:
+                environment = dict(os.environ, ABQ_ARRAY_TASK_ID=str(task_id))
+                running.append((subprocess.Popen(["bash", scriptname],
+                                                 env=environment), cpus))
+                free_cores -= cpus
+                tasks.remove(task)
+        time.sleep(poll_interval / 5)
+
+
+def status_reader(dispatchdir):
+    """
+    Collects every job's state, from its state file or, if it hasn't started,
+    as "queued"
+    """
+
+    states = []
+    for array in manifest_loader(dispatchdir)["arrays"]:
+        for task_id, name in enumerate(array["jobs"], 1):
+            statename = state_filename(dispatchdir, array["script"], task_id)
+            if os.path.exists(statename):
+                states.append(json.load(open(statename, 'r')))
+            else:
+                states.append({"job": name, "status": "queued"})
+    return states
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp [bar.inp ...]\n" \
+            "       %prog --status|--wait [-d dispatch_dir]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-b","--backend",dest="backend",default=None,
+                      help="slurm, pbs or local [%s]"%backend)
+    parser.add_option("-d","--dir",dest="dispatchdir",default=None,
+                      help="dispatch directory [%s]"%dispatch_dirname)
+    parser.add_option("-c","--cpus",type="int",dest="cpus",default=None,
+                      help="CPUs for each job [%d]"%cpus_per_job)
+    parser.add_option("-t","--walltime",type="float",dest="walltime",default=None,
+                      help="wall time for each job, hours [%g]"%(default_walltime/3600))
+    parser.add_option("-s","--size",action="append",dest="history",default=[],
+                      help="size each job from the past runs in this directory "
+                           "(can be given more than once)")
+    parser.add_option("--command",dest="command",default=None,
+                      help="command to run each job, with %(job)s and %(cpus)d "
+                           "filled in [" + abq_scheduler.abaqus_command + "]")
+    parser.add_option("-n","--dry-run",action="store_true",
+                      dest="dry_run",default=False,
+                      help="write the array scripts but don't submit them")
+    parser.add_option("--status",action="store_true",dest="status",default=False,
+                      help="show the state of every job dispatched so far")
+    parser.add_option("--wait",action="store_true",dest="wait",default=False,
+                      help="wait for every job dispatched so far to finish")
+    parser.add_option("--task",action="store_true",dest="task",default=False,
+                      help=optparse.SUPPRESS_HELP)
+    parser.add_option("--local-runner",action="store_true",
+                      dest="local_runner",default=False,
+                      help=optparse.SUPPRESS_HELP)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.backend:
+        if options.backend not in script_headers:
+            print("ERROR: Unknown backend %s"%options.backend)
+            sys.exit(1)
+        backend = options.backend
+    if options.dispatchdir:
+        dispatch_dirname = options.dispatchdir
+    if options.cpus:
+        cpus_per_job = options.cpus
+    if options.walltime:
+        default_walltime = options.walltime * 3600
+    if options.command:
+        abq_scheduler.abaqus_command = options.command
+
+    # The modes used by the array scripts themselves
+    if options.task:
+        sys.exit(task_runner(os.path.abspath(args[0]), int(args[1])))
+    if options.local_runner:
+        local_runner(dispatch_dirname, args)
+        sys.exit()
+
+    # Checking up on dispatched jobs
+    if options.status or options.wait:
+        while True:
+            states = status_reader(dispatch_dirname)
+            unfinished = [state for state in states
+                          if state["status"] in ("queued", "running")]
+            if not (options.wait and unfinished):
+                break
+            time.sleep(poll_interval)
+        print("%-30s %-8s %5s %10s  %s"%("Job", "Status", "Exit", "Time (s)", "Host"))
+        for state in states:
+            elapsed = (state.get("end") or time.time()) - state["start"] \
+                      if state.get("start") else None
+            print("%-30s %-8s %5s %10s  %s"%(
+                state["job"][:30], state["status"],
+                "-" if state.get("returncode") is None else state["returncode"],
+                "-" if elapsed is None else "%.0f"%elapsed, state.get("host", "-")))
+        sys.exit(0 if all(state["status"] == "done" for state in states) else 1)
+
+    # Dispatching new jobs
+    if len(args) < 1:
+        print("ERROR: Please specify at least one job")
+        sys.exit(1)
+    if options.history:
+        import abq_sizing
+        abq_sizing.default_cpus = cpus_per_job
+        sizing_model = abq_sizing.model_fitter(
+            abq_sizing.history_collector(options.history))
+    jobs = []
+    for arg in args:
+        inpfilename = arg if arg.endswith(".inp") else arg + ".inp"
+        if not os.path.exists(inpfilename):
+            print("ERROR: Input file %s not found"%inpfilename)
+            sys.exit(1)
+        if options.history:
+            deck = abq_sizing.deck_scanner(open(inpfilename, 'r'))
+            jobs.append(abq_scheduler.Job(inpfilename,
+                                          *abq_sizing.job_sizer(deck, sizing_model)))
+        else:
+            jobs.append(abq_scheduler.Job(inpfilename, cpus_per_job))
+
+    dispatcher(jobs, dispatch_dirname, submit=not options.dry_run)
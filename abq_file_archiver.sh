@@ -4,14 +4,22 @@
 # Don't run this until you've made a PDF of the results (although it's
 # reversible if you make a mistake)
 
-echo "archiving run files (com, dat, ipm, log, msg, sim, sta)..."
-tar -czvf runfiles.tar.gz *.{com,dat,log,msg,sim,sta}
+# Archives the run files (com, dat, log, msg, sim, sta) into runfiles.abqz and
+# the gravity calculation products (xy, csv, grav) into
+# grav_anomaly_files.abqz, compressing on every core, then deletes the
+# un-archived copies (and ipm, lck) only once every archived file checks out.
+# Get single files back with e.g.
+#   abq_archiver.py -x foo.sta runfiles.abqz
+abq_archiver.py --delete .
 
-echo "deleting un-archived copies..."
-rm -rf *.{com,dat,ipm,log,msg,sim,sta,lck}
+#echo "archiving run files (com, dat, ipm, log, msg, sim, sta)..."
+#tar -czvf runfiles.tar.gz *.{com,dat,log,msg,sim,sta}
 
-echo "archiving gravity calculation products (xy, csv, grav)..."
-tar -czvf grav_anomaly_files.tar.gz *.{xy,csv,grav}
+#echo "deleting un-archived copies..."
+#rm -rf *.{com,dat,ipm,log,msg,sim,sta,lck}
 
-echo "deleting un-archived copies..."
-rm -rf *.{xy,csv,grav}
+#echo "archiving gravity calculation products (xy, csv, grav)..."
+#tar -czvf grav_anomaly_files.tar.gz *.{xy,csv,grav}
+
+#echo "deleting un-archived copies..."
+#rm -rf *.{xy,csv,grav}
@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+# Shared file input for the abq_* and plot_* tools, so they can read their .inp,
+# .rpt and .xy files straight out of compressed files (.gz, .bz2, .xz) and run
+# archives (abq_archiver's .abqz files, or .tar/.tar.gz/.tgz/.tar.bz2/.tar.xz
+# files) without extracting them first, and decks out of abq_dedup's stores. A
+# file inside an archive or store is named like "runs/foo/runfiles.abqz:foo.rpt"
+# or "decks.abqstore:foo_ps3.inp". Decompression happens in a background
+# thread, so it overlaps with whatever is parsing the lines.
+#
+# Plain files are read (and output files written) in big, aligned blocks by
+# background threads as well, since our decks live on network storage where
+# every small read or write is a round trip. Output goes to a temporary file
+# that only replaces the real one once it's complete, so a crash never leaves
+# a half-written deck behind.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, io, gzip, bz2, tarfile, threading, optparse
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Size of the pieces decompressed at a time, and how many can be waiting to be
+# parsed before the background thread waits
+chunk_size = 1 << 20 #bytes
+queue_depth = 8
+
+# Size of the blocks plain files are read and written in
+block_size = 4 << 20 #bytes
+
+# File endings of compressed files and archives
+compressed_suffixes = (".gz", ".bz2", ".xz")
+archive_suffixes = (".abqz", ".abqstore", ".tar", ".tar.gz", ".tgz", ".tar.bz2",
+                    ".tar.xz")
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+class ThreadedReader:
+    """
+    A read-only text file whose bytes come from a background thread, which
+    reads them out of a source of decompressed chunks. Can be looped over line
+    by line, or read with readline(), readlines() or read(), like an ordinary
+    file.
+    """
+    def __init__(self, name, chunks):
+        self.name = name
+        self.queue = queue.Queue(queue_depth)
+        self.error = None
+        self.buffer = ""
+        self.position = 0
+        self.finished = False
+        self.thread = threading.Thread(target=self._producer, args=(chunks,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _producer(self, chunks):
+        try:
+            for chunk in chunks:
+                if not isinstance(chunk, str):
+                    chunk = chunk.decode("latin-1")
+                self.queue.put(chunk)
+        except Exception as error:
+            self.error = error
+        self.queue.put(None)
+
+    def _fill(self):
+        """
+        Adds the next chunk onto the buffer, returning False at the end
+        """
+        if self.finished:
+            return False
+        chunk = self.queue.get()
+        if chunk is None:
+            self.finished = True
+            if self.error is not None:
+                raise self.error
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def readline(self):
+        while True:
+            end = self.buffer.find("\n", self.position)
+            if end >= 0:
+                line = self.buffer[self.position:end + 1]
+                self.position = end + 1
+                return line
+            if not self._fill():
+                line = self.buffer[self.position:]
+                self.buffer, self.position = "", 0
+                return line
+
+    def readlines(self):
+        return list(self)
+
+    def read(self, size=-1):
+        while (size < 0 or len(self.buffer) - self.position < size) and self._fill():
+            pass
+        end = len(self.buffer) if size < 0 else self.position + size
+        data = self.buffer[self.position:end]
+        self.position = min(end, len(self.buffer))
+        return data
+
+    def __iter__(self):
+        # Split whole chunks into lines at once, rather than a line at a time
+        while True:
+            lines = self.buffer[self.position:].split("\n")
+            self.buffer, self.position = lines.pop(), 0
+            for line in lines:
+                yield line + "\n"
+            if not self._fill():
+                break
+        if self.buffer:
+            line, self.buffer = self.buffer, ""
+            yield line
+
+    # So it also works as an iterator itself, e.g. with next()
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+    next = __next__
+
+    def close(self):
+        self.finished = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def stream_chunks(stream):
+    """
+    Reads an open binary stream a chunk at a time, closing it at the end
+    """
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.close()
+
+
+def aligned_chunks(filename):
+    """
+    Reads a plain file in whole blocks, straight from the operating system
+    (with no buffering of its own in between)
+    """
+    stream = io.open(filename, 'rb', buffering=0)
+    try:
+        while True:
+            chunk = stream.read(block_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.close()
+
+
+class ThreadedWriter:
+    """
+    A write-only text file that collects what's written to it into big blocks,
+    which a background thread writes to a temporary file next to the real one.
+    Closing it finishes the writing and renames the temporary file into place;
+    if anything goes wrong before then, the real file is never touched.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.tempname = "%s.%d.tmp"%(name, os.getpid())
+        self.pieces = []
+        self.size = 0
+        self.error = None
+        self.closed = False
+        self.queue = queue.Queue(queue_depth)
+        self.stream = io.open(self.tempname, 'wb', buffering=0)
+        self.thread = threading.Thread(target=self._consumer)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _consumer(self):
+        while True:
+            block = self.queue.get()
+            if block is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                view = memoryview(block)
+                while len(view):
+                    view = view[self.stream.write(view):]
+            except Exception as error:
+                self.error = error
+        self.stream.close()
+
+    def _send(self, final=False):
+        """
+        Hands the collected text to the writing thread, in whole blocks (all of
+        it, if this is the end)
+        """
+        data = "".join(self.pieces)
+        if not isinstance(data, bytes):
+            data = data.encode("latin-1")
+        end = len(data) if final else len(data) // block_size * block_size
+        if end:
+            self.queue.put(data[:end])
+        rest = data[end:]
+        self.pieces = [rest.decode("latin-1") if str is not bytes else rest]
+        self.size = len(rest)
+
+    def write(self, text):
+        self.pieces.append(text)
+        self.size += len(text)
+        if self.size >= block_size:
+            self._send()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._send(final=True)
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            os.remove(self.tempname)
+            raise self.error
+        os.rename(self.tempname, self.name)
+
+    def abort(self):
+        """
+        Stops writing and throws away what's been written so far
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+        os.remove(self.tempname)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def compressed_opener(filename):
+    """
+    Opens a compressed file (.gz, .bz2, or .xz) as a binary stream
+    """
+    if filename.endswith(".gz"):
+        return gzip.open(filename, 'rb')
+    elif filename.endswith(".bz2"):
+        return bz2.BZ2File(filename, 'rb')
+    elif filename.endswith(".xz"):
+        if lzma is None:
+            raise IOError("Reading %s needs the lzma module"%filename)
+        return lzma.open(filename, 'rb')
+    raise IOError("Don't know how to decompress %s"%filename)
+
+
+def archive_split(filename):
+    """
+    Splits "archive:member" into (archive, member), or returns (None, filename)
+    if it doesn't name a file in an archive
+    """
+    if ":" in filename:
+        archivename, member = filename.rsplit(":", 1)
+        if archivename.endswith(archive_suffixes) and os.path.exists(archivename):
+            return archivename, member
+    return None, filename
+
+
+def plain_name(filename):
+    """
+    The name a file would have if it had been extracted next to its archive and
+    decompressed, e.g. "runs/foo/runfiles.abqz:foo.rpt.gz" -> "runs/foo/foo.rpt".
+    This is what output file names should be made from.
+    """
+
+    archivename, filename = archive_split(filename)
+    if archivename is not None:
+        filename = os.path.join(os.path.dirname(archivename), filename)
+    for suffix in compressed_suffixes:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+    return filename
+
+
+def input_exists(filename):
+    """
+    Does this file exist, either on its own or inside an archive?
+    """
+    archivename, member = archive_split(filename)
+    if archivename is None:
+        return os.path.exists(filename)
+    if archivename.endswith(".abqz"):
+        import abq_archiver
+        return member in abq_archiver.index_reader(open(archivename, 'rb'))
+    if archivename.endswith(".abqstore"):
+        import abq_dedup
+        return member in abq_dedup.deck_lister(archivename)
+    archive = tarfile.open(archivename, 'r:*')
+    try:
+        return any(info.name == member or os.path.basename(info.name) == member
+                   for info in archive.getmembers())
+    finally:
+        archive.close()
+
+
+def tar_chunks(archivename, member):
+    """
+    Reads a file out of a tar archive a chunk at a time. The member can be
+    named by its full path in the archive, or just its file name.
+    """
+
+    archive = tarfile.open(archivename, 'r:*')
+    try:
+        for info in archive:
+            if info.name == member or os.path.basename(info.name) == member:
+                for chunk in stream_chunks(archive.extractfile(info)):
+                    yield chunk
+                return
+        raise IOError("%s is not in %s"%(member, archivename))
+    finally:
+        archive.close()
+
+
+def open_input(filename):
+    """
+    Opens a file for reading as text, wherever it is: on its own, compressed,
+    or inside an archive (possibly compressed itself). Comes back as a
+    ThreadedReader.
+    """
+
+    archivename, member = archive_split(filename)
+    if archivename is not None:
+        if member.endswith(compressed_suffixes):
+            raise IOError("Compressed files inside archives aren't supported (%s)"%filename)
+        if archivename.endswith(".abqz"):
+            import abq_archiver
+            chunks = abq_archiver.member_chunks(archivename, member, chunk_size)
+        elif archivename.endswith(".abqstore"):
+            import abq_dedup
+            chunks = abq_dedup.deck_chunks(archivename, member)
+        else:
+            chunks = tar_chunks(archivename, member)
+        return ThreadedReader(filename, chunks)
+
+    if filename.endswith(compressed_suffixes):
+        return ThreadedReader(filename, stream_chunks(compressed_opener(filename)))
+
+    # Open it here, so that a missing file is noticed straight away
+    io.open(filename, 'rb').close()
+    return ThreadedReader(filename, aligned_chunks(filename))
+
+
+def open_output(filename):
+    """
+    Opens a file for writing as text. Nothing appears under its name until it
+    has been closed.
+    """
+    return ThreadedWriter(filename)
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] file [...]   (e.g. foo.rpt.gz or runfiles.abqz:foo.sta)"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+
+    # Works like "cat", for any of the files the tools can read
+    for filename in args:
+        for line in open_input(filename):
+            sys.stdout.write(line)
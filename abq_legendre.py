@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# A program to calculate long-wavelength gravity and geoid heights for curved 2D
+# axisymmetric Abaqus models over the whole sphere. The mass of every element is
+# projected onto zonal (m = 0) Legendre polynomials, and gravity or geoid is
+# then put back together from those coefficients at as many colatitudes as
+# needed, all at once.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, hashlib, optparse
+import numpy as np
+import abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Universal gravity constant
+G = 6.67384e-11 #m3.kg-1.s-2
+
+# Reference radius for the expansion, and radius the results are reported at
+planet_radius = 1740e3 #m
+
+# Surface gravity, used to turn potential into geoid height
+gravity = 1.622 #m.s-2
+
+# Highest and lowest degrees to include. Degree 0 is the total mass and degree 1
+# just shifts the center of mass, so anomalies normally start at degree 2 (the
+# total acceleration always includes everything from degree 0 up)
+lmax = 180
+lmin = 2
+
+# Number of colatitudes, evenly spaced from the pole (0) to the antipode (180)
+num_points = 181
+
+# Each element is split into quadrature_order x quadrature_order rings
+quadrature_order = 2
+
+# Masses are projected this many at a time, and their Legendre tables are only
+# cached if the whole mesh fits in one go (keeps memory use in check for large
+# meshes)
+chunk_size = 50000
+
+# Which density from the material table goes into the masses? ("initial",
+# "final", or "average")
+grav_density = "final"
+
+# File endings for the output files
+anomaly_suffix = "_freeair.xy"
+geoid_suffix = "_geoid.xy"
+acceleration_suffix = "_acc.xy"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+# Legendre tables already worked out, keyed on degree and the points themselves
+legendre_cache = {}
+
+def legendre_table(lmax, x, cache=True):
+    """
+    Returns a (lmax+1 x points) table of the Legendre polynomials P_l(x) for
+    l = 0...lmax, using Bonnet's recurrence
+        (l+1) P_l+1(x) = (2l+1) x P_l(x) - l P_l-1(x)
+    Tables are cached, so asking again for the same points (the same mesh, or
+    the same observation colatitudes) costs nothing.
+    """
+
+    x = np.ascontiguousarray(x, dtype=float)
+    key = (lmax, hashlib.sha1(x.tobytes()).hexdigest())
+    if key in legendre_cache:
+        return legendre_cache[key]
+
+    P = np.empty((lmax + 1, len(x)))
+    P[0] = 1.0
+    if lmax > 0:
+        P[1] = x
+    for l in range(1, lmax):
+        P[l+1] = ((2*l + 1) * x * P[l] - l * P[l-1]) / (l + 1)
+
+    if cache:
+        legendre_cache[key] = P
+    return P
+
+
+def zonal_coefficients(masses, radii, colatitudes, lmax):
+    """
+    Projects point (ring) masses at the given radii and colatitudes onto zonal
+    coefficients
+        C_l = sum over masses of m (r/planet_radius)**l P_l(cos colatitude)
+    in kg, so that the exterior potential is
+        V(r, theta) = -G/r sum over l of C_l (planet_radius/r)**l P_l(cos theta)
+    """
+
+    coefficients = np.zeros(lmax + 1)
+    degrees = np.arange(lmax + 1)[:, None]
+    cache = len(masses) <= chunk_size
+
+    for start in range(0, len(masses), chunk_size):
+        stop = start + chunk_size
+        P = legendre_table(lmax, np.cos(colatitudes[start:stop]), cache)
+        powers = (radii[start:stop] / planet_radius)[None, :] ** degrees
+        coefficients += np.dot(P * powers, masses[start:stop])
+
+    return coefficients
+
+
+def zonal_synthesizer(coefficients, colatitudes, radius, quantity, lmin=0):
+    """
+    Puts gravity or geoid back together from zonal coefficients at any number of
+    colatitudes on a sphere of the given radius. The quantity is "acceleration"
+    (downward gravity, m.s-2), "anomaly" (the same, in mGal) or "geoid"
+    (height, m).
+    """
+
+    lmax = len(coefficients) - 1
+    l = np.arange(lmax + 1)
+    P = legendre_table(lmax, np.cos(colatitudes))
+    scale = coefficients * (planet_radius / radius)**l
+    scale[:lmin] = 0.0
+
+    if quantity == "geoid":
+        return G / (radius * gravity) * np.dot(scale, P)
+    g = G / radius**2 * np.dot(scale * (l + 1), P)
+    if quantity == "anomaly":
+        return g * 1e5 #mGal
+    return g
+
+
+def model_coefficients(inpfilename, mattable_filename=None):
+    """
+    Reads the mesh and densities of one model and works out its zonal
+    coefficients
+    """
+
+    mesh = abq_mesh.mesh_loader(inpfilename)
+    labels, centroids, areas, ring_volumes = abq_mesh.element_geometry(mesh)
+
+    # Densities come from the material table if there is one, otherwise from
+    # the .inp file itself
+    densities = None
+    if mattable_filename:
+        densities = abq_mesh.mattable_densities(mattable_filename, grav_density)
+    masses = abq_mesh.element_densities(mesh, labels, densities) * ring_volumes
+
+    # Spread each element's mass over its quadrature points, and turn those
+    # into spherical coordinates (the axis of symmetry is the pole)
+    points, fractions = abq_mesh.element_quadrature(mesh, quadrature_order)
+    point_masses = (masses[:, None] * fractions).ravel()
+    r = points[:, :, 0].ravel()
+    z = points[:, :, 1].ravel()
+
+    return zonal_coefficients(point_masses, np.hypot(r, z), np.arctan2(r, z),
+                              lmax)
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp [bar.inp ...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-n",type="int",dest="num_points",default=None,
+                      help="number of colatitudes, from 0 to 180 degrees")
+    parser.add_option("-l","--lmax",type="int",dest="lmax",default=None,
+                      help="highest degree in the expansion [%d]"%lmax)
+    parser.add_option("--lmin",type="int",dest="lmin",default=None,
+                      help="lowest degree in anomalies and geoids [%d]"%lmin)
+    parser.add_option("-m","--mattable",dest="mattable_filename",default=None,
+                      help="take densities from this material table instead "
+                           "of the .inp file")
+    parser.add_option("-g","--grav_density",dest="grav_density",default=None,
+                      help="which material table density to use (\"initial\", "
+                           "\"average\", or [\"final\"])")
+    parser.add_option("--acceleration",action="store_true",
+                      dest="acceleration",default=False,
+                      help="write out the total acceleration, e.g. to use as "
+                           "a geoid model")
+    parser.add_option("--geoid",action="store_true",
+                      dest="geoid",default=False,
+                      help="write out geoid heights instead of gravity anomalies")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.num_points:
+        num_points = options.num_points
+    if options.lmax:
+        lmax = options.lmax
+    if options.lmin is not None:
+        lmin = options.lmin
+    if options.grav_density:
+        grav_density = options.grav_density
+
+    if len(args) < 1:
+        print("ERROR: Please specify at least one .inp file")
+        sys.exit()
+
+    if options.acceleration:
+        quantity, suffix, lowest = "acceleration", acceleration_suffix, 0
+    elif options.geoid:
+        quantity, suffix, lowest = "geoid", geoid_suffix, lmin
+    else:
+        quantity, suffix, lowest = "anomaly", anomaly_suffix, lmin
+
+    # Every model shares the same colatitudes, so their Legendre table is only
+    # worked out once
+    colatitudes = np.linspace(0.0, np.pi, num_points)
+    distance = colatitudes * planet_radius / 1000.0
+
+    for inpfilename in args:
+        if verbose_mode:
+            print("Reading file %s..."%inpfilename)
+        try:
+            coefficients = model_coefficients(inpfilename, options.mattable_filename)
+        except KeyError as error:
+            print("ERROR: %s"%error.args[0])
+            sys.exit()
+        values = zonal_synthesizer(coefficients, colatitudes, planet_radius,
+                                   quantity, lowest)
+
+        xyfilename = os.path.splitext(abq_fileio.plain_name(inpfilename))[0] + suffix
+        if verbose_mode:
+            print("Generating xy file %s..."%xyfilename)
+        xyfile = open(xyfilename, 'w')
+        for x, value in zip(distance, values):
+            xyfile.write("%14f %14.8g\n"%(x, value))
+        xyfile.close()
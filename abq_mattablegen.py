@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# A program to write the material table abq_applymattable.py reads, instead of
+# filling in the one start_material_file (in abq_modeling_helpers.py) starts by
+# hand. For every material in a model it works out:
+#   Depth   - the depth of the top of the material's elements
+#   Temp_i  - the mean temperature of its elements in an initial thermal state
+#   Temp_f  - the same, in a final thermal state
+#   Dens_i, Dens_f - the density at each of those temperatures, from a
+#             reference density and linear expansivity (Alpha_l)
+# with the temperatures coming from nodal temperature reports (see
+# abq_tempic.py for the ways they can be matched to the model's nodes), e.g.
+#   abq_mattablegen.py foo.inp foo_initial.NTrpt foo_final.NTrpt
+#   abq_mattablegen.py -p -c foo.inp bar.inp hot_i.NTrpt hot_f.NTrpt cold_i.NTrpt cold_f.NTrpt
+# The second makes a table for every model (foo, bar) in every thermal
+# scenario (hot, cold), named after both: foo_hot_mat.txt, and so on.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, re, optparse
+import numpy as np
+import abq_mesh, abq_probe, abq_tempic, abq_transfer, abq_boundaries, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Reference density (kg/m^3) and linear thermal expansivity (1/K) of each kind
+# of material, by the start of its name (the longest match wins), and the
+# temperature the reference densities are at
+reference_properties = {"CRUST": (2550.0, 3e-5),
+                        "MANTLE": (3300.0, 3e-5),
+                        "POOL": (3200.0, 3e-5)}
+reference_temperature = 300.0 #K
+
+# Is the model curved? (Depths are measured from the outermost radius in
+# curved models, and from the highest point in flat ones)
+curved_mode = False
+
+# File ending for the material tables
+mattable_suffix = "_mat.txt"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def properties_parser(propfile):
+    """
+    Reads reference properties from a file, one kind of material per line:
+    name prefix, reference density, linear expansivity
+    """
+    properties = {}
+    for line in propfile:
+        values = line.split()
+        if not values or values[0].startswith("#"):
+            continue
+        properties[values[0].upper()] = (float(values[1]), float(values[2]))
+    return properties
+
+
+def material_namer(inpfilename):
+    """
+    The material names in an .inp file as they're written there (abq_mesh
+    upper-cases them, but the material table has to match the deck), by their
+    upper-case names
+    """
+    text = abq_fileio.open_input(inpfilename).read()
+    names = re.findall(r"^\*Material,\s*name=([^,\n]+)", text, re.M | re.I)
+    return dict((name.strip().upper(), name.strip()) for name in names)
+
+
+def material_averager(mesh, temperatures):
+    """
+    Averages nodal temperatures over every material's elements, weighted by
+    element (ring) volume, for any number of thermal states at once (a column
+    of temperatures per state). Returns the material names, their mean
+    temperatures (materials x states), and the depth of the top of each.
+    """
+
+    labels, centroids, volumes = abq_transfer.element_centroids(mesh)
+    conn = mesh.elements()[2]
+    coords = np.asarray(mesh.coords, dtype=float)
+    materials = abq_boundaries.element_materials(mesh, labels)
+    names, which = np.unique(materials, return_inverse=True)
+    which = which.ravel()
+
+    # Element temperatures are the mean of their (distinct) corners'
+    distinct = np.ones(conn.shape, dtype=bool)
+    for i in range(1, conn.shape[1]):
+        distinct[:, i] = ~np.any(conn[:, i:i+1] == conn[:, :i], axis=1)
+    element_temperatures = (temperatures[conn]*distinct[:, :, None]).sum(axis=1) / \
+                           distinct.sum(axis=1)[:, None]
+
+    # Volume-weighted means over each material, leaving out elements without
+    # a temperature
+    means = np.zeros((len(names), temperatures.shape[1]))
+    for state in range(temperatures.shape[1]):
+        known = ~np.isnan(element_temperatures[:, state])
+        weights = np.bincount(which[known], volumes[known], minlength=len(names))
+        sums = np.bincount(which[known], volumes[known]*element_temperatures[known, state],
+                           minlength=len(names))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[:, state] = sums / weights
+
+    # The top of each material: its shallowest node
+    if curved_mode:
+        heights = np.sqrt((coords**2).sum(axis=1))
+    else:
+        heights = coords[:, -1]
+    depths = heights.max() - heights[conn].max(axis=1)
+    tops = np.zeros(len(names)) + np.inf
+    np.minimum.at(tops, which, depths)
+
+    return names, means, tops
+
+
+def density_calculator(names, temperatures, properties):
+    """
+    Densities of materials at temperatures (materials x states), from the
+    reference properties of the longest matching name prefix:
+    rho = rho_ref * (1 - 3*alpha_l*(T - T_ref)). Returns the densities and the
+    expansivities, with NaN for materials that don't match any prefix.
+    """
+    reference = np.zeros(len(names)) + np.nan
+    alpha = np.zeros(len(names)) + np.nan
+    for prefix in sorted(properties, key=len):
+        matches = np.array([name.startswith(prefix.upper()) for name in names], dtype=bool)
+        reference[matches], alpha[matches] = properties[prefix]
+    densities = reference[:, None] * \
+        (1 - 3*alpha[:, None]*(temperatures - reference_temperature))
+    return densities, alpha
+
+
+def mattable_writer(mattable, names, depths, Ti, densi, Tf, densf, alpha_l):
+    """
+    Writes a material table in the layout start_material_file begins and
+    abq_applymattable reads
+    """
+    mattable.write("%-15s %-11s %-11s %-11s %-11s %-11s %-11s\n"%(
+                   "Region", "Depth", "Temp_i", "Dens_i", "Temp_f", "Dens_f",
+                   "Alpha_l"))
+    for row in zip(names, depths, Ti, densi, Tf, densf, alpha_l):
+        mattable.write("%-15s %-11.6g %-11.6g %-11.6g %-11.6g %-11.6g %-11.6g\n"%row)
+
+
+def scenario_namer(initial_name, final_name):
+    """
+    A short name for a thermal scenario, from what its two report names have
+    in common at the start (e.g. hot_i.NTrpt and hot_f.NTrpt -> "hot")
+    """
+    initial = os.path.splitext(os.path.basename(abq_fileio.plain_name(initial_name)))[0]
+    final = os.path.splitext(os.path.basename(abq_fileio.plain_name(final_name)))[0]
+    common = os.path.commonprefix([initial, final]).rstrip("_-.")
+    return common or initial
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp [bar.inp ...] initial.NTrpt final.NTrpt " \
+            "[initial2.NTrpt final2.NTrpt ...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-r","--reference",dest="reference",default=None,
+                      help="file of reference properties: name prefix, "
+                           "density, linear expansivity (one per line)")
+    parser.add_option("-T","--reference_temperature",type="float",
+                      dest="reference_temperature",default=None,
+                      help="temperature of the reference densities [%g K]"%
+                           reference_temperature)
+    parser.add_option("-p","--position",action="store_true",
+                      dest="position",default=False,
+                      help="match nodes to the reports by position (COORD1, "
+                           "COORD2, NT) instead of by label")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved",default=False,
+                      help="the models are curved (and, with -p, the report "
+                           "coordinates are radius and angle)")
+    parser.add_option("-t","--thermal",dest="thermal",default=None,
+                      help="the .inp file of the thermal model the reports "
+                           "came from, to interpolate on")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.curved:
+        curved_mode = True
+        abq_tempic.curved_mode = True
+    abq_tempic.verbose_mode = verbose_mode
+    if options.reference:
+        reference_properties = properties_parser(abq_fileio.open_input(options.reference))
+    if options.reference_temperature is not None:
+        reference_temperature = options.reference_temperature
+    mapping = "thermal" if options.thermal else "position" if options.position else "label"
+
+    # Models, then pairs of reports (initial, final) for each thermal scenario
+    inpfilenames = [name for name in args if abq_fileio.plain_name(name).upper().endswith(".INP")]
+    rptfilenames = [name for name in args if name not in inpfilenames]
+    if not inpfilenames or not rptfilenames or len(rptfilenames) % 2:
+        print("ERROR: Please specify one or more .inp files, then an initial and a "
+              "final temperature report for each thermal scenario")
+        sys.exit()
+    scenarios = list(zip(rptfilenames[0::2], rptfilenames[1::2]))
+
+    # Every report is only read once, however many models there are
+    reports = {}
+    for name in rptfilenames:
+        if verbose_mode:
+            print("Reading file %s..."%name)
+        reports[name] = abq_probe.rptfile_parser_nodal(abq_fileio.open_input(name))
+    thermal_mesh = abq_mesh.mesh_loader(options.thermal) if options.thermal else None
+
+    for inpfilename in inpfilenames:
+        if verbose_mode:
+            print("Reading file %s..."%inpfilename)
+        mesh = abq_mesh.mesh_loader(inpfilename)
+        deck_names = material_namer(inpfilename)
+
+        # Each scenario's initial and final temperatures, side by side
+        temperatures = np.column_stack([
+            abq_tempic.temperature_mapper(mesh, reports[name][0], reports[name][1],
+                                          mapping, thermal_mesh)
+            for name in rptfilenames])
+        names, means, tops = material_averager(mesh, temperatures)
+        densities, alpha = density_calculator(names, means, reference_properties)
+
+        unmatched = [name for name, value in zip(names, alpha) if np.isnan(value)]
+        if unmatched:
+            print("WARNING: No reference properties for %s; left out of the table"%
+                  ", ".join(name or "(elements without a section)" for name in unmatched))
+        keep = ~np.isnan(alpha)
+
+        basename = os.path.splitext(abq_fileio.plain_name(inpfilename))[0]
+        for i, (initial_name, final_name) in enumerate(scenarios):
+            if len(scenarios) > 1:
+                outfilename = "%s_%s%s"%(basename, scenario_namer(initial_name, final_name),
+                                         mattable_suffix)
+            else:
+                outfilename = basename + mattable_suffix
+            if verbose_mode:
+                print("Creating (or overwriting!) file %s..."%outfilename)
+            with abq_fileio.open_output(outfilename) as mattable:
+                mattable_writer(mattable, [deck_names.get(name, name) for name in names[keep]],
+                                tops[keep], means[keep, 2*i], densities[keep, 2*i],
+                                means[keep, 2*i + 1], densities[keep, 2*i + 1], alpha[keep])
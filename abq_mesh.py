@@ -0,0 +1,654 @@
+#!/usr/bin/env python
+# A module for reading the mesh geometry (nodes, elements, element sets and the
+# sections/materials assigned to them) out of an Abaqus .inp file, so that other
+# programs can answer spatial questions without going back to CAE
+#
+# The *Node and *Element blocks are turned into NumPy arrays a whole block at a
+# time, rather than a line at a time, so even a deck with a million elements
+# only takes a few seconds. The mesh can also be cached in a binary file next
+# to the deck (foo.inp.meshcache), which is memory-mapped when it's loaded
+# again, so tools that only need part of a big mesh never read the rest of it.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+from math import pi
+import sys, os, re, json, struct, time, optparse
+import numpy as np
+import abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Axisymmetric element types we know how to deal with, and the number of corner
+# nodes each of them has (only corner nodes are used for the geometry)
+axisymmetric_corners = {"CAX3": 3, "CAX4": 4, "CAX6": 3, "CAX8": 4}
+
+# The same for 3D solid elements. Tetrahedra and wedges are treated as
+# hexahedra with some corners repeated (these are the corners of each, in
+# hexahedron order).
+solid_corners = {"C3D4": 4, "C3D6": 6, "C3D8": 8, "C3D10": 4, "C3D15": 6,
+                 "C3D20": 8}
+hexahedron_corners = {4: [0, 1, 2, 2, 3, 3, 3, 3],
+                      6: [0, 1, 2, 2, 3, 4, 5, 5],
+                      8: [0, 1, 2, 3, 4, 5, 6, 7]}
+
+# Write a cache of the mesh next to the deck whenever one is read? (An
+# up-to-date cache is always used if it's there.)
+cache_mode = False
+cache_suffix = ".meshcache"
+
+# Print out extra text while running?
+verbose_mode = True
+
+# Marks the end of every cache file
+cache_magic = b"ABQMESH1"
+footer_format = "<QQ8s"
+
+
+######## Main Program ##########################################################
+
+class Mesh:
+    """
+    A container to hold the geometry of a single-part model: node labels and
+    coordinates, element labels and connectivity (per element type), element
+    sets, and the section/material assignments
+    """
+    def __init__(self):
+        self.part_name = ""
+        self.instance_name = ""
+        self.node_ids = np.zeros(0, dtype=int)
+        self.coords = np.zeros((0, 2))
+        self.blocks = []        # (element type, element labels, connectivity)
+        self.elsets = {}        # set name (upper case) -> element labels
+        self.sections = {}      # set name (upper case) -> material name
+        self.densities = {}     # material name (upper case) -> density
+
+    def elements(self, corners_only=True):
+        """
+        Returns the labels, types and connectivity (as node rows, not labels) of
+        every element. Axisymmetric elements come back as four corners, with
+        triangles padded out by repeating their last corner; 3D elements come
+        back as the eight corners of a hexahedron.
+        """
+        row_of = self.node_rows()
+        labels = []
+        types = []
+        conns = []
+        for (etype, ids, conn) in self.blocks:
+            base = element_basetype(etype)
+            if self.coords.shape[1] == 3 and base in solid_corners:
+                corners = conn[:, hexahedron_corners[solid_corners[base]]]
+            elif self.coords.shape[1] == 2 and base in axisymmetric_corners:
+                corners = conn[:, :axisymmetric_corners[base]]
+                if corners.shape[1] == 3:
+                    corners = np.column_stack((corners, corners[:, 2]))
+            else:
+                print("ERROR: Element type %s is not supported"%etype)
+                sys.exit()
+            labels.append(ids)
+            types.extend([etype]*len(ids))
+            conns.append(row_of(corners))
+        return np.concatenate(labels), types, np.concatenate(conns)
+
+    def node_rows(self):
+        """
+        Returns a function that turns node labels into rows of self.coords
+        """
+        return id_mapper(self.node_ids)
+
+    def element_rows(self):
+        """
+        Returns a function that turns element labels into rows of what
+        elements() returns
+        """
+        return id_mapper(np.concatenate([ids for (etype, ids, conn) in self.blocks]))
+
+
+def id_mapper(ids):
+    """
+    Returns a function that turns labels into their rows in an array of labels.
+    Labels are usually numbered more or less 1..N, in which case this is just
+    a lookup table; if they're spread out too thinly for that, they're looked
+    up by binary search instead. Labels that aren't in the array raise a
+    KeyError naming them.
+    """
+    ids = np.asarray(ids)
+    if len(ids) and ids.min() >= 0 and ids.max() < 4*len(ids) + 1024:
+        table = np.empty(ids.max() + 1, dtype=int)
+        table.fill(-1)
+        table[ids] = np.arange(len(ids))
+        def row_of(labels):
+            labels = np.asarray(labels)
+            inside = (labels >= 0) & (labels < len(table))
+            rows = table[np.where(inside, labels, 0)]
+            missing_checker(labels, inside & (rows >= 0))
+            return rows
+        return row_of
+    order = np.argsort(ids)
+    sorted_ids = ids[order]
+    def row_of(labels):
+        labels = np.asarray(labels)
+        positions = np.minimum(np.searchsorted(sorted_ids, labels), max(len(ids) - 1, 0))
+        missing_checker(labels, sorted_ids[positions] == labels if len(ids) else
+                        np.zeros(labels.shape, dtype=bool))
+        return order[positions]
+    return row_of
+
+
+def missing_checker(labels, found):
+    """
+    Raises a KeyError naming the labels that weren't found (the first few of
+    them, if there are lots)
+    """
+    if not np.all(found):
+        missing = np.unique(labels[~np.asarray(found, dtype=bool)])
+        raise KeyError("%d label(s) not in the mesh: %s%s"%(
+            len(missing), ", ".join("%d"%label for label in missing[:10]),
+            ", ..." if len(missing) > 10 else ""))
+
+
+def element_basetype(etype):
+    """
+    Strips the reduced-integration/hybrid/etc. letters off the end of an
+    element type, e.g. CAX4RH -> CAX4
+    """
+    etype = etype.upper()
+    while etype and etype[-1].isalpha():
+        etype = etype[:-1]
+    return etype
+
+
+def keyword_parameters(line):
+    """
+    Splits a *KEYWORD line into its keyword and a dictionary of its parameters,
+    e.g. "*Elset, elset=foo, generate" -> ("*ELSET", {"ELSET":"foo",
+    "GENERATE":""})
+    """
+    pieces = [piece.strip() for piece in line.strip().split(",")]
+    parameters = {}
+    for piece in pieces[1:]:
+        if "=" in piece:
+            name, value = piece.split("=", 1)
+            parameters[name.strip().upper()] = value.strip()
+        elif piece:
+            parameters[piece.upper()] = ""
+    return pieces[0].upper(), parameters
+
+
+def values_parser(text, dtype=float):
+    """
+    Turns a block of comma-separated data lines into one flat array of numbers,
+    all at once
+    """
+    if not text.strip():
+        return np.zeros(0, dtype=dtype)
+    return np.fromstring(text.replace(",", " "), dtype=dtype, sep=" ")
+
+
+def record_width(text):
+    """
+    The number of values in the first record of a block of data lines. A
+    record carries on over the next line as long as its line ends in a comma
+    (as with 20-node bricks).
+    """
+    width = 0
+    for line in text.lstrip().splitlines():
+        width += len([value for value in line.split(",") if value.strip()])
+        if not line.rstrip().endswith(","):
+            break
+    return width
+
+
+def table_parser(text, dtype=float):
+    """
+    Turns a block of data lines into a table with one row per record
+    """
+    width = record_width(text)
+    values = values_parser(text, dtype)
+    if width == 0 or len(values) % width:
+        raise ValueError("Can't read the data lines starting %r"%text.lstrip()[:60])
+    return values.reshape(-1, width)
+
+
+# Keyword (and comment) lines, which split the file up into blocks of data
+keyword_line = re.compile(r"^\*.*$", re.M)
+
+def data_blocks(text):
+    """
+    Splits the text of a whole .inp file up at its keyword (and comment) lines.
+    Returns a list of (data lines, the keyword line after them), starting with
+    whatever comes before the first keyword and ending with (data lines,
+    None).
+    """
+    blocks = []
+    start = 0
+    for match in keyword_line.finditer(text):
+        blocks.append((text[start:match.start()], match.group(0)))
+        start = match.end()
+    blocks.append((text[start:], None))
+    return blocks
+
+
+def inpfile_parser(inpfile):
+    """
+    Goes through an Abaqus .inp file and grabs the node coordinates, element
+    connectivity, element sets, section assignments and material densities
+    """
+
+    mesh = Mesh()
+    nodes = []
+    elements = {}           # element type -> list of connectivity tables
+    elsets = {}             # set name -> list of arrays of labels
+    section = None          # what the data lines we're reading belong to
+    this_set = None
+    this_material = None
+    generate = False
+
+    # Everything between one keyword line and the next is a block of data
+    # lines, which is read in one go
+    for data, line in data_blocks(inpfile.read()):
+
+        # Data lines
+        if data.strip():
+            if section == "node":
+                nodes.append(table_parser(data))
+            elif section == "element":
+                table = table_parser(data, int)
+                elements[this_type].append(table)
+                if this_set is not None:
+                    elsets[this_set].append(table[:, 0])
+            elif section == "elset":
+                if generate:
+                    for values in data.strip().splitlines():
+                        values = [int(value) for value in values.split(",")
+                                  if value.strip()]
+                        step = values[2] if len(values) > 2 else 1
+                        elsets[this_set].append(np.arange(values[0], values[1] + 1, step))
+                elif re.search("[A-Za-z_]", data):
+                    # Sets made of other sets (see abq_sets for more on these)
+                    for value in data.replace("\n", ",").split(","):
+                        value = value.strip()
+                        if value[:1].isdigit():
+                            elsets[this_set].append(np.array([int(value)]))
+                        elif value.upper() in elsets:
+                            elsets[this_set].extend(elsets[value.upper()])
+                else:
+                    elsets[this_set].append(values_parser(data, int))
+            elif section == "density":
+                mesh.densities[this_material] = float(data.split(",")[0])
+                section = None
+
+        # Keyword lines decide what the following data lines mean (comments
+        # don't change anything)
+        if line is None or line.startswith("**"):
+            continue
+        keyword, parameters = keyword_parameters(line)
+        section = None
+
+        if keyword == "*PART":
+            mesh.part_name = parameters.get("NAME", "")
+        elif keyword == "*INSTANCE":
+            mesh.instance_name = parameters.get("NAME", "")
+        elif keyword == "*NODE":
+            section = "node"
+        elif keyword == "*ELEMENT":
+            section = "element"
+            this_type = parameters["TYPE"].upper()
+            elements.setdefault(this_type, [])
+            if "ELSET" in parameters:
+                this_set = parameters["ELSET"].upper()
+                elsets.setdefault(this_set, [])
+            else:
+                this_set = None
+        elif keyword == "*ELSET":
+            section = "elset"
+            this_set = parameters["ELSET"].upper()
+            generate = "GENERATE" in parameters
+            elsets.setdefault(this_set, [])
+        elif keyword == "*SOLID SECTION":
+            mesh.sections[parameters["ELSET"].upper()] = \
+                parameters["MATERIAL"].upper()
+        elif keyword == "*MATERIAL":
+            this_material = parameters["NAME"].upper()
+        elif keyword == "*DENSITY":
+            section = "density"
+
+    # Pack everything up into arrays
+    if nodes:
+        nodes = np.concatenate(nodes)
+        mesh.node_ids = nodes[:, 0].astype(int)
+        mesh.coords = np.ascontiguousarray(nodes[:, 1:])
+    for this_type in elements:
+        block = np.concatenate(elements[this_type])
+        mesh.blocks.append((this_type, np.ascontiguousarray(block[:, 0]),
+                            np.ascontiguousarray(block[:, 1:])))
+    for this_set in elsets:
+        members = elsets[this_set]
+        mesh.elsets[this_set] = np.unique(np.concatenate(members)) \
+                                if members else np.zeros(0, dtype=int)
+
+    return mesh
+
+
+def cache_filename(inpfilename):
+    """
+    Where the cache for a deck goes: next to it (or next to its archive)
+    """
+    return abq_fileio.plain_name(inpfilename) + cache_suffix
+
+
+def source_signature(inpfilename):
+    """
+    Something that changes whenever a deck (or the archive it's in) does
+    """
+    archivename, member = abq_fileio.archive_split(inpfilename)
+    stat = os.stat(archivename or inpfilename)
+    return "%s:%d:%.6f"%(member, stat.st_size, stat.st_mtime)
+
+
+def cache_writer(filename, mesh, signature):
+    """
+    Writes a mesh into a cache file: the arrays one after another (each
+    starting on a 64-byte boundary, so they can be memory-mapped), then a JSON
+    header saying where they are, then a footer saying where the header is.
+    The file is written under a temporary name and renamed once it's complete.
+    """
+
+    arrays = [("node_ids", mesh.node_ids), ("coords", mesh.coords)]
+    for i, (etype, ids, conn) in enumerate(mesh.blocks):
+        arrays.append(("block%d_ids"%i, ids))
+        arrays.append(("block%d_conn"%i, conn))
+    set_names = sorted(mesh.elsets)
+    for i, name in enumerate(set_names):
+        arrays.append(("elset%d"%i, mesh.elsets[name]))
+
+    header = {"signature": signature, "part_name": mesh.part_name,
+              "instance_name": mesh.instance_name,
+              "block_types": [etype for (etype, ids, conn) in mesh.blocks],
+              "elsets": set_names, "sections": mesh.sections,
+              "densities": mesh.densities, "arrays": {}}
+
+    tempname = "%s.%d.tmp"%(filename, os.getpid())
+    outfile = open(tempname, 'wb')
+    for name, array in arrays:
+        array = np.ascontiguousarray(array)
+        outfile.write(b"\0"*(-outfile.tell() % 64))
+        header["arrays"][name] = {"offset": outfile.tell(), "dtype": array.dtype.str,
+                                  "shape": list(array.shape)}
+        outfile.write(array.tobytes())
+    header_offset = outfile.tell()
+    header_bytes = json.dumps(header).encode("utf-8")
+    outfile.write(header_bytes)
+    outfile.write(struct.pack(footer_format, header_offset, len(header_bytes),
+                              cache_magic))
+    outfile.close()
+    os.rename(tempname, filename)
+
+
+def cache_reader(filename, signature=None):
+    """
+    Loads a mesh from a cache file, with its arrays memory-mapped rather than
+    read in. Returns None if the file isn't a cache, or if it was made from a
+    different version of the deck than the signature given.
+    """
+
+    cachefile = open(filename, 'rb')
+    footer_size = struct.calcsize(footer_format)
+    cachefile.seek(0, os.SEEK_END)
+    if cachefile.tell() < footer_size:
+        return None
+    cachefile.seek(-footer_size, os.SEEK_END)
+    header_offset, header_length, magic = struct.unpack(
+        footer_format, cachefile.read(footer_size))
+    if magic != cache_magic:
+        return None
+    cachefile.seek(header_offset)
+    header = json.loads(cachefile.read(header_length).decode("utf-8"))
+    cachefile.close()
+    if signature is not None and header["signature"] != signature:
+        return None
+
+    def array_loader(name):
+        entry = header["arrays"][name]
+        shape = tuple(entry["shape"])
+        if not np.prod(shape):
+            return np.zeros(shape, dtype=entry["dtype"])
+        return np.memmap(filename, dtype=entry["dtype"], mode='r',
+                         offset=entry["offset"], shape=shape)
+
+    mesh = Mesh()
+    mesh.part_name = header["part_name"]
+    mesh.instance_name = header["instance_name"]
+    mesh.node_ids = array_loader("node_ids")
+    mesh.coords = array_loader("coords")
+    for i, etype in enumerate(header["block_types"]):
+        mesh.blocks.append((etype, array_loader("block%d_ids"%i),
+                            array_loader("block%d_conn"%i)))
+    for i, name in enumerate(header["elsets"]):
+        mesh.elsets[name] = array_loader("elset%d"%i)
+    mesh.sections = header["sections"]
+    mesh.densities = header["densities"]
+    return mesh
+
+
+def mesh_loader(inpfilename):
+    """
+    Reads the mesh from a deck (see inpfile_parser), using its cache instead if
+    there's an up-to-date one, and writing one if cache_mode is on
+    """
+
+    filename = cache_filename(inpfilename)
+    signature = source_signature(inpfilename)
+    if os.path.exists(filename):
+        mesh = cache_reader(filename, signature)
+        if mesh is not None:
+            if verbose_mode:
+                print("Using cached mesh %s..."%filename)
+            return mesh
+
+    mesh = inpfile_parser(abq_fileio.open_input(inpfilename))
+    if cache_mode:
+        cache_writer(filename, mesh, signature)
+    return mesh
+
+
+def element_geometry(mesh):
+    """
+    Calculates the centroid and (r-z plane) area of every element of a 2D
+    axisymmetric mesh, plus the volume of the ring it sweeps out around the
+    axis of symmetry. Returns (labels, centroids, areas, ring volumes).
+    """
+
+    labels, types, conn = mesh.elements()
+    x = mesh.coords[conn, 0]
+    y = mesh.coords[conn, 1]
+
+    # Shoelace formula for the area and centroid of each (quad or degenerate
+    # quad) element, all at once
+    x_next = np.roll(x, -1, axis=1)
+    y_next = np.roll(y, -1, axis=1)
+    cross = x*y_next - x_next*y
+    areas = cross.sum(axis=1) / 2.0
+    centroid_x = ((x + x_next)*cross).sum(axis=1) / (6.0*areas)
+    centroid_y = ((y + y_next)*cross).sum(axis=1) / (6.0*areas)
+    areas = np.abs(areas)
+
+    # Pappus's theorem gives the volume of the ring each element sweeps out
+    ring_volumes = 2*pi * centroid_x * areas
+
+    return labels, np.column_stack((centroid_x, centroid_y)), areas, ring_volumes
+
+
+def element_volumes(mesh):
+    """
+    Calculates the centroid and volume of every element of a 3D mesh. Each
+    element is treated as a (possibly degenerate) trilinear hexahedron, and
+    integrated with 2x2x2 Gauss points, which is exact for that shape. Returns
+    (labels, centroids, volumes).
+    """
+
+    labels, types, conn = mesh.elements()
+    xyz = mesh.coords[conn]         # elements x 8 corners x 3
+
+    # Trilinear shape function derivatives at each Gauss point
+    g = 1/np.sqrt(3.0)
+    signs = np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                      [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]], dtype=float)
+    volumes = np.zeros(len(labels))
+    moments = np.zeros((len(labels), 3))
+    for point in signs*g:
+        terms = 1 + signs*point                     # 8 corners x 3
+        N = terms.prod(axis=1) / 8.0
+        dN = np.empty((8, 3))
+        for i in range(3):
+            others = [j for j in range(3) if j != i]
+            dN[:, i] = signs[:, i] * terms[:, others].prod(axis=1) / 8.0
+        jacobian = np.einsum("eki,kj->eij", xyz, dN)
+        det = np.linalg.det(jacobian)
+        volumes += det
+        moments += det[:, None] * np.dot(N, xyz)
+    centroids = moments / volumes[:, None]
+
+    return labels, centroids, np.abs(volumes)
+
+
+def element_quadrature(mesh, order=2):
+    """
+    Splits every element of a 2D axisymmetric mesh into order x order Gauss
+    points, for integrating things over the element more accurately than just
+    using its centroid. Returns the (elements x points x 2) coordinates of the
+    points, and the fraction of each element's ring volume each one stands for.
+    """
+
+    labels, types, conn = mesh.elements()
+    x = mesh.coords[conn, 0]
+    y = mesh.coords[conn, 1]
+
+    # Gauss points and weights on [-1, 1], combined into a 2D rule
+    xi, w = np.polynomial.legendre.leggauss(order)
+    xi, eta = [grid.ravel() for grid in np.meshgrid(xi, xi)]
+    w = np.outer(w, w).ravel()
+
+    # Bilinear shape functions and their derivatives at each Gauss point
+    # (triangles are quads with a repeated corner, which still works)
+    N = 0.25 * np.array([(1-xi)*(1-eta), (1+xi)*(1-eta),
+                         (1+xi)*(1+eta), (1-xi)*(1+eta)])
+    dN_dxi = 0.25 * np.array([-(1-eta), (1-eta), (1+eta), -(1+eta)])
+    dN_deta = 0.25 * np.array([-(1-xi), -(1+xi), (1+xi), (1-xi)])
+
+    points_x = np.dot(x, N)
+    points_y = np.dot(y, N)
+    jacobian = np.dot(x, dN_dxi)*np.dot(y, dN_deta) - \
+               np.dot(x, dN_deta)*np.dot(y, dN_dxi)
+
+    # Each point's share of the ring volume goes with r * |J| * w
+    weights = np.abs(points_x * jacobian) * w
+    fractions = weights / weights.sum(axis=1)[:, None]
+
+    return np.dstack((points_x, points_y)), fractions
+
+
+def mattable_densities(mattable_filename, which="final"):
+    """
+    Reads a material table (see abq_applymattable) and returns a dictionary of
+    material name -> density, using the "initial", "final", or "average" density
+    """
+
+    import abq_applymattable
+    materials = abq_applymattable.mattable_parser(abq_fileio.open_input(mattable_filename))
+
+    densities = {}
+    for name in materials:
+        if which == "initial":
+            densities[name] = materials[name].densi
+        elif which == "final":
+            densities[name] = materials[name].densf
+        elif which == "average":
+            densities[name] = (materials[name].densi +
+                               materials[name].densf) / 2.0
+    return densities
+
+
+def element_densities(mesh, labels, densities=None):
+    """
+    Looks up the density of each element (in the order given by labels) using
+    the section assignments. Densities come from the .inp file itself, unless a
+    dictionary of material name -> density is given (e.g. from a material
+    table). Elements without a section get a density of zero. A set with
+    elements that aren't in labels raises a KeyError naming the set.
+    """
+
+    if densities is None:
+        densities = mesh.densities
+    densities = dict((name.upper(), value) for name, value in densities.items())
+
+    element_density = np.zeros(len(labels))
+    row_of = id_mapper(labels)
+    for this_set in mesh.sections:
+        this_material = mesh.sections[this_set]
+        if this_set not in mesh.elsets:
+            print("WARNING: Section set %s not found in .inp file"%this_set)
+            continue
+        if this_material not in densities:
+            print("WARNING: No density for material %s"%this_material)
+            continue
+        try:
+            rows = row_of(mesh.elsets[this_set])
+        except KeyError as error:
+            raise KeyError("Element set %s: %s"%(this_set, error.args[0]))
+        element_density[rows] = densities[this_material]
+
+    return element_density
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-c","--cache",action="store_true",
+                      dest="cache",default=False,
+                      help="write a cache of the mesh (foo.inp%s), which "
+                           "every tool reading the mesh will then use"%cache_suffix)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.cache:
+        cache_mode = True
+
+    if len(args) != 1:
+        print("ERROR: Please specify one and only one .inp file")
+        sys.exit()
+
+    # Summarize the mesh
+    start_time = time.time()
+    mesh = mesh_loader(args[0])
+    if verbose_mode:
+        print("Read in %.2f s"%(time.time() - start_time))
+    print("%d nodes (%dD)"%(len(mesh.node_ids), mesh.coords.shape[1]))
+    for (etype, ids, conn) in mesh.blocks:
+        print("    %-10s %d"%(etype, len(ids)))
+    print("%d element sets, %d sections"%(len(mesh.elsets), len(mesh.sections)))
+    if mesh.coords.shape[1] == 3:
+        labels, centroids, volumes = element_volumes(mesh)
+        print("Total volume %g m3"%volumes.sum())
+    else:
+        labels, centroids, areas, ring_volumes = element_geometry(mesh)
+        print("Total area %g m2, total ring volume %g m3"%(areas.sum(),
+                                                          ring_volumes.sum()))
@@ -19,7 +19,9 @@ current_viewport = session.viewports[session.currentViewportName]
 
 def material_property_assigner(model_name):
     """
-    Assigns various properties to the materials in a file.
+    Assigns various properties to the materials in a file. (abq_sections.py
+    writes materials, sections and assignments into the .inp file instead,
+    without CAE.)
     """
     #TODO: Expand this to making materials!
 
@@ -69,28 +71,23 @@ def section_assigner(model_name,part_name):
     for item in these_sections:
         these_section_materialnames[item.split("_")[-1]] = item
 
-    # Create a Section Assignment for each set, with the appropriate Section
+    # Create a Section Assignment for each set, with the appropriate Section,
+    # looking each set's material name up among the sections' instead of
+    # comparing every set with every section
     for this_set_materialname in these_set_materialnames:
-
-        # Remember the name of the actual set associate with this
-        # set_materialname
-        this_setname = these_set_materialnames[this_set_materialname]
-
-        # Iterate over section material names, taking action if they match
-        for this_section_materialname in these_section_materialnames:
-            if this_set_materialname == this_section_materialname:
-                this_sectionname = these_section_materialnames[this_section_materialname]
-                this_part.SectionAssignment(region=this_part.sets[this_setname],
-                                            sectionName=this_sectionname)
-            else:
-                pass
+        if this_set_materialname in these_section_materialnames:
+            this_setname = these_set_materialnames[this_set_materialname]
+            this_sectionname = these_section_materialnames[this_set_materialname]
+            this_part.SectionAssignment(region=this_part.sets[this_setname],
+                                        sectionName=this_sectionname)
 
 
 def thermal_pdf_maker(model_name,part_name):
     """
     Creates a predefined field for every set having "innerpool" or "outerpool"
     in the name. These PDFs don't have the right temperatures assigned, but it's
-    a step in the right direction.
+    a step in the right direction. (For a temperature at every node, from a
+    thermal model's results, use abq_tempic.py on the .inp file instead.)
     """
 
     this_model = mdb.models[model_name]
@@ -129,7 +126,7 @@ def thermal_pdf_maker(model_name,part_name):
 def start_material_file(model_name):
     """
     Gets a material file started by writing out column headers and material
-    names
+    names (abq_mattablegen.py fills in a whole table from thermal results)
     """
 
     this_model = mdb.models[model_name]
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# A program to keep an eye on lots of running Abaqus jobs at once. It follows
+# each job's .sta and .msg files as they grow, remembering how far into each
+# file it has read so only the new bytes are ever read, and reports how far
+# along each job is, how fast it's going, when it should finish, and whether it
+# seems to have stalled - either as a table that's redrawn in the terminal, or
+# as a stream of JSON lines for other programs. Unless told to keep following,
+# it stops once every job has finished, counting a stalled job whose files
+# haven't changed in stall_seconds as finished too (a job killed by the batch
+# system or its wall-time limit never says it's finished).
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, glob, time, json, optparse
+import abq_runfiles
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# How often to look for new lines
+poll_interval = 5.0 #s
+
+# Progress rates are worked out over this much (wall) time
+rate_window = 600.0 #s
+
+# A running job that hasn't finished an increment in this long is "stalled",
+# and if its files haven't changed in this long either, it's given up on
+stall_seconds = 1800.0 #s
+
+# Output style: "dashboard" or "json"
+output_mode = "dashboard"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+class FileFollower:
+    """
+    Reads the new lines of a growing file, keeping track of where it left off.
+    A line that hasn't been finished yet is held back until it has.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.offset = 0
+        self.partial = ""
+
+    def new_lines(self):
+        try:
+            size = os.path.getsize(self.filename)
+        except OSError:
+            return []
+
+        # The file has been started over (e.g. the job was re-run)
+        if size < self.offset:
+            self.offset = 0
+            self.partial = ""
+        if size == self.offset:
+            return []
+
+        openfile = open(self.filename, 'r')
+        openfile.seek(self.offset)
+        text = self.partial + openfile.read(size - self.offset)
+        openfile.close()
+        self.offset = size
+
+        lines = text.split("\n")
+        self.partial = lines.pop()
+        return lines
+
+
+def step_periods(inpfile):
+    """
+    Finds the time period of each step in an .inp file, from the data line
+    after each *Visco or *Static
+    """
+
+    periods = []
+    read_period = False
+    for line in inpfile:
+        if line.startswith("*"):
+            upper = line.upper()
+            read_period = upper.startswith("*VISCO") or upper.startswith("*STATIC")
+        elif read_period:
+            values = [value for value in line.split(",") if value.strip()]
+            periods.append(float(values[1]) if len(values) > 1 else 1.0)
+            read_period = False
+    return periods
+
+
+class JobMonitor:
+    """
+    Everything known about one job so far, updated from the new lines of its
+    .sta and .msg files
+    """
+    def __init__(self, basename):
+        self.basename = basename
+        self.name = os.path.basename(basename)
+        self.stafile = FileFollower(basename + ".sta")
+        self.msgfile = FileFollower(basename + ".msg")
+        self.state = {"job": self.name, "status": "running", "step": 0,
+                      "increment": 0, "total_time": 0.0, "step_time": 0.0,
+                      "time_increment": 0.0, "cutbacks": 0, "warnings": 0,
+                      "errors": 0, "rate": None, "eta": None, "stalled": False}
+
+        # How much time the whole analysis covers, if the .inp file is there
+        self.analysis_time = None
+        if os.path.exists(basename + ".inp"):
+            periods = step_periods(open(basename + ".inp", 'r'))
+            if periods:
+                self.analysis_time = sum(periods)
+        self.samples = []
+
+        # A job that was already quiet when it was found has been quiet since
+        # its files last changed
+        mtimes = [os.path.getmtime(follower.filename)
+                  for follower in (self.stafile, self.msgfile)
+                  if os.path.exists(follower.filename)]
+        self.last_change = max(mtimes) if mtimes else time.time()
+        self.last_increment = self.last_change
+        self.caught_up = False
+
+    def update(self, now):
+        """
+        Reads whatever has been added to the job's files, and returns True if
+        anything changed
+        """
+
+        # What's already in the files when the job is found happened when they
+        # last changed, not now
+        when = now if self.caught_up else self.last_change
+        self.caught_up = True
+
+        changed = False
+        offsets = (self.stafile.offset, self.msgfile.offset)
+        for line in self.stafile.new_lines():
+            increment = abq_runfiles.staline_parser(line)
+            if increment:
+                step, inc, attempt, cutback, iterations, total, steptime, dt = increment
+                changed = True
+                if cutback:
+                    self.state["cutbacks"] += 1
+                    continue
+                self.state.update(step=step, increment=inc, total_time=total,
+                                  step_time=steptime, time_increment=dt)
+                self.samples.append((when, total))
+                self.last_increment = when
+            elif abq_runfiles.completed_marker in line:
+                self.state["status"] = "completed"
+                changed = True
+            elif abq_runfiles.failed_marker in line:
+                self.state["status"] = "failed"
+                changed = True
+
+        for line in self.msgfile.new_lines():
+            kind = abq_runfiles.msgline_parser(line)
+            if kind in ("warnings", "errors"):
+                self.state[kind] += 1
+                changed = True
+
+        if (self.stafile.offset, self.msgfile.offset) != offsets:
+            self.last_change = when
+
+        # Progress rate (analysis time per wall second) over the recent past,
+        # and how long the rest should take at that rate
+        self.samples = [sample for sample in self.samples
+                        if now - sample[0] <= rate_window] or self.samples[-1:]
+        if len(self.samples) > 1 and self.samples[-1][0] > self.samples[0][0]:
+            self.state["rate"] = (self.samples[-1][1] - self.samples[0][1]) / \
+                                 (self.samples[-1][0] - self.samples[0][0])
+        if self.state["rate"] and self.analysis_time is not None:
+            self.state["eta"] = max(0.0, self.analysis_time -
+                                    self.state["total_time"]) / self.state["rate"]
+        if self.analysis_time:
+            self.state["fraction"] = self.state["total_time"] / self.analysis_time
+
+        stalled = self.state["status"] == "running" and \
+                  now - self.last_increment > stall_seconds
+        if stalled != self.state["stalled"]:
+            self.state["stalled"] = stalled
+            changed = True
+
+        return changed
+
+    def finished(self, now):
+        """
+        Whether the job is over: it has completed or failed, or it has stalled
+        and none of its files have changed in stall_seconds either
+        """
+        return self.state["status"] != "running" or \
+               (self.state["stalled"] and now - self.last_change > stall_seconds)
+
+
+def job_finder(paths):
+    """
+    Turns a list of directories and/or job files into job base names. Jobs in
+    directories inside the given ones (e.g. abq_scheduler's scratch directories)
+    are found too.
+    """
+
+    basenames = []
+    for path in paths:
+        if os.path.isdir(path):
+            for stafilename in glob.glob(os.path.join(path, "*.sta")) + \
+                               glob.glob(os.path.join(path, "*", "*.sta")):
+                basenames.append(stafilename[:-len(".sta")])
+        else:
+            basenames.append(os.path.splitext(path)[0] if path.endswith((".sta",
+                             ".msg", ".inp")) else path)
+    return sorted(set(basenames))
+
+
+def time_formatter(seconds):
+    """
+    Writes a number of seconds as e.g. "2h05m", or "-" if it isn't known
+    """
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return "%dh%02dm"%(seconds // 3600, (seconds % 3600) // 60)
+    return "%dm%02ds"%(seconds // 60, seconds % 60)
+
+
+def dashboard_writer(monitors, outfile=sys.stdout):
+    """
+    Redraws the table of every job's progress
+    """
+
+    outfile.write("\033[H\033[2J")
+    outfile.write("Abaqus jobs at %s\n\n"%time.strftime("%H:%M:%S"))
+    outfile.write("%-30s %-10s %4s %6s %10s %6s %5s %5s %9s %9s\n"%(
+        "Job", "Status", "Step", "Inc", "Time", "Done", "Cuts", "Warn",
+        "Rate", "ETA"))
+    for monitor in monitors:
+        state = monitor.state
+        status = "STALLED" if state["stalled"] else state["status"]
+        outfile.write("%-30s %-10s %4d %6d %10.4g %6s %5d %5d %9s %9s\n"%(
+            monitor.name[:30], status, state["step"], state["increment"],
+            state["total_time"],
+            "%.0f%%"%(100*state["fraction"]) if "fraction" in state else "-",
+            state["cutbacks"], state["warnings"],
+            "-" if state["rate"] is None else "%.3g/s"%state["rate"],
+            time_formatter(state["eta"])))
+    outfile.flush()
+
+
+def monitor_loop(paths, follow=False):
+    """
+    Keeps reading the jobs' files until every job has finished or been given
+    up on (or forever, if following), looking for new jobs in the given
+    directories each time around
+    """
+
+    monitors = {}
+    while True:
+        now = time.time()
+        for basename in job_finder(paths):
+            if basename not in monitors:
+                monitors[basename] = JobMonitor(basename)
+
+        changed = [monitor for basename, monitor in sorted(monitors.items())
+                   if monitor.update(now)]
+        if output_mode == "json":
+            for monitor in changed:
+                record = dict(monitor.state, time=now)
+                print(json.dumps(record, sort_keys=True))
+            sys.stdout.flush()
+        else:
+            dashboard_writer([monitor for basename, monitor in sorted(monitors.items())])
+
+        if not follow and monitors and \
+           all(monitor.finished(now) for monitor in monitors.values()):
+            break
+        time.sleep(poll_interval)
+
+    return monitors
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] directory|foo.sta [...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-j","--json",action="store_true",
+                      dest="json",default=False,
+                      help="write a JSON line for each change instead of a table")
+    parser.add_option("-f","--follow",action="store_true",
+                      dest="follow",default=False,
+                      help="keep going after every job has finished")
+    parser.add_option("-i","--interval",type="float",dest="interval",default=None,
+                      help="seconds between looks at the files [%g]"%poll_interval)
+    parser.add_option("--stall",type="float",dest="stall",default=None,
+                      help="seconds without an increment before a job counts as "
+                           "stalled, and without any change to its files before "
+                           "it's given up on [%g]"%stall_seconds)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.json:
+        output_mode = "json"
+    if options.interval:
+        poll_interval = options.interval
+    if options.stall:
+        stall_seconds = options.stall
+
+    if len(args) < 1:
+        args = ["."]
+
+    try:
+        monitor_loop(args, options.follow)
+    except KeyboardInterrupt:
+        pass
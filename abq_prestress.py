@@ -10,11 +10,19 @@
 # (http://creativecommons.org/licenses/by-sa/3.0)
 
 from __future__ import division
-import string, re, sys, optparse
+import string, re, sys, os, optparse
+import abq_fileio
 # Note - I'm using the deprecated "optparse" instead of the newer "argparse"
 # because Taylor is running Python 2.6, and argparse wasn't introduced until
 # Python 2.7
 
+# numpy is only needed for the accelerated update modes, so don't make the plain
+# mode depend on it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 __version__ = "0.2"
 __changedate__ = "2013.10.15"
 
@@ -35,6 +43,32 @@ outfile_tags = ["ps1","ps2","ps3","ps4","ps5","ps6","ps7","ps8","ps9","ps10","ps
 # Mode: flat, curved, threedee
 mode = "flat"
 
+# What's in the stress report for curved and 3D models?
+#   "radial" - just the radial stress, already rotated into a spherical
+#              coordinate system in CAE (curved), or S11, S22, S33 (3D)
+#   "tensor" - the whole stress tensor in the global frame (S11, S22, S33, S12,
+#              and in 3D S13, S23), which is rotated into the radial frame
+#              here, using the element centroids from the .inp file
+report_components = "radial"
+
+# What gets written as the prestress from a "tensor" report?
+#   "radial" - the radial stress, in all three normal components (the same
+#              lithostatic prestress as from a report rotated in CAE)
+#   "full"   - the whole tensor, as reported
+prestress_components = "radial"
+
+# How do we get from this iteration's reported stress to the next prestress?
+#   "plain"    - feed the reported stress straight back in (fixed-point)
+#   "relax"    - under/over-relax between this prestress and the reported one
+#   "aitken"   - relaxation with a factor updated from the last two residuals
+#   "anderson" - Anderson mixing over the last few iterations
+# Everything except "plain" needs numpy, and keeps a binary history file for
+# each iteration (in a directory named after the model, plus history_suffix)
+update_mode = "plain"
+relaxation_factor = 0.7
+anderson_depth = 3
+history_suffix = "_pshistory"
+
 # Print lots of stuff while running?
 verbose_mode = True
 
@@ -179,6 +213,157 @@ def rptfile_parser_3D(rptfile):
     return stresses
 
 
+def rptfile_parser_tensor(rptfile):
+    """
+    Goes through an Abaqus .rpt file and grabs every stress component in the
+    global frame (S11, S22, S33, S12 for axisymmetric models, plus S13, S23 in
+    3D), creating a series of stress entries (part, elemID, [components])
+    """
+
+    stresses = []
+    values_are_centroidal = False
+    num_components = 6 if mode == "threedee" else 4
+
+    for line in rptfile:
+
+        # Totally ignore blank lines
+        if line.strip() == "":
+            continue
+
+        # The values have to be centroidal, and can't have been transformed
+        # already, or the rotation would be done twice
+        if "CENTROIDAL" in line.upper():
+            values_are_centroidal = True
+        if "COORDINATE SYSTEM" in line.upper():
+            print "ERROR: Stress report file values are already in transformed coordinates"
+            sys.exit()
+
+        # Figure out when we're in a new part
+        if line.upper().startswith("FIELD OUTPUT REPORTED AT"):
+            this_part = line.split()[-1]
+            continue
+
+        # We only care about lines starting with a number
+        if line.strip()[0].isdigit():
+            line_checker(line,num_components + 1)
+            values = line.split()
+            stresses.append((this_part, int(values[0]),
+                             [float(value) for value in values[1:]]))
+
+    if not values_are_centroidal:
+        print "ERROR: Stress report file values are not element-centroidal"
+        sys.exit()
+
+    return stresses
+
+
+def tensor_assembler(components):
+    """
+    Turns rows of stress components (S11, S22, S33, S12[, S13, S23]) into an
+    array of 3x3 tensors. In axisymmetric models, direction 3 is the hoop
+    direction, which has no shear.
+    """
+    tensors = np.zeros((len(components), 3, 3))
+    for i, (j, k) in enumerate([(0, 0), (1, 1), (2, 2), (0, 1), (0, 2), (1, 2)]
+                               [:components.shape[1]]):
+        tensors[:, j, k] = components[:, i]
+        tensors[:, k, j] = components[:, i]
+    return tensors
+
+
+def spherical_rotator(components, centroids):
+    """
+    Rotates stress tensors from the global frame into the spherical frame at
+    each element's centroid: radial, then polar (along the surface, away from
+    the axis of symmetry, which is y in axisymmetric models and z in 3D), then
+    hoop/azimuthal. Returns the components in the same order they came in.
+    """
+
+    components = np.asarray(components, dtype=float)
+    centroids = np.asarray(centroids, dtype=float)
+    radius = np.sqrt((centroids**2).sum(axis=1))
+    radius[radius == 0] = 1.0
+
+    # The rows of each rotation matrix are the spherical directions, written
+    # in the global frame
+    rotations = np.zeros((len(centroids), 3, 3))
+    if centroids.shape[1] == 2:
+        x, y = centroids[:, 0]/radius, centroids[:, 1]/radius
+        rotations[:, 0, 0], rotations[:, 0, 1] = x, y
+        rotations[:, 1, 0], rotations[:, 1, 1] = y, -x
+        rotations[:, 2, 2] = 1.0
+    else:
+        x, y, z = [centroids[:, i]/radius for i in range(3)]
+        rho = np.sqrt(x**2 + y**2)
+        on_axis = rho == 0
+        rho[on_axis] = 1.0
+        cos_phi = np.where(on_axis, 1.0, x/rho)
+        sin_phi = np.where(on_axis, 0.0, y/rho)
+        rotations[:, 0] = np.column_stack((x, y, z))
+        rotations[:, 1] = np.column_stack((z*cos_phi, z*sin_phi, -rho*(~on_axis)))
+        rotations[:, 2] = np.column_stack((-sin_phi, cos_phi, np.zeros(len(x))))
+
+    rotated = np.matmul(np.matmul(rotations, tensor_assembler(components)),
+                        rotations.transpose(0, 2, 1))
+    pairs = [(0, 0), (1, 1), (2, 2), (0, 1), (0, 2), (1, 2)][:components.shape[1]]
+    return np.column_stack([rotated[:, j, k] for (j, k) in pairs])
+
+
+def tensor_processor(stresses, inpfilename):
+    """
+    Takes the stress entries from a "tensor" report and makes the prestress
+    out of them: finds each element's centroid in the .inp file, rotates the
+    stresses into the spherical frame, and hands back entries holding either
+    the radial stress or the whole (global-frame) tensor
+    """
+
+    import abq_mesh
+
+    if prestress_components == "full":
+        return stresses
+
+    mesh = abq_mesh.mesh_loader(inpfilename)
+    if mesh.coords.shape[1] == 3:
+        labels, centroids, volumes = abq_mesh.element_volumes(mesh)
+    else:
+        labels, centroids, areas, ring_volumes = abq_mesh.element_geometry(mesh)
+
+    # Line the centroids up with the reported elements
+    elements = np.array([element for (part, element, stress) in stresses], dtype=int)
+    order = np.argsort(labels)
+    places = np.clip(np.searchsorted(labels[order], elements), 0, len(labels) - 1)
+    if not np.all(labels[order][places] == elements):
+        print "ERROR: Elements in the report file aren't all in %s"%inpfilename
+        sys.exit()
+
+    # 3D prestresses are written as three normal components; curved ones as
+    # just the one
+    keys, components = stresses_to_arrays(stresses)
+    rotated = spherical_rotator(components, centroids[order][places])
+    if mode == "threedee":
+        return [(part, element, [Srr, Srr, Srr]) for ((part, element, stress), Srr)
+                in zip(stresses, rotated[:, 0])]
+    return [(part, element, Srr) for ((part, element, stress), Srr)
+            in zip(stresses, rotated[:, 0])]
+
+
+def stress_reader(rptfile, inpfilename):
+    """
+    Reads the stresses out of a report file, in whichever way the mode and
+    report_components call for
+    """
+    if mode == "flat":
+        return rptfile_parser_flat(rptfile)
+    if report_components == "tensor":
+        return tensor_processor(rptfile_parser_tensor(rptfile), inpfilename)
+    if mode == "curved":
+        return rptfile_parser_curved(rptfile)
+    if mode == "threedee":
+        return rptfile_parser_3D(rptfile)
+    print "ERROR: Mode not recognized. Please specify flat/curved/3D"
+    sys.exit()
+
+
 prestresses_written = False
 def inpfile_processor(inpfile, stresses, outfile):
     """
@@ -186,15 +371,22 @@ def inpfile_processor(inpfile, stresses, outfile):
     condition
     """
 
-    # Define the preamble line up front
-    preamble = "** PRESTRESSES\n*Initial Conditions, type=stress, unbalanced stress=step\n"
-
-    # Read all of the data into a set
-    inpfilelines = inpfile.readlines()
-
     # Tell the user what's going on, assuming we're in verbose mode
     if verbose_mode:
-        print "Creating (or overwriting!) file %s..."%outfilename
+        print "Creating (or overwriting!) file %s..."%outfile.name
+
+    outfile.writelines(prestress_stage(inpfile, stresses))
+
+
+def prestress_stage(inpfilelines, stresses):
+    """
+    Goes through the lines of an Abaqus .inp file, handing back the lines of
+    the new file (with the stresses inserted as an initial condition) one at a
+    time, so it can be one stage of abq_builddeck's pipeline
+    """
+
+    # Define the preamble line up front
+    preamble = "** PRESTRESSES\n*Initial Conditions, type=stress, unbalanced stress=step\n"
 
     # Go through the inp file. If it's not the section we're looking for (right
     # before the first "STEP" definition), then just copy the line to the new
@@ -205,34 +397,38 @@ def inpfile_processor(inpfile, stresses, outfile):
         if line.startswith("** STEP"):
 
             # Write out the first declaration line
-            outfile.write(preamble)
+            yield preamble
 
             # Go through the stresses and write each of them out - this is
-            # different if we're in 3D mode
-            if mode.upper() == "FLAT":
+            # different if we're in 3D mode, or writing whole tensors
+            if report_components == "tensor" and prestress_components == "full":
+                for (part, element, components) in stresses:
+                    yield "%s.%5g, %s\n"%(part, element,
+                                          ", ".join("%11.11e"%S for S in components))
+            elif mode.upper() == "FLAT":
                 for (part, element, stress) in stresses:
-                    outfile.write("%s.%5g, %18G, %18G, %18G\n"%(part,
-                                                            element,
-                                                            stress,stress,stress))
+                    yield "%s.%5g, %18G, %18G, %18G\n"%(part,
+                                                           element,
+                                                           stress,stress,stress)
             elif mode.upper() == "CURVED":
                 for (part, element, Srr) in stresses:
-                    outfile.write("%s.%5g, %18G, %18G, %18G\n"%(part,
-                                                            element,
-                                                            Srr,Srr,Srr))
+                    yield "%s.%5g, %18G, %18G, %18G\n"%(part,
+                                                           element,
+                                                           Srr,Srr,Srr)
             elif mode.upper() == "THREEDEE":
                 for (part, element, [S11, S22, S33]) in stresses:
-                    outfile.write("%s.%5g, %11.11e, %11.11e, %11.11e\n"%(part,
-                                                            element,
-                                                            S11,S22,S33))
+                    yield "%s.%5g, %11.11e, %11.11e, %11.11e\n"%(part,
+                                                           element,
+                                                           S11,S22,S33)
             else:
                 print "ERROR: Mode not recognized. Specify flat/curved/3D"
 
 
             # Dont' forget to write the line we just read ("** STEP: foo")
-            outfile.write(line)
+            yield line
 
         else:
-            outfile.write(line)
+            yield line
 
 
 def line_checker(dataline,num_entries):
@@ -245,6 +441,201 @@ def line_checker(dataline,num_entries):
         sys.exit()
 
 
+def iteration_tagger(inpfilename, rptfilename):
+    """
+    Works out the iteration tags of a prestress step from its file names: the
+    .inp file's, the .rpt file's, and the one the new .inp file gets. Any that
+    can't be found come back as "ERROR".
+    """
+    old_iteration_number = "ERROR"
+    this_iteration_number = "ERROR"
+    next_iteration_number = "ERROR"
+    for this_rptfile_tag in rptfile_tags:
+        if this_rptfile_tag in inpfilename:
+            old_iteration_number = this_rptfile_tag
+        if this_rptfile_tag in rptfilename:
+            this_iteration_number = this_rptfile_tag
+            next_iteration_number = outfile_tags[rptfile_tags.index(this_rptfile_tag)]
+    return old_iteration_number, this_iteration_number, next_iteration_number
+
+
+def history_dirname(inpfilename, inp_tag):
+    """
+    Works out where the prestress history for a model lives: the .inp file name
+    with its iteration tag and extension stripped off, plus history_suffix
+    """
+    basename = os.path.splitext(inpfilename)[0]
+    basename = re.sub("[_-]?%s"%inp_tag, "", basename)
+    return basename + history_suffix
+
+
+def history_saver(histdir, tag, keys, x=None, g=None, omega=None):
+    """
+    Writes one iteration's worth of history as a binary .npz file: the element
+    keys (part.elemID), the prestress that went into the run (x), the stress
+    the run reported back (g), and the relaxation factor used to make x
+    """
+    if not os.path.isdir(histdir):
+        os.makedirs(histdir)
+
+    record = {"keys": np.array(keys)}
+    if x is not None:
+        record["x"] = x
+    if g is not None:
+        record["g"] = g
+    if omega is not None:
+        record["omega"] = np.array(omega)
+
+    np.savez(os.path.join(histdir, "%s.npz"%tag), **record)
+
+
+def history_loader(histdir, tag, keys):
+    """
+    Reads one iteration's history file back in, reordering its arrays to match
+    the element keys given. Returns a dictionary of arrays, or None if there
+    isn't a (matching) history file for that iteration.
+    """
+    histfilename = os.path.join(histdir, "%s.npz"%tag)
+    if not os.path.exists(histfilename):
+        return None
+
+    histfile = np.load(histfilename)
+    record = dict((name, histfile[name]) for name in histfile.files)
+    histfile.close()
+
+    # The element order is almost always the same as last time, but if it's
+    # not, look each element up by its key
+    stored_keys = [str(key) for key in record["keys"]]
+    if stored_keys != list(keys):
+        rows = dict((key, i) for i, key in enumerate(stored_keys))
+        if not all(key in rows for key in keys):
+            print "WARNING: Elements in %s don't match this model; ignoring it"%histfilename
+            return None
+        order = np.array([rows[key] for key in keys])
+        for name in ("x", "g"):
+            if name in record:
+                record[name] = record[name][order]
+
+    return record
+
+
+def stresses_to_arrays(stresses):
+    """
+    Splits a set of stress entries (part, elemID, stress) into a list of
+    part.elemID keys and an (elements x components) array of stress values
+    """
+    keys = ["%s.%d"%(part, element) for (part, element, stress) in stresses]
+    values = np.array([stress for (part, element, stress) in stresses],
+                      dtype=float).reshape(len(stresses), -1)
+    return keys, values
+
+
+def arrays_to_stresses(stresses, values):
+    """
+    Does the reverse of stresses_to_arrays, putting new stress values into the
+    (part, elemID, stress) entries of an existing stress set
+    """
+    new_stresses = []
+    for i, (part, element, stress) in enumerate(stresses):
+        if isinstance(stress, list):
+            new_stresses.append((part, element, list(values[i])))
+        else:
+            new_stresses.append((part, element, values[i][0]))
+    return new_stresses
+
+
+def prestress_updater(xs, gs, omega_last=None):
+    """
+    Proposes the next prestress from the history of prestresses that went into
+    earlier runs (xs) and the stresses those runs reported back (gs), oldest
+    first. Returns the new prestress and the relaxation factor used.
+
+    Plain iteration would just use gs[-1]. Here, the residual r = g - x is
+    driven to zero either by a fixed relaxation factor, by Aitken's method
+    (relaxation factor updated from the last two residuals, after Irons &
+    Tuck), or by Anderson mixing over the last anderson_depth iterations.
+    """
+    x = xs[-1].ravel()
+    g = gs[-1].ravel()
+    r = g - x
+    omega = relaxation_factor
+
+    if update_mode == "aitken" and len(xs) > 1:
+        r_last = gs[-2].ravel() - xs[-2].ravel()
+        dr = r - r_last
+        if omega_last is None:
+            omega_last = relaxation_factor
+        if np.dot(dr, dr) > 0:
+            omega = -omega_last * np.dot(r_last, dr) / np.dot(dr, dr)
+
+    elif update_mode == "anderson" and len(xs) > 1:
+        depth = min(anderson_depth, len(xs) - 1)
+        X = np.array([this_x.ravel() for this_x in xs[-depth-1:]]).T
+        R = np.array([this_g.ravel() for this_g in gs[-depth-1:]]).T - X
+        dX = np.diff(X, axis=1)
+        dR = np.diff(R, axis=1)
+        gamma = np.linalg.lstsq(dR, r, rcond=None)[0]
+        x_new = x + omega*r - np.dot(dX + omega*dR, gamma)
+        return x_new.reshape(xs[-1].shape), omega
+
+    x_new = x + omega*r
+    return x_new.reshape(xs[-1].shape), omega
+
+
+def stress_accelerator(stresses, inpfilename, inp_tag, rpt_tag, out_tag):
+    """
+    Takes the stresses reported by iteration rpt_tag and, using the history of
+    earlier iterations, works out a better next prestress than the reported
+    stress itself. Records this iteration's prestress and reported stress, and
+    the proposed next prestress, in the model's history directory.
+    """
+
+    histdir = history_dirname(inpfilename, inp_tag)
+    keys, g = stresses_to_arrays(stresses)
+
+    # Find the prestress that went into this run. The first iteration didn't
+    # have one; later ones should have been recorded when their .inp file was
+    # written. If it wasn't (e.g. iterations run before this mode existed),
+    # fall back to plain iteration for this step.
+    this_record = history_loader(histdir, rpt_tag, keys)
+    if this_record is not None and "x" in this_record:
+        x = this_record["x"]
+        omega_last = this_record.get("omega", None)
+    elif rpt_tag == rptfile_tags[0]:
+        x = np.zeros(g.shape)
+        omega_last = None
+    else:
+        print "WARNING: No prestress history for %s; using plain iteration this time"%rpt_tag
+        history_saver(histdir, rpt_tag, keys, g=g)
+        history_saver(histdir, out_tag, keys, x=g)
+        return stresses
+    history_saver(histdir, rpt_tag, keys, x=x, g=g, omega=omega_last)
+
+    # Gather up every earlier iteration that has both halves of its history
+    xs = []
+    gs = []
+    for this_tag in rptfile_tags[:rptfile_tags.index(rpt_tag)+1]:
+        record = history_loader(histdir, this_tag, keys)
+        if record is not None and "x" in record and "g" in record:
+            xs.append(record["x"])
+            gs.append(record["g"])
+        else:
+            xs = []
+            gs = []
+
+    # Propose the next prestress, and remember it for next time
+    x_new, omega = prestress_updater(xs, gs, omega_last)
+    history_saver(histdir, out_tag, keys, x=x_new, omega=omega)
+
+    if verbose_mode:
+        residual = np.sqrt(np.sum((g - x)**2) / max(np.sum(g**2), 1e-300))
+        print "Relative prestress residual for %s: %.3e"%(rpt_tag, residual)
+        print "Proposing next prestress by '%s' update (%d iterations of history, factor %.3f)"%(
+            update_mode, len(xs), omega)
+
+    return arrays_to_stresses(stresses, x_new)
+
+
 ######## Command-line Implementation############################################
 
 if __name__ == "__main__":
@@ -264,6 +655,27 @@ if __name__ == "__main__":
     parser.add_option("-3","--3D",action="store_true",
                       dest="threedee_mode",default=False,
                       help="use this option if the .rpt file is 3D and not axisymmetric")
+    parser.add_option("-t","--tensor",action="store_true",
+                      dest="tensor",default=False,
+                      help="the .rpt file has the whole stress tensor in the "
+                           "global frame (curved and 3D models), to be rotated "
+                           "into the radial frame here")
+    parser.add_option("--full",action="store_true",
+                      dest="full",default=False,
+                      help="with -t, write the whole tensor as the prestress "
+                           "instead of just the radial stress")
+    parser.add_option("-u","--update",
+                      dest="update_mode",default=None,
+                      help="how to get the next prestress from the reported "
+                           "stress: plain, relax, aitken, or anderson (all but "
+                           "plain keep a history of earlier iterations)")
+    parser.add_option("-w","--relaxation",type="float",
+                      dest="relaxation_factor",default=None,
+                      help="relaxation (mixing) factor for the accelerated "
+                           "update modes (<1 under-relaxes, >1 over-relaxes)")
+    parser.add_option("--depth",type="int",
+                      dest="anderson_depth",default=None,
+                      help="number of earlier iterations to mix in anderson mode")
 
     # Run the parser, collecting the options and positional arguments
     (options,args) = parser.parse_args()
@@ -277,6 +689,28 @@ if __name__ == "__main__":
         mode = "curved"
     if options.threedee_mode:
         mode = "threedee"
+    if options.tensor:
+        report_components = "tensor"
+    if options.full:
+        prestress_components = "full"
+    if options.update_mode:
+        update_mode = options.update_mode.lower()
+    if options.relaxation_factor is not None:
+        relaxation_factor = options.relaxation_factor
+    if options.anderson_depth is not None:
+        anderson_depth = options.anderson_depth
+    if update_mode not in ("plain", "relax", "aitken", "anderson"):
+        print "ERROR: Update mode not recognized. Please specify plain/relax/aitken/anderson"
+        sys.exit()
+    if update_mode != "plain" and np is None:
+        print "ERROR: The '%s' update mode requires numpy"%update_mode
+        sys.exit()
+    if report_components == "tensor" and np is None:
+        print "ERROR: Rotating stress tensors requires numpy"
+        sys.exit()
+    if report_components == "tensor" and mode == "flat":
+        print "ERROR: Stress tensors can only be used with curved (-c) or 3D (-3) models"
+        sys.exit()
 
     # Process positional arguments. There should be exactly one specified: the
     # .inp file that we're working on
@@ -287,8 +721,8 @@ if __name__ == "__main__":
         print "ERROR: More than two files specified. Please specify only one .inp and one .rpt file."
         sys.exit()
     else:
-        inpfilename = args[0]
-        rptfilename = args[1]
+        inpfilename = abq_fileio.plain_name(args[0])
+        rptfilename = abq_fileio.plain_name(args[1])
 
     # Check that we specified the files in the right order!
     if not (rptfilename.upper().endswith("RPT") and
@@ -297,24 +731,19 @@ if __name__ == "__main__":
         sys.exit()
 
     # Use that filename we grabbed above to open the inp file
-    rptfile = open(rptfilename, 'r')
-    inpfile = open(inpfilename, 'r')
+    rptfile = abq_fileio.open_input(args[1])
+    inpfile = abq_fileio.open_input(args[0])
 
     # Step up the "iteration" number (i#)
-    old_iteration_number = "ERROR"
-    next_iteration_number = "ERROR"
-    for this_rptfile_tag in rptfile_tags:
-        if this_rptfile_tag in inpfilename:
-            old_iteration_number = this_rptfile_tag
-        if this_rptfile_tag in rptfilename:
-            next_iteration_number = outfile_tags[rptfile_tags.index(this_rptfile_tag)]
+    (old_iteration_number, this_iteration_number,
+     next_iteration_number) = iteration_tagger(inpfilename, rptfilename)
     if old_iteration_number == "ERROR" or next_iteration_number == "ERROR":
         print "ERROR: Input file does not end with a suffix listed in Options section.\n"+\
               "Program stopped to prevent overwriting original file."
         sys.exit()
     outfilename = re.sub(old_iteration_number,next_iteration_number,inpfilename)
 
-    outfile = open(outfilename, "w")
+    outfile = abq_fileio.open_output(outfilename)
 
     # Print out status about the files we're acting on
     if verbose_mode:
@@ -322,14 +751,15 @@ if __name__ == "__main__":
         print "Processing as a %s model..."%(mode)
 
     # Run the rpt file parser to get the data we need
-    if mode == "flat":
-        stresses = rptfile_parser_flat(rptfile)
-    elif mode == "curved":
-        stresses = rptfile_parser_curved(rptfile)
-    elif mode == "threedee":
-        stresses = rptfile_parser_3D(rptfile)
-    else:
-        print "ERROR: Mode not recognized. Please specify flat/curved/3D"
+    stresses = stress_reader(rptfile, args[0])
+
+    # Use earlier iterations to speed up convergence, if asked to
+    if update_mode != "plain":
+        stresses = stress_accelerator(stresses, inpfilename,
+                                      old_iteration_number,
+                                      this_iteration_number,
+                                      next_iteration_number)
 
     # Create our new .inp file
     inpfile_processor(inpfile,stresses,outfile)
+    outfile.close()
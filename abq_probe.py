@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+# A program to "probe values" from a full-field report without going back to
+# CAE: given a model's .inp file and a report of nodal values (temperatures,
+# displacements, ...), it finds the element each of a list of points falls in
+# and interpolates the nodal values there with the element's shape functions.
+# Points can come from a file (one per line) or be sampled along a line, e.g.
+#   abq_probe.py -l 0,-100e3:0,0 -n 200 foo.inp foo.NTrpt
+#   abq_probe.py -c -l 1740e3,0:1340e3,0 foo.inp foo.NTrpt      (radial profile)
+#   abq_probe.py -c -l 1700e3,0:1700e3,1.0 foo.inp foo.NTrpt    (along an arc)
+#   abq_probe.py -p points.txt -o probed.txt foo.inp foo.Urpt
+#
+# Elements are found through a uniform grid laid over the mesh: each grid cell
+# lists the elements whose bounding boxes touch it, so each point only has to
+# be checked against the few elements in its own cell. Every step works on
+# whole arrays of points at once.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, optparse
+import numpy as np
+import abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Are points given (and written out) as radius and angle from the axis, in
+# radians, instead of x and y?
+curved_mode = False
+
+# Number of points to sample along a line, if not given on the command line
+default_samples = 100
+
+# Roughly how many grid cells to use per element
+cells_per_element = 1.0
+
+# How far outside an element (in its own -1..1 coordinates) a point can be
+# and still count as inside it, to allow for round-off on element edges
+inside_tolerance = 1e-6
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+# The corners of the -1..1 square (or cube) each element is mapped from, in
+# the order abq_mesh gives the corners
+natural_corners = {2: np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=float),
+                   3: np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                                [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]],
+                               dtype=float)}
+
+
+def shape_functions(natural):
+    """
+    The bilinear (or trilinear) shape functions, and their derivatives, at an
+    array of points in element coordinates. Returns N (points x corners) and
+    dN (points x corners x dimensions).
+    """
+    signs = natural_corners[natural.shape[1]]
+    terms = 1 + natural[:, None, :]*signs[None, :, :]   # points x corners x dims
+    scale = 0.5**natural.shape[1]
+    N = terms.prod(axis=2) * scale
+    dN = np.empty(terms.shape)
+    for i in range(natural.shape[1]):
+        others = [j for j in range(natural.shape[1]) if j != i]
+        dN[:, :, i] = signs[:, i] * terms[:, :, others].prod(axis=2) * scale
+    return N, dN
+
+
+def cell_expander(lows, highs, strides):
+    """
+    Expands boxes of grid cells (the lowest and highest cell in each direction,
+    one box per row) into every cell in each box. Returns the row each cell
+    came from and the cell's number.
+    """
+    spans = highs - lows + 1
+    counts = spans.prod(axis=1)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    cells = np.zeros(len(rows), dtype=int)
+    for i in range(lows.shape[1]):
+        cells += (lows[rows, i] + within % spans[rows, i]) * strides[i]
+        within //= spans[rows, i]
+    return rows, cells
+
+
+class GridIndex:
+    """
+    A uniform grid over a mesh, listing the elements whose bounding boxes
+    touch each cell, for finding which element points are in
+    """
+    def __init__(self, mesh):
+        self.labels, types, self.conn = mesh.elements()
+        self.coords = np.asarray(mesh.coords, dtype=float)
+        self.dimensions = self.coords.shape[1]
+        corners = self.coords[self.conn]
+        self.lowest = lowest = corners.min(axis=1)
+        self.highest = highest = corners.max(axis=1)
+
+        # Cells about as big as an average element
+        self.origin = lowest.min(axis=0)
+        extent = highest.max(axis=0) - self.origin
+        extent[extent <= 0] = 1.0
+        size = (extent.prod() / (cells_per_element*len(self.labels)))**(1/self.dimensions)
+        self.shape = np.maximum(np.ceil(extent/size).astype(int), 1)
+        self.size = extent / self.shape
+        self.strides = np.concatenate(([1], np.cumprod(self.shape)[:-1]))
+
+        # Which elements touch each cell, sorted by cell, with where each
+        # cell's list starts
+        rows, cells = cell_expander(self.cell_finder(lowest), self.cell_finder(highest),
+                                    self.strides)
+        order = np.argsort(cells, kind="mergesort")
+        self.members = rows[order]
+        self.starts = np.searchsorted(cells[order], np.arange(self.shape.prod() + 1))
+
+    def cell_finder(self, points):
+        """
+        The (clipped) cell indices, in each direction, of an array of points
+        """
+        cells = np.floor((points - self.origin) / self.size).astype(int)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def candidates(self, points):
+        """
+        Pairs up points with the elements whose bounding boxes they're in.
+        Returns the point rows and element rows of each pair.
+        """
+        inside = np.all((points >= self.origin) &
+                        (points <= self.origin + self.size*self.shape), axis=1)
+        point_rows = np.nonzero(inside)[0]
+        cells = np.dot(self.cell_finder(points[point_rows]), self.strides)
+        counts = self.starts[cells + 1] - self.starts[cells]
+        pairs = np.repeat(np.arange(len(cells)), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        point_rows = point_rows[pairs]
+        element_rows = self.members[self.starts[cells[pairs]] + within]
+        slack = 1e-9*(self.highest[element_rows] - self.lowest[element_rows])
+        boxed = np.all((points[point_rows] >= self.lowest[element_rows] - slack) &
+                       (points[point_rows] <= self.highest[element_rows] + slack), axis=1)
+        return point_rows[boxed], element_rows[boxed]
+
+
+def element_locator(index, points, iterations=12):
+    """
+    Finds the element each point is in, and where it is in that element's own
+    -1..1 coordinates, by inverting each candidate element's shape functions
+    with Newton's method. Returns the element rows (-1 for points outside the
+    mesh) and the element coordinates.
+    """
+
+    points = np.asarray(points, dtype=float)
+    point_rows, element_rows = index.candidates(points)
+    corners = index.coords[index.conn[element_rows]]     # pairs x corners x dims
+    targets = points[point_rows]
+
+    # Most elements are close to parallelograms, so most pairs are done after
+    # a step or two; only the ones still moving are carried on. Pairs that are
+    # still well outside the element after a few steps are given up on
+    # (collapsed elements can wander outside for the first few).
+    natural = np.zeros(targets.shape)
+    active = np.arange(len(targets))
+    for i in range(iterations):
+        if not len(active):
+            break
+        N, dN = shape_functions(natural[active])
+        residuals = targets[active] - np.einsum("pk,pkd->pd", N, corners[active])
+        jacobians = np.einsum("pki,pkj->pij", corners[active], dN)
+        # Collapsed corners (in triangles and tetrahedra) make the Jacobian
+        # singular right at the corner, so those pairs just don't move
+        singular = np.abs(np.linalg.det(jacobians)) < 1e-300
+        jacobians[singular] = np.eye(index.dimensions)
+        residuals[singular] = 0.0
+        steps = np.linalg.solve(jacobians, residuals[:, :, None])[:, :, 0]
+        natural[active] = np.clip(natural[active] + steps, -2.0, 2.0)
+        active = active[(np.abs(steps).max(axis=1) > 1e-10) &
+                        ((i < 4) | (np.abs(natural[active]).max(axis=1) < 1.5))]
+
+    # A pair counts if the point maps back onto itself from inside the element
+    N, dN = shape_functions(natural)
+    misses = np.sqrt(((targets - np.einsum("pk,pkd->pd", N, corners))**2).sum(axis=1))
+    sizes = corners.max(axis=1) - corners.min(axis=1)
+    found = (np.abs(natural).max(axis=1) <= 1 + inside_tolerance) & \
+            (misses <= 1e-6*sizes.max(axis=1))
+
+    # Points on an edge shared by several elements take the first one
+    located = np.empty(len(points), dtype=int)
+    located.fill(-1)
+    where = np.zeros(points.shape)
+    hits, first = np.unique(point_rows[found], return_index=True)
+    located[hits] = element_rows[found][first]
+    where[hits] = np.clip(natural[found][first], -1.0, 1.0)
+    return located, where
+
+
+def nearest_finder(sources, points):
+    """
+    Finds the nearest of a set of source points to each of an array of
+    points. The sources are put in a uniform grid, and each point searches
+    blocks of cells around its own, twice as wide each time, until nothing
+    outside the block could be closer. Returns the rows of the nearest
+    sources and the distances to them.
+    """
+
+    sources = np.asarray(sources, dtype=float)
+    points = np.asarray(points, dtype=float)
+    dimensions = sources.shape[1]
+
+    # A grid with about one source per cell
+    origin = sources.min(axis=0)
+    extent = sources.max(axis=0) - origin
+    extent[extent <= 0] = 1.0
+    size = (extent.prod() / len(sources))**(1/dimensions)
+    shape = np.maximum(np.ceil(extent/size).astype(int), 1)
+    size = extent / shape
+    strides = np.concatenate(([1], np.cumprod(shape)[:-1]))
+    source_cells = np.dot(np.clip(np.floor((sources - origin)/size).astype(int),
+                                  0, shape - 1), strides)
+    members = np.argsort(source_cells, kind="mergesort")
+    starts = np.searchsorted(source_cells[members], np.arange(shape.prod() + 1))
+    point_cells = np.clip(np.floor((points - origin)/size).astype(int), 0, shape - 1)
+
+    nearest = np.zeros(len(points), dtype=int)
+    distances = np.zeros(len(points)) + np.inf
+    pending = np.arange(len(points))
+    reach = 0
+    while len(pending):
+        # Points far from the sources need big blocks, so they're done a few
+        # at a time
+        block_cells = np.prod(np.minimum(2*reach + 1, shape))
+        chunk = max(1, int(4e6 // block_cells))
+        settled = np.zeros(len(pending), dtype=bool)
+        for first in range(0, len(pending), chunk):
+            these = pending[first:first + chunk]
+            lows = np.clip(point_cells[these] - reach, 0, shape - 1)
+            highs = np.clip(point_cells[these] + reach, 0, shape - 1)
+            rows, cells = cell_expander(lows, highs, strides)
+            counts = starts[cells + 1] - starts[cells]
+            pairs = np.repeat(np.arange(len(cells)), counts)
+            within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            queries = these[rows[pairs]]
+            candidates = members[starts[cells[pairs]] + within]
+            lengths = np.sqrt(((points[queries] - sources[candidates])**2).sum(axis=1))
+
+            # The closest candidate for each point (the pairs come grouped by
+            # point already)
+            if not len(queries):
+                firsts = np.zeros(0, dtype=int)
+            else:
+                groups = np.cumsum(np.concatenate(([True], queries[1:] != queries[:-1]))) - 1
+                minima = np.minimum.reduceat(lengths, np.searchsorted(groups, np.arange(groups[-1] + 1)))
+                hits = np.nonzero(lengths == minima[groups])[0]
+                firsts = hits[np.concatenate(([True], groups[hits][1:] != groups[hits][:-1]))]
+            closer = lengths[firsts] < distances[queries[firsts]]
+            nearest[queries[firsts[closer]]] = candidates[firsts[closer]]
+            distances[queries[firsts[closer]]] = lengths[firsts[closer]]
+
+            # A source outside the block is past one of its sides (not an
+            # edge of the grid, past which there aren't any), and can't be
+            # any nearer the point than the grid is in the other directions
+            outside = np.maximum(np.maximum(origin - points[these],
+                                            points[these] - (origin + extent)), 0)
+            gaps = np.concatenate((np.where(lows > 0, points[these] - (origin + lows*size), np.inf),
+                                   np.where(highs < shape - 1, origin + (highs + 1)*size -
+                                            points[these], np.inf)), axis=1)
+            bounds = gaps**2 + (outside**2).sum(axis=1)[:, None] - np.tile(outside**2, 2)
+            settled[first:first + chunk] = distances[these]**2 <= bounds.min(axis=1)
+        pending = pending[~settled]
+        reach = max(1, 2*reach)
+
+    return nearest, distances
+
+
+def field_interpolator(index, located, where, nodal_values):
+    """
+    Interpolates nodal values (one row per node, in the mesh's node order) at
+    located points, using the shape functions. Points outside the mesh get NaN.
+    """
+    nodal_values = np.asarray(nodal_values, dtype=float)
+    if nodal_values.ndim == 1:
+        nodal_values = nodal_values[:, None]
+    values = np.zeros((len(located), nodal_values.shape[1])) + np.nan
+    inside = located >= 0
+    N, dN = shape_functions(where[inside])
+    values[inside] = np.einsum("pk,pkv->pv", N,
+                               nodal_values[index.conn[located[inside]]])
+    return values
+
+
+def rptfile_parser_nodal(rptfile):
+    """
+    Reads a field output report of nodal values. Returns the node labels, the
+    values (one row per node), and the names of the value columns.
+    """
+    data = []
+    names = []
+    for line in rptfile.read().splitlines():
+        words = line.split(None, 1)
+        if not words:
+            continue
+        if words[0].isdigit():
+            data.append(line)
+        elif words[0] == "Node" and "Label" in line.split():
+            names = line.split()
+            names = names[names.index("Label") + 1:]
+
+    # All the numbers at once, a row per node
+    if not data:
+        return np.zeros(0, dtype=int), np.zeros((0, 0)), names
+    table = abq_mesh.values_parser(" ".join(data)).reshape(len(data), -1)
+    labels = table[:, 0].astype(int)
+    values = table[:, 1:]
+    return labels, values, names[-values.shape[1]:]
+
+
+def nodal_arranger(mesh, labels, values):
+    """
+    Puts reported nodal values in the mesh's node order. Nodes missing from
+    the report get NaN; reported nodes missing from the mesh raise a KeyError.
+    """
+    arranged = np.zeros((len(mesh.node_ids), values.shape[1])) + np.nan
+    arranged[mesh.node_rows()(labels)] = values
+    return arranged
+
+
+def line_sampler(start, end, num_points):
+    """
+    Evenly spaced points from start to end (inclusive)
+    """
+    fractions = np.linspace(0.0, 1.0, num_points)[:, None]
+    return np.asarray(start, dtype=float) + fractions*(np.asarray(end, dtype=float) -
+                                                       np.asarray(start, dtype=float))
+
+
+def curved_converter(points, inverse=False):
+    """
+    Converts between radius and angle from the axis (inverse=False) and x and
+    y in the r-z plane (inverse=True goes back the other way)
+    """
+    if inverse:
+        return np.column_stack((np.sqrt((points**2).sum(axis=1)),
+                                np.arctan2(points[:, 0], points[:, 1])))
+    return np.column_stack((points[:, 0]*np.sin(points[:, 1]),
+                            points[:, 0]*np.cos(points[:, 1])))
+
+
+def point_parser(text):
+    """
+    Turns "x,y" (or "x,y,z") into an array
+    """
+    return np.array([float(value) for value in text.split(",")])
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp foo.rpt"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved",default=False,
+                      help="give and write points as radius and angle from the "
+                           "axis (radians) instead of x and y")
+    parser.add_option("-l","--line",dest="line",default=None,
+                      help="probe along a line from one point to another "
+                           "(e.g. 0,-100e3:0,0)")
+    parser.add_option("-n","--samples",type="int",dest="samples",
+                      default=default_samples,
+                      help="number of points along the line [%default]")
+    parser.add_option("-p","--points",dest="points",default=None,
+                      help="file of points to probe, one per line")
+    parser.add_option("-o","--output",dest="output",default=None,
+                      help="file to write the probed values to (default: "
+                           "print them)")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.curved:
+        curved_mode = True
+
+    if len(args) != 2:
+        print("ERROR: Please specify a .inp file and a report of nodal values")
+        sys.exit()
+    if bool(options.line) == bool(options.points):
+        print("ERROR: Please give either a line (-l) or a file of points (-p)")
+        sys.exit()
+
+    # The points to probe
+    if options.line:
+        start, end = [point_parser(text) for text in options.line.split(":")]
+        points = line_sampler(start, end, options.samples)
+    else:
+        points = np.loadtxt(abq_fileio.open_input(options.points), ndmin=2)
+    given = points
+    if curved_mode:
+        points = curved_converter(points)
+
+    # The mesh, its grid index, and the nodal values
+    mesh = abq_mesh.mesh_loader(args[0])
+    index = GridIndex(mesh)
+    labels, values, names = rptfile_parser_nodal(abq_fileio.open_input(args[1]))
+    try:
+        nodal_values = nodal_arranger(mesh, labels, values)
+    except KeyError as error:
+        print("ERROR: %s doesn't match %s: %s"%(args[1], args[0], error.args[0]))
+        sys.exit()
+
+    located, where = element_locator(index, points)
+    probed = field_interpolator(index, located, where, nodal_values)
+    if verbose_mode:
+        print("Probed %d points, %d of them outside the mesh"%(
+              len(points), (located < 0).sum()), file=sys.stderr)
+
+    # Write out each point inside the mesh, as given, with its values
+    if curved_mode:
+        columns = ["R", "THETA"]
+    else:
+        columns = ["X", "Y", "Z"][:points.shape[1]]
+    lines = ["#" + "".join("%19s"%name for name in columns + names) + "\n"]
+    for point, row in zip(given[located >= 0], probed[located >= 0]):
+        lines.append("".join(" %19.10E"%value for value in np.concatenate((point, row)))
+                     + "\n")
+    if options.output:
+        with abq_fileio.open_output(options.output) as outfile:
+            outfile.writelines(lines)
+    else:
+        sys.stdout.writelines(lines)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# A module to work out how gravity varies with radius inside a curved 2D
+# axisymmetric model, from the model's own layered mass distribution, and to
+# write body-force loads that follow it. Elements are grouped by material and
+# radial bin, so the number of *Dload lines stays small no matter how fine the
+# mesh is.
+#
+# The load magnitude written for each group is its density scaled by
+# g(r)/g(surface). The BRNU/BZNU DLOAD subroutine used with the constant-gravity
+# loads (which are just the density) therefore needs no changes.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+from math import pi
+import sys, optparse
+import numpy as np
+import abq_mesh
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Universal gravity constant
+G = 6.67384e-11 #m3.kg-1.s-2
+
+# Surface gravity and radius. Together these give the mass of the whole body,
+# and so the mass of whatever is below the bottom of the mesh.
+gravity = 1.622 #m.s-2
+planet_radius = 1740e3 #m
+
+# Number of radial bins elements are grouped into
+num_bins = 20
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def gravity_profile(radii, element_radii, masses, volumes, bin_edges):
+    """
+    Calculates gravity at the given radii inside a spherically layered body,
+    from the radii, masses and volumes of the elements in the mesh. The mesh is
+    split into radial shells (bin_edges), each given the mean density of the
+    elements in it, so models that only cover part of the sphere still count
+    whole shells. Everything below the mesh is lumped together so that gravity at
+    planet_radius comes out as the surface gravity.
+    """
+
+    # Mean density of each shell, and the mass of the whole shell
+    shell = np.clip(np.searchsorted(bin_edges, element_radii, side="right") - 1,
+                    0, len(bin_edges) - 2)
+    shell_mass = np.bincount(shell, masses, len(bin_edges) - 1)
+    shell_volume = np.bincount(shell, volumes, len(bin_edges) - 1)
+    shell_density = shell_mass / np.where(shell_volume > 0, shell_volume, 1.0)
+    full_shell_mass = shell_density * 4/3*pi * np.diff(bin_edges**3)
+
+    # Whatever isn't in the mesh is below it
+    total_mass = gravity * planet_radius**2 / G
+    core_mass = total_mass - full_shell_mass.sum()
+
+    # Mass inside each radius: the core, every whole shell below, and the part
+    # of the radius's own shell that's inside it
+    mass_below = core_mass + np.concatenate(([0.0], np.cumsum(full_shell_mass)))
+    this_shell = np.clip(np.searchsorted(bin_edges, radii, side="right") - 1,
+                         0, len(bin_edges) - 2)
+    enclosed = mass_below[this_shell] + shell_density[this_shell] * 4/3*pi * \
+               (radii**3 - bin_edges[this_shell]**3)
+
+    return G * enclosed / radii**2
+
+
+def radial_load_groups(mesh, densities, num_bins, skip_materials=()):
+    """
+    Groups the elements of a mesh by material and radial bin, and works out the
+    load magnitude (density x g(r)/g(surface)) for each group. Returns a list of
+    (set name, material, element labels, magnitude), sorted by material.
+    Materials whose names contain any of skip_materials are left out.
+    """
+
+    labels, centroids, areas, ring_volumes = abq_mesh.element_geometry(mesh)
+    element_density = abq_mesh.element_densities(mesh, labels, densities)
+    radii = np.hypot(centroids[:, 0], centroids[:, 1])
+
+    # Bin edges cover the whole mesh (and at least up to the surface), and
+    # gravity is taken at the middle of each bin
+    node_radii = np.hypot(mesh.coords[:, 0], mesh.coords[:, 1])
+    bin_edges = np.linspace(node_radii.min(),
+                            max(node_radii.max(), planet_radius), num_bins + 1)
+    middles = (bin_edges[:-1] + bin_edges[1:]) / 2.0
+    g_scale = gravity_profile(middles, radii, element_density * ring_volumes,
+                              ring_volumes, bin_edges) / gravity
+
+    element_bin = np.clip(np.searchsorted(bin_edges, radii, side="right") - 1,
+                          0, num_bins - 1)
+
+    # Gather each material's elements (from every set that's made of it, so
+    # that each group is only defined and loaded once), and group them by bin
+    densities = dict((name.upper(), value) for name, value in
+                     (densities or mesh.densities).items())
+    row_of = abq_mesh.id_mapper(labels)
+    material_rows = {}
+    for this_set in sorted(mesh.sections):
+        this_material = mesh.sections[this_set]
+        if any(name in this_material for name in skip_materials):
+            continue
+        if this_set not in mesh.elsets or this_material not in densities:
+            continue
+        material_rows.setdefault(this_material, []).append(
+            row_of(mesh.elsets[this_set]))
+    groups = []
+    for this_material in sorted(material_rows):
+        rows = np.unique(np.concatenate(material_rows[this_material]))
+        for this_bin in np.unique(element_bin[rows]):
+            members = labels[rows][element_bin[rows] == this_bin]
+            groups.append(("grav_%s_r%02d"%(this_material, this_bin),
+                           this_material, np.sort(members),
+                           densities[this_material] * g_scale[this_bin]))
+
+    return groups
+
+
+def elset_lines(groups):
+    """
+    Writes out *Elset definitions for a list of load groups, to go inside the
+    part definition
+    """
+
+    lines = []
+    for (setname, material, members, magnitude) in groups:
+        lines.append("*Elset, elset=%s\n"%setname)
+        for start in range(0, len(members), 16):
+            lines.append(", ".join("%d"%label for label in
+                                   members[start:start+16]) + "\n")
+    return lines
+
+
+def dload_lines(groups, instance_name, material_name=None):
+    """
+    Writes out the *Dload definitions for a list of load groups, optionally only
+    the ones for a single material
+    """
+
+    lines = []
+    for (setname, material, members, magnitude) in groups:
+        if material_name is not None and material != material_name.upper():
+            continue
+        lines.append("*Dload\n")
+        lines.append("%s.%s, BRNU, %f\n"%(instance_name, setname, magnitude))
+        lines.append("%s.%s, BZNU, %f\n"%(instance_name, setname, magnitude))
+    return lines
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-m","--mattable",dest="mattable_filename",default=None,
+                      help="take densities from this material table instead "
+                           "of the .inp file")
+    parser.add_option("-g","--grav_density",dest="grav_density",default="final",
+                      help="which material table density to use (\"initial\", "
+                           "\"average\", or [\"final\"])")
+    parser.add_option("-b","--bins",type="int",dest="num_bins",default=None,
+                      help="number of radial bins [%d]"%num_bins)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+    if options.num_bins:
+        num_bins = options.num_bins
+
+    if len(args) != 1:
+        print("ERROR: Please specify one and only one .inp file")
+        sys.exit()
+
+    # Print the gravity profile and the load groups it makes
+    mesh = abq_mesh.mesh_loader(args[0])
+    densities = None
+    if options.mattable_filename:
+        densities = abq_mesh.mattable_densities(options.mattable_filename,
+                                                options.grav_density)
+    try:
+        groups = radial_load_groups(mesh, densities, num_bins)
+    except KeyError as error:
+        print("ERROR: %s"%error.args[0])
+        sys.exit()
+
+    print("%-24s %-16s %8s %14s"%("Set", "Material", "Elements", "Magnitude"))
+    for (setname, material, members, magnitude) in groups:
+        print("%-24s %-16s %8d %14f"%(setname, material, len(members), magnitude))
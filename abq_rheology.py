@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+# A module to work out the temperature-dependent creep table abq_applymattable.py
+# writes in place of the 4.2E-42 viscosity dummy variable. Every viscosity
+# setup the models have used is kept here as a named profile, instead of as a
+# commented-out block in abq_applymattable.py, and one is picked by name:
+#   abq_applymattable.py --creep oriF01d -m foo_mat.txt foo_nomat.inp
+#   abq_builddeck.py --creep arrhenius300 -m foo_mat.txt foo_nomat_ps0.inp
+# A profile is a list of rules, each giving the materials it covers (by a piece
+# of their names; the first rule that matches wins) and a law:
+#   ("step", [(T, A), ...])   - the table as it's written, breakpoint by
+#                               breakpoint (what every model so far has used)
+#   ("arrhenius", {...})      - A = A0*exp(-(E + P*V)/(R*T)), between A_min and
+#                               A_max, with P the lithostatic pressure at the top
+#                               of each material (the weight of the materials
+#                               above it, from the material table's depths and
+#                               densities)
+# where A is Abaqus's creep coefficient (1/(3 x viscosity) for n = 1). Arrhenius
+# laws are worked out on a fine temperature grid for every material at once,
+# and then cut down to as few breakpoints as keep Abaqus's straight-line
+# interpolation between them within a tolerance of the law. To see them:
+#   abq_rheology.py -l
+#   abq_rheology.py -p arrhenius300 -m foo_mat.txt
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, optparse
+import abq_fileio
+
+# numpy is only needed for Arrhenius laws, so don't make step profiles (and so
+# abq_applymattable.py) depend on it
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Gas constant, and the gravity used for the pressure at the top of each
+# material
+R = 8.314 #J.mol-1.K-1
+gravity = 1.622 #m.s-2
+
+# Temperatures Arrhenius laws are worked out at before the table is cut down
+temperature_range = (0.0, 3000.0) #K
+temperature_step = 1.0 #K
+
+# How far (as a fraction of the creep coefficient) Abaqus's interpolation
+# between breakpoints may stray from an Arrhenius law
+tolerance = 0.05
+
+# Which profile to use when none is picked
+default_profile = "oriC11i"
+
+# The profiles: (piece of the material name, law) rules, first match wins
+profiles = {
+
+    # DEPRECATED
+    "deprecated": [
+        ("CRUST", ("step", [(0, 1.0e-30), (1200, 1.0e-30), (1201, 1.0e-30),
+                            (2000, 1.0e-30)])),
+        ("", ("step", [(0, 1.0e-30), (1200, 1.0e-30), (1201, 1.0e-23),
+                       (2000, 1.0e-23)]))],
+
+    # 3-viscosity setup (ori60km30Ka,b,c,NOT D,e,f
+    "ori60km30Ka": [
+        ("CRUST", ("step", [(0, 1.0e-30), (2000, 1.0e-30)])),
+        ("", ("step", [(0, 1.0e-30), (1100, 1.0e-30), (1101, 3.0e-26),
+                       (1300, 3.0e-26), (1301, 1.0e-23), (2000, 1.0e-23)]))],
+
+    # Viscosity setup with gradients: minimum 1e23
+    # FIRST USED 2013-05-17 in model ori60km30K
+    # Models: ... oriC02, oriC02b
+    "oriC02": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 1.0e-40), (1100, 1.0e-40), (1101, 1.0e-27),
+                       (1300, 3.0e-26), (1350, 1.0e-24), (1351, 1.0e-23),
+                       (2000, 1.0e-23)]))],
+
+    # Mantle & melt: gradients with a minimum of 1e24 Pa.s
+    # Crust: Elastic crust
+    # Models: oriC02c, oriC03a, oriC04/a/b/c/d/e/f/g, oriC05/a,
+    # oriC09b_*_gradientvisco
+    "oriC04": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 1.0e-40), (1100, 1.0e-40), (1101, 1.0e-27),
+                       (1300, 3.0e-26), (1350, 1.0e-24), (2000, 1.0e-24)]))],
+
+    # Mantle & melt: gradients with a minimum of 1e22 Pa.s
+    # Crust: Elastic crust
+    # Models: oriC04i/j
+    "oriC04i": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 1.0e-40), (1100, 1.0e-40), (1101, 1.0e-27),
+                       (1300, 3.0e-26), (1350, 1.0e-22), (2000, 1.0e-22)]))],
+
+    # Mantle & melt: new-style single-rollover structure, with the
+    #                rollover point = 1250 K
+    # Crust: Elastic crust
+    # Models: oriC05b
+    "oriC05b": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 1.0e-40), (1250, 1.0e-40), (1251, 1.0e-22),
+                       (9999, 1.0e-22)]))],
+
+    # Mantle & melt: new-style single-rollover structure, with the
+    #                rollover point = 1100 K
+    # Crust: Elastic crust
+    # Models: oriC05c, oriC06-09
+    "oriC05c": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 1.0e-40), (1100, 1.0e-40), (1101, 1.0e-23),
+                       (9999, 1.0e-23)]))],
+
+    # Mantle & melt: new-style single-rollover structure, with the
+    #                rollover point = 1300 K
+    # Crust: Elastic crust
+    # Models: oriC05c
+    "oriC05c_1300K": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 1.0e-40), (1300, 1.0e-40), (1301, 1.0e-23),
+                       (9999, 1.0e-23)]))],
+
+    # Mantle & melt: new-style single-rollover structure, with the
+    #                rollover region from 1075-1125 K
+    # Crust: Elastic crust
+    # Models: oriC09c_visco_ps7_1e26Pas, oriF01a-c
+    "oriF01a": [
+        ("CRUST", ("step", [(0, 1.0e-40), (2000, 1.0e-40)])),
+        ("", ("step", [(0, 2.5e-41), (1075, 2.5e-41), (1125, 2.5e-27),
+                       (3000, 2.5e-27)]))],
+
+    # Mantle & melt: 2 layers at 1e30 and 1e22 plus transition
+    #                zone; minimum viscosity at > 1280 K;
+    #                transition from 1101-1280 K
+    # Crust: Elastic crust
+    # Models: oriF01d
+    "oriF01d": [
+        ("CRUST", ("step", [(0, 2.5e-41), (9999, 2.5e-40)])),
+        ("", ("step", [(0, 2.5e-31), (1100, 2.5e-31), (1280, 2.5e-23),
+                       (9999, 2.5e-23)]))],
+
+    # Mantle & melt: 2 layers at 1e30 and 1e22 plus transition
+    #                zone; minimum viscosity at > 1250 K;
+    #                transition from 1100-1250 K
+    # Crust: Elastic crust
+    # Models: oriF01j, oriF02a, oriF03a
+    "oriF01j": [
+        ("CRUST", ("step", [(0, 2.5e-41), (9999, 2.5e-40)])),
+        ("", ("step", [(0, 2.5e-31), (1100, 2.5e-31), (1250, 2.5e-23),
+                       (9999, 2.5e-23)]))],
+
+    # Mantle & melt: 2 layers at 1e30 and 1e23 plus transition
+    #                zone; minimum viscosity at > 1250 K;
+    #                transition from 1100-1250 K
+    # Crust: Elastic crust
+    # Models: oriF03b, oriF03d
+    "oriF03b": [
+        ("CRUST", ("step", [(0, 2.5e-41), (9999, 2.5e-40)])),
+        ("", ("step", [(0, 2.5e-31), (1100, 2.5e-31), (1250, 2.5e-24),
+                       (9999, 2.5e-24)]))],
+
+    # Mantle & melt: 2 layers at 1e30 and 1e24 plus transition
+    #                zone; minimum viscosity at > 1250 K;
+    #                transition from 1100-1250 K
+    # Crust: Elastic crust
+    # Models: oriF03c, oriF03e, oriF04a, oriF04b, oriF05a/b/c,
+    #         oriC10a
+    "oriF03c": [
+        ("CRUST", ("step", [(0, 2.5e-41), (9999, 2.5e-40)])),
+        ("", ("step", [(0, 2.5e-31), (1100, 2.5e-31), (1250, 2.5e-25),
+                       (9999, 2.5e-25)]))],
+
+    # Mantle, melt, and crust: 2 layers at 1e30 and 1e24 plus
+    #      transition zone; minimum viscosity at > 800 K;
+    #      transition from 700-800 K
+    # Models: oriC11i, oriC11j, oriC12*
+    "oriC11i": [
+        ("", ("step", [(0, 2.5e-31), (700, 2.5e-31), (800, 2.5e-25),
+                       (9999, 2.5e-25)]))],
+
+    # Mantle & melt: Arrhenius law with a 300 kJ/mol activation energy
+    #                (about 1e21 Pa.s at 1600 K, 1e27 Pa.s at 1000 K),
+    #                between 1e21 and 1e30 Pa.s
+    # Crust: Elastic crust
+    "arrhenius300": [
+        ("CRUST", ("step", [(0, 2.5e-41), (9999, 2.5e-40)])),
+        ("", ("arrhenius", {"A0": 6.0e-13, "E": 300e3, "V": 0.0,
+                            "A_min": 2.5e-31, "A_max": 2.5e-22}))],
+
+    # As arrhenius300, but with a 6 cm^3/mol activation volume, so deeper
+    # materials are stiffer
+    "arrhenius300V": [
+        ("CRUST", ("step", [(0, 2.5e-41), (9999, 2.5e-40)])),
+        ("", ("arrhenius", {"A0": 6.0e-13, "E": 300e3, "V": 6e-6,
+                            "A_min": 2.5e-31, "A_max": 2.5e-22}))],
+    }
+
+
+######## Main Program ##########################################################
+
+def law_finder(profile, material_name):
+    """
+    The law of the first rule in a profile whose name piece is in the
+    material's name (None if there isn't one)
+    """
+    for piece, law in profile:
+        if piece.upper() in material_name.upper():
+            return law
+    return None
+
+
+def needs_numpy(profile):
+    """
+    Whether any of a profile's laws need numpy (Arrhenius laws do)
+    """
+    return any(law[0] == "arrhenius" for piece, law in profile)
+
+
+def overburden_pressures(depths, densities):
+    """
+    The lithostatic pressure at the top of each material: the weight of
+    everything above it, going down from one material top to the next with
+    the density of the material(s) starting at each (averaged, where several
+    start at the same depth)
+    """
+    starting = {}
+    for depth, density in zip(depths, densities):
+        starting.setdefault(float(depth), []).append(float(density))
+    tops = sorted(starting)
+    pressure = 0.0
+    pressures = {}
+    for top, next_top in zip(tops, tops[1:] + [None]):
+        pressures[top] = pressure
+        if next_top is not None:
+            pressure += sum(starting[top])/len(starting[top])*(next_top - top)*gravity
+    return [pressures[float(depth)] for depth in depths]
+
+
+def arrhenius_coefficients(temperatures, parameters, pressures):
+    """
+    Works out an Arrhenius law's creep coefficient at every temperature, for
+    every material at once (one pressure per material), as a (materials x
+    temperatures) array. It's done in logs so that cold temperatures go to
+    A_min instead of underflowing.
+    """
+    with np.errstate(divide="ignore"):
+        exponents = -(parameters["E"] + pressures[:, None]*parameters.get("V", 0.0)) / \
+                    (R*np.asarray(temperatures, dtype=float)[None, :])
+    logs = np.log(parameters["A0"]) + exponents
+    return np.exp(np.clip(logs, np.log(parameters["A_min"]),
+                          np.log(parameters["A_max"])))
+
+
+def segment_checker(temperatures, coefficients, rows, starts, ends):
+    """
+    Whether interpolating in a straight line from each row's start breakpoint
+    to its end one stays within the tolerance of the coefficients in between.
+    Only the columns between the two are looked at, so short segments are
+    cheap to check.
+    """
+    rows = rows[:, None]
+    starts = starts[:, None]
+    ends = ends[:, None]
+    columns = starts + np.arange(1, max((ends - starts).max(), 1))[None, :]
+    inside = columns < ends
+    columns = np.minimum(columns, ends)
+    first = coefficients[rows, starts]
+    fractions = (temperatures[columns] - temperatures[starts]) / \
+                (temperatures[ends] - temperatures[starts])
+    lines = first + fractions*(coefficients[rows, ends] - first)
+    values = coefficients[rows, columns]
+    return ~(inside & (np.abs(lines - values) > tolerance*values)).any(axis=1)
+
+
+def table_compactor(temperatures, coefficients):
+    """
+    Picks breakpoints out of every row of coefficients (the same temperatures
+    for each), keeping the first and last and going as far as the tolerance
+    allows from each breakpoint to the next. All the rows are searched
+    together: each row's next breakpoint is galloped out to (1, 2, 4, ...
+    columns on) until the line stops fitting, then bisected for. Returns a
+    list of breakpoint columns for each row.
+    """
+
+    temperatures = np.asarray(temperatures, dtype=float)
+    last = coefficients.shape[1] - 1
+    starts = np.zeros(len(coefficients), dtype=int)
+    breakpoints = [[0] for row in coefficients]
+
+    active = np.nonzero(starts < last)[0]
+    while len(active):
+        # The next breakpoint is somewhere in (start, last]: the column right
+        # after the start always fits (lows), and one past the last never
+        # does (highs)
+        lows = starts[active] + 1
+        highs = np.zeros(len(active), dtype=int) + last + 1
+        reach = 2
+        searching = np.nonzero(lows < last)[0]
+        while len(searching):
+            ends = np.minimum(starts[active[searching]] + reach, last)
+            fits = segment_checker(temperatures, coefficients, active[searching],
+                                   starts[active[searching]], ends)
+            lows[searching[fits]] = ends[fits]
+            highs[searching[~fits]] = ends[~fits]
+            searching = searching[fits & (ends < last)]
+            reach *= 2
+        searching = np.nonzero(highs - lows > 1)[0]
+        while len(searching):
+            middles = (lows[searching] + highs[searching])//2
+            fits = segment_checker(temperatures, coefficients, active[searching],
+                                   starts[active[searching]], middles)
+            lows[searching[fits]] = middles[fits]
+            highs[searching[~fits]] = middles[~fits]
+            searching = searching[highs[searching] - lows[searching] > 1]
+
+        starts[active] = lows
+        for row, column in zip(active, lows):
+            breakpoints[row].append(column)
+        active = active[lows < last]
+
+    return breakpoints
+
+
+def creep_tables(names, depths, densities, profile):
+    """
+    Works out the creep table of every material (by name, with the depth of
+    its top and its density, for the pressure under it) from a profile. Returns
+    a dictionary of (stress exponent, [(temperature, coefficient), ...]) by
+    material name; materials no rule covers are left out.
+    """
+
+    tables = {}
+    laws = [law_finder(profile, name) for name in names]
+
+    # Step laws are already tables
+    for name, law in zip(names, laws):
+        if law is not None and law[0] == "step":
+            tables[name] = (1.0, [(float(T), A) for T, A in law[1]])
+
+    # Arrhenius laws: all the materials under the same law at once, and only
+    # one table for each distinct curve
+    if not needs_numpy(profile):
+        return tables
+    pressures = np.asarray(overburden_pressures(depths, densities))
+    temperatures = np.arange(temperature_range[0],
+                             temperature_range[1] + temperature_step/2, temperature_step)
+    for i, (piece, law) in enumerate(profile):
+        if law[0] != "arrhenius":
+            continue
+        members = [j for j, this_law in enumerate(laws) if this_law is law]
+        if not members:
+            continue
+        coefficients = arrhenius_coefficients(temperatures, law[1], pressures[members])
+        curves, which = np.unique(coefficients, axis=0, return_inverse=True)
+        breakpoints = table_compactor(temperatures, curves)
+        for j, k in zip(members, which.ravel()):
+            tables[names[j]] = (law[1].get("n", 1.0),
+                                [(temperatures[column], curves[k, column])
+                                 for column in breakpoints[k]])
+
+    return tables
+
+
+def coefficient_formatter(coefficient):
+    """
+    A creep coefficient the way the tables have always been written (2.5e-31),
+    with more digits only if it needs them
+    """
+    short = "%.1e"%coefficient
+    if float(short) == coefficient:
+        return short
+    return "%.6e"%coefficient
+
+
+def creep_lines(table):
+    """
+    The lines of a creep table (stress exponent, breakpoints) to go under an
+    Abaqus *Creep keyword: coefficient, stress exponent, time exponent (0),
+    temperature
+    """
+    exponent, breakpoints = table
+    lines = []
+    for T, A in breakpoints:
+        if T == int(T):
+            temperature = "%6d"%T
+        else:
+            temperature = "%8.2f"%T
+        lines.append("    %s,%8.1f,    0.,%s.\n"%(coefficient_formatter(A),
+                                                 exponent, temperature))
+    return lines
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] (-l | [-p PROFILE] [-m foo_mat.txt])"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-l","--list",action="store_true",
+                      dest="list",default=False,
+                      help="list the profiles")
+    parser.add_option("-p","--profile",dest="profile",default=default_profile,
+                      help="profile to write tables for [%default]")
+    parser.add_option("-m","--mattable",dest="mattable",default=None,
+                      help="material table, for each material's depth and "
+                           "density (default: one crust and one mantle "
+                           "material at the surface)")
+    parser.add_option("-e","--tolerance",type="float",
+                      dest="tolerance",default=tolerance,
+                      help="fraction of the coefficient Arrhenius tables may "
+                           "be off by [%default]")
+    parser.add_option("-s","--step",type="float",
+                      dest="step",default=temperature_step,
+                      help="temperature spacing Arrhenius laws are worked "
+                           "out at, in K [%default]")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    if options.list:
+        for name in sorted(profiles, key=str.lower):
+            print("%-16s %s"%(name, "; ".join(
+                "%s: %s"%(piece or "others", law[0]) for piece, law in profiles[name])))
+        sys.exit()
+
+    if options.profile not in profiles:
+        print("ERROR: No profile %s (see -l for the list)"%options.profile)
+        sys.exit()
+    if np is None and needs_numpy(profiles[options.profile]):
+        print("ERROR: Profile %s has Arrhenius laws, which need numpy"%options.profile)
+        sys.exit()
+    tolerance = options.tolerance
+    temperature_step = options.step
+
+    if options.mattable:
+        import abq_applymattable
+        materials = abq_applymattable.mattable_parser(abq_fileio.open_input(options.mattable))
+        names = sorted(materials)
+        depths = [materials[name].depth for name in names]
+        densities = [materials[name].densi for name in names]
+    else:
+        names, depths, densities = ["CRUST", "MANTLE"], [0.0, 0.0], [0.0, 0.0]
+
+    grid_size = int(round((temperature_range[1] - temperature_range[0])/temperature_step)) + 1
+    tables = creep_tables(names, depths, densities, profiles[options.profile])
+    for name in names:
+        if name not in tables:
+            print("** %s: no rule in %s covers it\n"%(name, options.profile))
+            continue
+        law = law_finder(profiles[options.profile], name)
+        if law[0] == "arrhenius":
+            print("** %s: %d breakpoints (out of %d)"%(name, len(tables[name][1]),
+                                                       grid_size))
+        else:
+            print("** %s"%name)
+        print("".join(creep_lines(tables[name])))
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+# A program to calculate gravity at the surface of a 2D axisymmetric Abaqus
+# model by treating every element as a ring of mass around the axis of symmetry.
+# The gravitational attraction of each ring at each observation point (the
+# "kernel") depends only on the mesh and the observation points, so it's worked
+# out once, cached on disk, and re-used for every density or deformation state
+# of every model that shares the mesh.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+from math import pi
+import sys, os, hashlib, optparse
+import numpy as np
+import abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Universal gravity constant
+G = 6.67384e-11 #m3.kg-1.s-2
+
+# For curved models, observation points are on a sphere of this radius
+planet_radius = 1740e3 #m
+
+# Height of the observation points above the surface (planet_radius for curved
+# models, the top of the mesh for flat ones)
+altitude = 0.0 #m
+
+# Number of observation points
+num_points = 51
+
+# Is the model curved?
+curved_mode = False
+
+# Which density from the material table goes into the masses? ("initial",
+# "final", or "average")
+grav_density = "final"
+
+# Where do cached kernels go? (one file per mesh/observation point combination)
+cache_dirname = os.path.join(os.path.expanduser("~"), ".abq_ringgrav")
+
+# Each element is split into quadrature_order x quadrature_order rings, so that
+# elements close to the observation points are still represented accurately
+quadrature_order = 3
+
+# Size of the step used to work out how the kernel changes as the rings move
+displacement_step = 1.0 #m
+
+# File endings for the output files
+anomaly_suffix = "_freeair.xy"
+acceleration_suffix = "_acc.xy"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def elliptic_integrals(m):
+    """
+    Calculates the complete elliptic integrals of the first and second kind,
+    K(m) and E(m), for an array of parameters m = k**2, using the
+    arithmetic-geometric mean
+    """
+
+    a = np.ones(np.shape(m))
+    b = np.sqrt(1.0 - m)
+    c = np.sqrt(m)
+    power = 0.5
+    c_sum = power * c**2
+
+    # The AGM converges quadratically, so this doesn't take many passes
+    for i in range(30):
+        c = (a - b) / 2.0
+        a, b = (a + b) / 2.0, np.sqrt(a*b)
+        power *= 2
+        c_sum += power * c**2
+        if np.all(np.abs(c) <= 1e-16 * a):
+            break
+
+    K = pi / (2.0*a)
+    E = K * (1.0 - c_sum)
+    return K, E
+
+
+def ring_attraction(r, z, a, z0):
+    """
+    Calculates the gravitational acceleration (g_r, g_z) at points (r, z) due to
+    a ring of unit mass with radius a at height z0, both in the r-z plane of an
+    axisymmetric model. All arguments broadcast against each other.
+    """
+
+    dz = z - z0
+    p2 = (r + a)**2 + dz**2
+    q2 = (r - a)**2 + dz**2
+    p = np.sqrt(p2)
+    K, E = elliptic_integrals(4.0*a*r / p2)
+
+    g_z = -2.0*G * dz * E / (pi * p * q2)
+
+    # The radial part has a removable singularity on the axis, where it's zero
+    with np.errstate(divide="ignore", invalid="ignore"):
+        g_r = -G / (pi * r * p) * (K - (a**2 - r**2 + dz**2) / q2 * E)
+    g_r = np.where(r > 0, g_r, 0.0)
+
+    return g_r, g_z
+
+
+def observation_points(coords, num_points, curved):
+    """
+    Lays out observation points along the surface of the model: on a sphere of
+    radius planet_radius (+ altitude) out to the largest angle in the mesh for
+    curved models, or along the top of the mesh for flat ones. Returns the
+    points' (r, z) coordinates and their distance along the surface (km).
+    """
+
+    if curved:
+        max_angle = np.arctan2(coords[:, 0], coords[:, 1]).max()
+        angles = np.linspace(0.0, max_angle, num_points)
+        obs_r = (planet_radius + altitude) * np.sin(angles)
+        obs_z = (planet_radius + altitude) * np.cos(angles)
+        distance = angles * planet_radius / 1000.0
+    else:
+        obs_r = np.linspace(0.0, coords[:, 0].max(), num_points)
+        obs_z = np.zeros(num_points) + coords[:, 1].max() + altitude
+        distance = obs_r / 1000.0
+
+    return obs_r, obs_z, distance
+
+
+def kernel_builder(points, fractions, obs_r, obs_z, curved):
+    """
+    Builds the kernel matrices for a set of elements and observation points: A,
+    the downward (or inward, for curved models) gravity at each point due to a
+    unit mass in each element, and dA_dr, dA_dz, how that changes when the
+    element moves. Each is (points x elements). The elements are given as the
+    (elements x rings x 2) coordinates of the rings making them up, and the
+    fraction of the element's mass in each ring.
+    """
+
+    def downward(r, z):
+        g_r, g_z = ring_attraction(obs_r[:, None], obs_z[:, None],
+                                   r[None, :], z[None, :])
+        if curved:
+            R = np.hypot(obs_r, obs_z)[:, None]
+            return -(g_r*obs_r[:, None] + g_z*obs_z[:, None]) / R
+        else:
+            return -g_z
+
+    h = displacement_step
+    A = 0.0
+    dA_dr = 0.0
+    dA_dz = 0.0
+    for i in range(points.shape[1]):
+        r = points[:, i, 0]
+        z = points[:, i, 1]
+        share = fractions[:, i][None, :]
+        A = A + share * downward(r, z)
+        dA_dr = dA_dr + share * (downward(r + h, z) - downward(r - h, z)) / (2*h)
+        dA_dz = dA_dz + share * (downward(r, z + h) - downward(r, z - h)) / (2*h)
+
+    return A, dA_dr, dA_dz
+
+
+def cached_kernel(points, fractions, obs_r, obs_z, curved):
+    """
+    Returns the kernel matrices for a mesh and set of observation points,
+    loading them from the cache if they've been worked out before and saving
+    them there if not. The cache is keyed on the actual coordinates, so it's
+    shared by every model (and every iteration) that uses the same mesh.
+    """
+
+    key = hashlib.sha1()
+    for array in (points, fractions, obs_r, obs_z):
+        key.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    key.update(str((curved, displacement_step)).encode())
+    cache_filename = os.path.join(cache_dirname,
+                                  "ringkernel_%s.npz"%key.hexdigest())
+
+    if os.path.exists(cache_filename):
+        if verbose_mode:
+            print("Using cached kernel %s..."%cache_filename)
+        cache = np.load(cache_filename)
+        return cache["A"], cache["dA_dr"], cache["dA_dz"]
+
+    if verbose_mode:
+        print("Building kernel for %d elements at %d points..."%(len(points),
+                                                                len(obs_r)))
+    A, dA_dr, dA_dz = kernel_builder(points, fractions, obs_r, obs_z, curved)
+
+    if not os.path.isdir(cache_dirname):
+        os.makedirs(cache_dirname)
+    temp_filename = cache_filename + ".tmp%d.npz"%os.getpid()
+    np.savez(temp_filename, A=A, dA_dr=dA_dr, dA_dz=dA_dz)
+    os.rename(temp_filename, cache_filename)
+
+    return A, dA_dr, dA_dz
+
+
+def ring_gravity(kernel, masses, displacements=None):
+    """
+    Calculates gravity at the observation points from a kernel and the mass of
+    each ring. If the rings' (r, z) displacements are given, the change in
+    gravity due to moving them is included to first order (each element keeps
+    its mass as it deforms).
+    """
+
+    A, dA_dr, dA_dz = kernel
+    g = np.dot(A, masses)
+    if displacements is not None:
+        g += np.dot(dA_dr, masses*displacements[:, 0])
+        g += np.dot(dA_dz, masses*displacements[:, 1])
+    return g
+
+
+def rptfile_parser_displacements(rptfile, num_components=2):
+    """
+    Goes through a .rpt file of nodal displacements (node label, U1, U2, in the
+    model's global r-z coordinates, or U1, U2, U3 if num_components is 3) and
+    returns the labels and displacements
+    """
+
+    labels = []
+    displacements = []
+    for line in rptfile:
+
+        # Skip blank lines
+        if line.strip() == "":
+            continue
+
+        # Data lines start with a node label
+        if line.strip()[0].isdigit():
+            values = line.split()
+            labels.append(int(values[0]))
+            displacements.append([float(value) for value in values[-num_components:]])
+
+    return np.array(labels, dtype=int), np.array(displacements)
+
+
+def element_displacements(mesh, node_labels, node_displacements):
+    """
+    Averages nodal displacements over the corner nodes of every element to get
+    the displacement of each element's centroid
+    """
+
+    labels, types, conn = mesh.elements()
+    displacements = np.zeros((len(mesh.node_ids), 2))
+    row_of = mesh.node_rows()
+    displacements[row_of(node_labels)] = node_displacements
+    return displacements[conn].mean(axis=1)
+
+
+def model_gravity(inpfilename, mattable_filename=None, urptfilename=None):
+    """
+    Runs the whole calculation for one model: reads the mesh and densities,
+    gets the kernel, and returns the observation point distances (km) and
+    gravity there (m.s-2)
+    """
+
+    mesh = abq_mesh.mesh_loader(inpfilename)
+    labels, centroids, areas, ring_volumes = abq_mesh.element_geometry(mesh)
+
+    # Densities come from the material table if there is one, otherwise from
+    # the .inp file itself
+    densities = None
+    if mattable_filename:
+        densities = abq_mesh.mattable_densities(mattable_filename, grav_density)
+    masses = abq_mesh.element_densities(mesh, labels, densities) * ring_volumes
+
+    obs_r, obs_z, distance = observation_points(mesh.coords, num_points,
+                                                curved_mode)
+    points, fractions = abq_mesh.element_quadrature(mesh, quadrature_order)
+    kernel = cached_kernel(points, fractions, obs_r, obs_z, curved_mode)
+
+    displacements = None
+    if urptfilename:
+        node_labels, node_displacements = \
+            rptfile_parser_displacements(abq_fileio.open_input(urptfilename))
+        try:
+            displacements = element_displacements(mesh, node_labels,
+                                                  node_displacements)
+        except KeyError as error:
+            raise KeyError("%s doesn't match %s: %s"%(urptfilename, inpfilename,
+                                                      error.args[0]))
+
+    return distance, ring_gravity(kernel, masses, displacements)
+
+
+def xyfile_parser(xyfile):
+    """
+    Reads a two-column (distance, value) .xy file
+    """
+    data = np.loadtxt(xyfile, ndmin=2)
+    return data[:, 0], data[:, 1]
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp [foo.Urpt]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved",default=False,
+                      help="run for a curved instead of flat model")
+    parser.add_option("-n",type="int",dest="num_points",default=None,
+                      help="number of observation points")
+    parser.add_option("-m","--mattable",dest="mattable_filename",default=None,
+                      help="take densities from this material table instead "
+                           "of the .inp file")
+    parser.add_option("-g","--grav_density",dest="grav_density",default=None,
+                      help="which material table density to use (\"initial\", "
+                           "\"average\", or [\"final\"])")
+    parser.add_option("--acceleration",action="store_true",
+                      dest="acceleration",default=False,
+                      help="write out the total acceleration (e.g. for a "
+                           "geoid model) instead of an anomaly")
+    parser.add_option("--geoidname",dest="geoidname",default=None,
+                      help="acceleration .xy file of the geoid model to "
+                           "subtract to get a free-air anomaly")
+    parser.add_option("--cachedir",dest="cachedir",default=None,
+                      help="directory for cached kernels [%s]"%cache_dirname)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.curved:
+        curved_mode = True
+    if options.num_points:
+        num_points = options.num_points
+    if options.grav_density:
+        grav_density = options.grav_density
+    if options.cachedir:
+        cache_dirname = options.cachedir
+
+    # Process positional arguments: the .inp file with the mesh, and optionally
+    # a report of nodal displacements for the deformed state
+    if len(args) < 1 or len(args) > 2:
+        print("ERROR: Please specify a .inp file and (optionally) a displacement .rpt file")
+        sys.exit()
+    inpfilename = args[0]
+    urptfilename = None
+    if len(args) == 2:
+        urptfilename = args[1]
+    if not options.acceleration and not options.geoidname:
+        print("ERROR: Please give a geoid model with --geoidname, or use --acceleration")
+        sys.exit()
+
+    if verbose_mode:
+        print("Reading file %s..."%inpfilename)
+    try:
+        distance, gravity = model_gravity(inpfilename, options.mattable_filename,
+                                          urptfilename)
+    except KeyError as error:
+        print("ERROR: %s"%error.args[0])
+        sys.exit()
+
+    # The output name follows the displacement report if there is one (so that
+    # e.g. foo_ff.Urpt and foo.Urpt don't overwrite each other)
+    basename = os.path.splitext(abq_fileio.plain_name(urptfilename or inpfilename))[0]
+    if options.acceleration:
+        xyfilename = basename + acceleration_suffix
+        values = gravity
+    else:
+        geoid_distance, geoid_gravity = xyfile_parser(
+            abq_fileio.open_input(options.geoidname))
+        xyfilename = basename + anomaly_suffix
+        values = (gravity - np.interp(distance, geoid_distance, geoid_gravity)) \
+                 * 1e5 #mGal
+
+    if verbose_mode:
+        print("Generating xy file %s..."%xyfilename)
+    xyfile = open(xyfilename, 'w')
+    for x, value in zip(distance, values):
+        xyfile.write("%14f %14.8g\n"%(x, value))
+    xyfile.close()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# Functions to pull the useful numbers out of the files Abaqus writes while a job
+# runs: the status file (.sta), the message file (.msg), and the data file
+# (.dat). Used by the job tools (sizing, monitoring, run statistics), and can be
+# run on its own to summarize finished jobs.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, re, optparse
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# The lines Abaqus ends the .sta file with
+completed_marker = "THE ANALYSIS HAS COMPLETED SUCCESSFULLY"
+failed_marker = "THE ANALYSIS HAS NOT BEEN COMPLETED"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def staline_parser(line):
+    """
+    Reads one increment line of a .sta file, e.g.
+        "    1     3   2U    0     9     9  0.2        0.2        0.1"
+    and returns (step, increment, attempt, cutback, iterations, total time, step
+    time, time increment), or None if it isn't an increment line
+    """
+
+    pieces = line.split()
+    if len(pieces) < 9 or not pieces[0].isdigit():
+        return None
+    try:
+        cutback = pieces[2].endswith("U")
+        return (int(pieces[0]), int(pieces[1]), int(pieces[2].rstrip("U")),
+                cutback, int(pieces[5]), float(pieces[6]), float(pieces[7]),
+                float(pieces[8]))
+    except ValueError:
+        return None
+
+
+def stafile_parser(stafile):
+    """
+    Goes through a .sta file and returns a dictionary with the number of
+    increments done, the number of cutbacks, where the job got to, and whether
+    it finished ("completed", "failed", or "running" if it hasn't said yet)
+    """
+
+    summary = {"increments": 0, "cutbacks": 0, "iterations": 0, "steps": 0,
+               "total_time": 0.0, "step_time": 0.0, "time_increment": 0.0,
+               "status": "running"}
+    for line in stafile:
+        increment = staline_parser(line)
+        if increment:
+            step, inc, attempt, cutback, iterations, total, steptime, dt = increment
+            summary["iterations"] += iterations
+            if cutback:
+                summary["cutbacks"] += 1
+                continue
+            summary["increments"] += 1
+            summary["steps"] = step
+            summary["total_time"] = total
+            summary["step_time"] = steptime
+            summary["time_increment"] = dt
+        elif completed_marker in line:
+            summary["status"] = "completed"
+        elif failed_marker in line:
+            summary["status"] = "failed"
+    return summary
+
+
+def msgline_parser(line):
+    """
+    Says whether a line of a .msg file is a "warnings", "errors" or "notes"
+    line, or None if it's none of those
+    """
+
+    if "***WARNING" in line:
+        return "warnings"
+    elif "***ERROR" in line:
+        return "errors"
+    elif "***NOTE" in line:
+        return "notes"
+    return None
+
+
+def msgfile_parser(msgfile):
+    """
+    Counts the warnings, errors, and notes in a .msg file
+    """
+
+    summary = {"warnings": 0, "errors": 0, "notes": 0}
+    for line in msgfile:
+        kind = msgline_parser(line)
+        if kind:
+            summary[kind] += 1
+    return summary
+
+
+def datfile_parser(datfile):
+    """
+    Goes through a .dat file and returns a dictionary with the problem size, the
+    memory estimate (MB, the largest of any process), and the job time summary
+    (s). Anything the file doesn't have (yet) is left out.
+    """
+
+    patterns = (("elements", r"NUMBER OF ELEMENTS IS\s+(\d+)"),
+                ("nodes", r"NUMBER OF NODES IS\s+(\d+)"),
+                ("variables", r"TOTAL NUMBER OF VARIABLES IN THE MODEL\s+(\d+)"),
+                ("user_time", r"USER TIME \(SEC\)\s*=\s*([\d.Ee+-]+)"),
+                ("system_time", r"SYSTEM TIME \(SEC\)\s*=\s*([\d.Ee+-]+)"),
+                ("cpu_time", r"TOTAL CPU TIME \(SEC\)\s*=\s*([\d.Ee+-]+)"),
+                ("wallclock", r"WALLCLOCK TIME \(SEC\)\s*=\s*([\d.Ee+-]+)"))
+    patterns = [(name, re.compile(pattern)) for name, pattern in patterns]
+
+    summary = {}
+    read_memory = False
+    for line in datfile:
+
+        # The memory estimate table has a line for each process after its
+        # header
+        if "PER ITERATION" in line:
+            read_memory = True
+            continue
+        if read_memory:
+            pieces = line.split()
+            if not pieces:
+                continue
+            if pieces[0].isdigit() and len(pieces) >= 4:
+                summary["flops"] = max(summary.get("flops", 0), float(pieces[1]))
+                summary["min_memory"] = max(summary.get("min_memory", 0), float(pieces[2]))
+                summary["io_memory"] = max(summary.get("io_memory", 0), float(pieces[3]))
+                continue
+            read_memory = False
+
+        if "=" in line or "NUMBER OF" in line:
+            for name, pattern in patterns:
+                match = pattern.search(line)
+                if match:
+                    summary[name] = float(match.group(1))
+                    break
+
+    return summary
+
+
+def run_summary(basename):
+    """
+    Gathers up everything in a job's .sta, .msg and .dat files (whichever of
+    them exist) into one dictionary
+    """
+
+    summary = {"job": os.path.basename(basename)}
+    for suffix, parser in ((".sta", stafile_parser),
+                           (".msg", msgfile_parser),
+                           (".dat", datfile_parser)):
+        if os.path.exists(basename + suffix):
+            summary.update(parser(open(basename + suffix, 'r')))
+    return summary
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo [bar ...]   (job names, with or without a suffix)"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+
+    if len(args) < 1:
+        print("ERROR: Please specify at least one job")
+        sys.exit(1)
+
+    columns = ("status", "steps", "increments", "cutbacks", "warnings",
+               "errors", "nodes", "min_memory", "cpu_time", "wallclock")
+    print("%-30s"%"Job" + "".join(" %11s"%column[:11] for column in columns))
+    for arg in args:
+        basename = os.path.splitext(arg)[0] if arg.endswith((".sta", ".msg",
+                                                             ".dat", ".inp")) else arg
+        summary = run_summary(basename)
+        print("%-30s"%summary["job"] +
+              "".join(" %11s"%(("%g"%summary[column]) if isinstance(summary.get(column), float)
+                              else summary.get(column, "-"))
+                      for column in columns))
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# A program to keep a table of how every run went - wall and CPU time,
+# increments, cutbacks, memory estimate, warnings... - pulled out of the .sta,
+# .msg and .dat files of many run directories, including runs that have been
+# packed away into runfiles.abqz or runfiles.tar.gz archives. The table is
+# kept column by column in a small .npz file, and only runs that are new (or
+# have changed) since the last time are read again. It can then be filtered,
+# grouped and sorted, e.g.
+#   abq_runstats.py index runs/
+#   abq_runstats.py query -w "job~oriC11" -c cutbacks,wallclock
+#   abq_runstats.py query -p "_(v[0-9]+)_" -g tag -c wallclock,cutbacks
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, re, tarfile, optparse
+import numpy as np
+import abq_runfiles, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Where the table is kept
+index_filename = "runstats.npz"
+
+# The archives abq_archiver and abq_file_archiver.sh leave behind
+archive_names = ("runfiles.abqz", "runfiles.tar.gz")
+
+# The columns of the table: text columns, then number columns
+text_columns = ("job", "directory", "source", "signature", "status")
+number_columns = ("steps", "increments", "cutbacks", "iterations", "total_time",
+                  "warnings", "errors", "notes", "nodes", "elements",
+                  "variables", "min_memory", "io_memory", "user_time",
+                  "cpu_time", "wallclock")
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def run_finder(paths, known=None, summaries=None):
+    """
+    Looks through directories (and everything inside them) for runs, either
+    loose (.sta/.msg/.dat files) or archived. Returns a list of (job,
+    directory, source, signature), where the source is the run's base name or
+    its archive, and the signature changes whenever the run's files do.
+    Archives whose (source, signature) is in known (a dictionary of the jobs
+    already indexed from each) aren't opened at all; tar archives that aren't
+    are read through once, and what's in their runs put in summaries.
+    """
+
+    runs = []
+    for path in paths:
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames.sort()
+
+            # Loose runs
+            basenames = sorted(set(os.path.splitext(filename)[0]
+                                   for filename in filenames
+                                   if filename.endswith((".sta", ".msg", ".dat"))))
+            for basename in basenames:
+                signature = []
+                for suffix in (".sta", ".msg", ".dat"):
+                    filename = os.path.join(dirpath, basename + suffix)
+                    if os.path.exists(filename):
+                        stat = os.stat(filename)
+                        signature.append("%d:%d"%(stat.st_size, stat.st_mtime))
+                runs.append((basename, dirpath, os.path.join(dirpath, basename),
+                             "/".join(signature)))
+
+            # Archived runs (unless they're also still lying around loose)
+            for archive_name in archive_names:
+                if archive_name not in filenames:
+                    continue
+                archivename = os.path.join(dirpath, archive_name)
+                stat = os.stat(archivename)
+                signature = "%d:%d"%(stat.st_size, stat.st_mtime)
+                if known and (archivename, signature) in known:
+                    jobs = sorted(known[(archivename, signature)])
+                elif archive_name.endswith(".abqz"):
+                    jobs = archived_jobs(archivename)
+                else:
+                    archive_summaries = tar_reader(archivename)
+                    jobs = sorted(archive_summaries)
+                    if summaries is not None:
+                        summaries.update(((archivename, job), summary) for job, summary
+                                         in archive_summaries.items())
+                for basename in jobs:
+                    if basename not in basenames:
+                        runs.append((basename, dirpath, archivename, signature))
+    return runs
+
+
+def archived_jobs(archivename):
+    """
+    The names of the jobs with run files in an archive
+    """
+
+    if archivename.endswith(".abqz"):
+        import abq_archiver
+        names = abq_archiver.index_reader(open(archivename, 'rb')).keys()
+    else:
+        archive = tarfile.open(archivename, 'r:*')
+        names = [os.path.basename(name) for name in archive.getnames()]
+        archive.close()
+    return sorted(set(os.path.splitext(name)[0] for name in names
+                      if name.endswith((".sta", ".msg", ".dat"))))
+
+
+# Which parser reads which run file
+run_parsers = {".sta": abq_runfiles.stafile_parser,
+               ".msg": abq_runfiles.msgfile_parser,
+               ".dat": abq_runfiles.datfile_parser}
+
+
+def run_reader(job, source):
+    """
+    Reads everything in a run's .sta, .msg and .dat files, wherever they are
+    """
+
+    if source.endswith(archive_names):
+        summary = {}
+        for suffix in (".sta", ".msg", ".dat"):
+            filename = "%s:%s%s"%(source, job, suffix)
+            if abq_fileio.input_exists(filename):
+                with abq_fileio.open_input(filename) as runfile:
+                    summary.update(run_parsers[suffix](runfile))
+        return summary
+    return abq_runfiles.run_summary(source)
+
+
+def tar_reader(archivename):
+    """
+    Reads the .sta, .msg and .dat files of every job in a tar archive, in one
+    pass through it (getting to any file means decompressing everything
+    before it, .sim files and all). Returns a dictionary of summaries by job.
+    """
+
+    summaries = {}
+    archive = tarfile.open(archivename, 'r|*')
+    try:
+        for info in archive:
+            job, suffix = os.path.splitext(os.path.basename(info.name))
+            if not info.isfile() or suffix not in run_parsers:
+                continue
+            summaries.setdefault(job, {})
+            with abq_fileio.ThreadedReader(
+                    "%s:%s"%(archivename, info.name),
+                    abq_fileio.stream_chunks(archive.extractfile(info))) as runfile:
+                summaries[job].update(run_parsers[suffix](runfile))
+                # The archive can only go on once all of this file is read
+                runfile.read()
+    finally:
+        archive.close()
+    return summaries
+
+
+def index_loader(filename):
+    """
+    Reads the table, as a dictionary of columns (all empty if there isn't one
+    yet)
+    """
+
+    if not os.path.exists(filename):
+        table = dict((column, np.array([], dtype="U")) for column in text_columns)
+        table.update((column, np.array([], dtype=float)) for column in number_columns)
+        return table
+    data = np.load(filename)
+    return dict((column, data[column]) for column in text_columns + number_columns)
+
+
+def index_saver(filename, table):
+    """
+    Writes the table out (all at once, so it's never left half-written)
+    """
+    tempname = "%s.%d.tmp.npz"%(filename, os.getpid())
+    np.savez_compressed(tempname, **table)
+    os.rename(tempname, filename)
+
+
+def indexer(paths, table):
+    """
+    Brings the table up to date with the runs in some directories: new or
+    changed runs are read, unchanged ones are kept as they are, and ones that
+    have gone are dropped. Returns the new table and the number of runs read.
+    """
+
+    roots = [os.path.abspath(path) for path in paths]
+    def under_roots(directory):
+        directory = os.path.abspath(directory)
+        return any(directory == root or directory.startswith(root + os.sep)
+                   for root in roots)
+
+    old_rows = {}
+    for i in range(len(table["job"])):
+        old_rows[(table["source"][i], table["job"][i])] = i
+
+    # Archives that haven't changed don't need opening again, and runs in tar
+    # archives that have are read as the archives are found
+    known = {}
+    for (source, job), i in old_rows.items():
+        if source.endswith(archive_names):
+            known.setdefault((source, table["signature"][i]), []).append(job)
+    tar_summaries = {}
+    runs = run_finder(paths, known, tar_summaries)
+
+    rows = []
+    kept = set()
+    num_read = 0
+    for job, directory, source, signature in runs:
+        i = old_rows.get((source, job))
+        if i is not None and table["signature"][i] == signature:
+            row = dict((column, table[column][i]) for column in table)
+        else:
+            summary = tar_summaries.get((source, job))
+            if summary is None:
+                summary = run_reader(job, source)
+            num_read += 1
+            row = {"job": job, "directory": directory, "source": source,
+                   "signature": signature,
+                   "status": summary.get("status", "unknown")}
+            for column in number_columns:
+                row[column] = float(summary.get(column, np.nan))
+        rows.append(row)
+        kept.add((source, job))
+
+    # Runs that were indexed from somewhere else are left alone
+    for (source, job), i in sorted(old_rows.items(), key=lambda item: item[1]):
+        if (source, job) not in kept and not under_roots(table["directory"][i]):
+            rows.append(dict((column, table[column][i]) for column in table))
+
+    new_table = {}
+    for column in text_columns:
+        new_table[column] = np.array([u"%s"%row[column] for row in rows], dtype="U")
+    for column in number_columns:
+        new_table[column] = np.array([row[column] for row in rows], dtype=float)
+    return new_table, num_read
+
+
+def row_filter(table, condition):
+    """
+    Picks out the rows that match a condition like "cutbacks>10",
+    "status==completed" or "job~oriC11" (a regular expression). Returns a
+    boolean array.
+    """
+
+    match = re.match(r"\s*(\w+)\s*(==|!=|>=|<=|>|<|~)\s*(.*?)\s*$", condition)
+    if not match or match.group(1) not in table:
+        raise ValueError("Can't understand the condition %s"%condition)
+    column, operator, value = match.groups()
+    values = table[column]
+
+    if operator == "~":
+        pattern = re.compile(value)
+        return np.array([bool(pattern.search(text)) for text in values], dtype=bool)
+    if column in number_columns:
+        value = float(value)
+    return {"==": values == value, "!=": values != value,
+            ">=": values >= value, "<=": values <= value,
+            ">": values > value, "<": values < value}[operator]
+
+
+def tag_maker(table, pattern):
+    """
+    Makes a "tag" column out of each job name, from the first group of a
+    regular expression (or the whole match), for grouping runs by part of
+    their names
+    """
+
+    pattern = re.compile(pattern)
+    tags = []
+    for job in table["job"]:
+        match = pattern.search(job)
+        if not match:
+            tags.append(u"-")
+        else:
+            tags.append(u"%s"%(match.group(1) if match.groups() else match.group(0)))
+    return np.array(tags)
+
+
+def grouper(table, rows, group_column, columns):
+    """
+    Sums up the chosen rows in groups with the same value of a column: how many
+    runs, and the mean, smallest and largest of each number column. Returns a
+    list of (group value, count, {column: (mean, min, max)}).
+    """
+
+    keys = table[group_column][rows]
+    groups = []
+    for key in sorted(set(keys)):
+        members = keys == key
+        stats = {}
+        for column in columns:
+            values = table[column][rows][members]
+            values = values[np.isfinite(values)]
+            stats[column] = (values.mean(), values.min(), values.max()) \
+                            if len(values) else (np.nan, np.nan, np.nan)
+        groups.append((key, int(members.sum()), stats))
+    return groups
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] index directory [...]\n" \
+            "       %prog [options] query [-w condition ...] [-g column] [-c columns]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-i","--index",dest="index",default=None,
+                      help="table file [%s]"%index_filename)
+    parser.add_option("-w","--where",action="append",dest="where",default=[],
+                      help="only runs matching this, e.g. \"cutbacks>10\" or "
+                           "\"job~oriC11\" (can be given more than once)")
+    parser.add_option("-p","--pattern",dest="pattern",default=None,
+                      help="make a \"tag\" column from each job name with this "
+                           "regular expression, e.g. \"_(v[0-9]+)_\"")
+    parser.add_option("-g","--group",dest="group",default=None,
+                      help="group runs by this column and compare the groups")
+    parser.add_option("-c","--columns",dest="columns",
+                      default="status,increments,cutbacks,warnings,cpu_time,wallclock",
+                      help="columns to show [%default]")
+    parser.add_option("-s","--sort",dest="sort",default=None,
+                      help="sort by this column (\"-column\" for largest first)")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.index:
+        index_filename = options.index
+
+    if len(args) < 1 or args[0] not in ("index", "query"):
+        print("ERROR: Please specify index or query")
+        sys.exit(1)
+    table = index_loader(index_filename)
+
+    if args[0] == "index":
+        table, num_read = indexer(args[1:] or ["."], table)
+        index_saver(index_filename, table)
+        if verbose_mode:
+            print("%d runs in %s (%d read, %d unchanged)"%(
+                len(table["job"]), index_filename, num_read,
+                len(table["job"]) - num_read))
+        sys.exit()
+
+    # Querying
+    if options.pattern:
+        table["tag"] = tag_maker(table, options.pattern)
+    rows = np.ones(len(table["job"]), dtype=bool)
+    for condition in options.where:
+        rows &= row_filter(table, condition)
+    columns = [column for column in options.columns.split(",") if column]
+    for column in columns + [options.group or "job"]:
+        if column not in table:
+            print("ERROR: No column %s (columns are %s)"%(
+                column, ", ".join(sorted(table))))
+            sys.exit(1)
+
+    def formatter(value):
+        if isinstance(value, (float, np.floating)):
+            return "-" if not np.isfinite(value) else "%.4g"%value
+        return u"%s"%value
+
+    if options.group:
+        number_shown = [column for column in columns if column in number_columns]
+        groups = grouper(table, rows, options.group, number_shown)
+        if options.sort:
+            column = options.sort.lstrip("-")
+            groups.sort(key=lambda group: group[2][column][0] if column in group[2]
+                        else group[1], reverse=options.sort.startswith("-"))
+        print("%-24s %6s"%(options.group, "runs") +
+              "".join(" %24s"%("%s mean (min-max)"%column)[:24] for column in number_shown))
+        for key, count, stats in groups:
+            print("%-24s %6d"%(key[:24], count) +
+                  "".join(" %24s"%("%s (%s-%s)"%tuple(formatter(value) for value in stats[column]))
+                          for column in number_shown))
+    else:
+        order = np.nonzero(rows)[0]
+        if options.sort:
+            column = options.sort.lstrip("-")
+            order = order[np.argsort(table[column][order], kind="mergesort")]
+            if options.sort.startswith("-"):
+                order = order[::-1]
+        print("%-30s"%"job" + "".join(" %11s"%column[:11] for column in columns))
+        for i in order:
+            print("%-30s"%table["job"][i][:30] +
+                  "".join(" %11s"%formatter(table[column][i])[:11] for column in columns))
+        if verbose_mode:
+            print("%d of %d runs"%(len(order), len(table["job"])))
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# A program to run a queue of Abaqus jobs at the same time, as many as the
+# machine's cores and the available licence tokens allow. Each job runs in its
+# own scratch directory, so there are no overwrite prompts, and gets its own log
+# and exit status.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, re, time, shlex, shutil, subprocess, optparse, multiprocessing
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Command used to run a job. %(job)s and %(cpus)d are filled in for each job,
+# which is run from inside its scratch directory. For testing without Abaqus,
+# use e.g. "python /path/to/abq_standin.py job=%(job)s cpus=%(cpus)d"
+abaqus_command = "/project/taylor/a/abaqus/Commands/abaqus job=%(job)s cpus=%(cpus)d interactive"
+
+# Limits on what can run at once (memory in MB, or None for no limit)
+max_cores = multiprocessing.cpu_count()
+max_tokens = 50
+max_memory = None
+
+# CPUs given to each job, unless told otherwise
+cpus_per_job = 8
+
+# Where the scratch directories for each job go
+scratch_dirname = "scratch"
+
+# How often to check on running jobs
+poll_interval = 2.0 #s
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+class Job:
+    """
+    A container to hold everything about one job in the queue: where its input
+    file is, what it needs, and how it went
+    """
+    def __init__(self, inpfilename, cpus, walltime=None, memory=None):
+        self.inpfilename = inpfilename
+        self.name = os.path.splitext(os.path.basename(inpfilename))[0]
+        self.cpus = cpus
+        self.tokens = licence_tokens(cpus)
+        self.walltime = walltime
+        self.memory = memory
+        self.status = "queued"
+        self.returncode = None
+        self.workdir = None
+        self.process = None
+        self.logfile = None
+        self.start_time = None
+        self.end_time = None
+
+
+def licence_tokens(cpus):
+    """
+    Number of Abaqus/Standard licence tokens a job on this many CPUs checks out
+    """
+    return int(5 * cpus**0.422)
+
+
+def include_finder(inpfilename):
+    """
+    Finds the files pulled into a .inp file with *INCLUDE, so they can go into
+    the scratch directory with it
+    """
+
+    includes = []
+    for line in open(inpfilename, 'r'):
+        if line.upper().startswith("*INCLUDE"):
+            match = re.search(r"INPUT\s*=\s*([^,\s]+)", line, re.IGNORECASE)
+            if match:
+                includes.append(match.group(1).strip('"'))
+    return includes
+
+
+def scratch_maker(job):
+    """
+    Makes a fresh scratch directory for a job (never re-using an old one, so
+    nothing ever needs overwriting) and copies its input files in. Included
+    files are copied in under their own names (numbered, if two have the
+    same name), and the deck's *INCLUDE lines are pointed at the copies.
+    """
+
+    workdir = os.path.join(scratch_dirname, job.name)
+    attempt = 1
+    while os.path.exists(workdir):
+        attempt += 1
+        workdir = os.path.join(scratch_dirname, "%s.%d"%(job.name, attempt))
+    os.makedirs(workdir)
+
+    inpdir = os.path.dirname(os.path.abspath(job.inpfilename))
+    copies = {}
+    for include in include_finder(job.inpfilename):
+        source = os.path.join(inpdir, include)
+        if include in copies:
+            continue
+        if not os.path.exists(source):
+            print("WARNING: Include file %s for job %s not found"%(include, job.name))
+            continue
+        copyname = os.path.basename(include)
+        while copyname in copies.values() or copyname == job.name + ".inp":
+            copyname = "%d_%s"%(len(copies), copyname)
+        shutil.copy(source, os.path.join(workdir, copyname))
+        copies[include] = copyname
+
+    def include_pointer(match):
+        return match.group(1) + copies.get(match.group(2).strip('"'), match.group(2))
+    deckfile = open(os.path.join(workdir, job.name + ".inp"), 'w')
+    for line in open(job.inpfilename, 'r'):
+        if line.upper().startswith("*INCLUDE"):
+            line = re.sub(r"(INPUT\s*=\s*)([^,\s]+)", include_pointer, line,
+                          flags=re.IGNORECASE)
+        deckfile.write(line)
+    deckfile.close()
+
+    return workdir
+
+
+def job_starter(job):
+    """
+    Starts a job running in its own scratch directory, with its output going to
+    a log file there. A job whose command can't be run at all is marked as
+    failed (exit status -1), with the reason in its log. Returns whether the
+    job is running.
+    """
+
+    job.workdir = scratch_maker(job)
+    command = shlex.split(abaqus_command%{"job": job.name, "cpus": job.cpus})
+    job.logfile = open(os.path.join(job.workdir, "%s.scheduler.log"%job.name), 'w')
+    job.logfile.write("%s\n"%" ".join(command))
+    job.logfile.flush()
+    job.start_time = time.time()
+    try:
+        job.process = subprocess.Popen(command, cwd=job.workdir,
+                                       stdout=job.logfile, stderr=subprocess.STDOUT)
+    except OSError as error:
+        job.returncode = -1
+        job.end_time = job.start_time
+        job.status = "failed"
+        job.logfile.write("\ncould not start: %s\n"%error)
+        job.logfile.close()
+        print("WARNING: Could not start %s (%s): %s"%(job.name, command[0], error))
+        return False
+    job.status = "running"
+
+    if verbose_mode:
+        print("Started %s (%d cpus, %d tokens) in %s"%(job.name, job.cpus,
+                                                       job.tokens, job.workdir))
+        if job.walltime:
+            print("    expecting %.0f s and %.0f MB"%(job.walltime, job.memory))
+    return True
+
+
+def job_finisher(job):
+    """
+    Records how a job that has stopped running went
+    """
+
+    job.returncode = job.process.returncode
+    job.end_time = time.time()
+    job.status = "done" if job.returncode == 0 else "failed"
+    job.logfile.write("\nexit status %d\n"%job.returncode)
+    job.logfile.close()
+
+    if verbose_mode:
+        print("Finished %s: %s (exit status %d, %.0f s)"%(job.name, job.status,
+                                                          job.returncode,
+                                                          job.end_time - job.start_time))
+
+
+def scheduler(jobs):
+    """
+    Runs a queue of jobs, starting each one as soon as there are enough cores
+    and tokens (and memory) free. Jobs start in queue order - or longest first,
+    if their wall times have been predicted, which packs them in better - except
+    that a job that fits can go ahead of a bigger one that's still waiting.
+    Returns when every job is done.
+    """
+
+    for job in jobs:
+        if job.cpus > max_cores or job.tokens > max_tokens or \
+           (max_memory and job.memory and job.memory > max_memory):
+            needs = "%d cores, %d tokens"%(job.cpus, job.tokens)
+            limits = "%d cores, %d tokens"%(max_cores, max_tokens)
+            if max_memory and job.memory:
+                needs += ", %.0f MB"%job.memory
+                limits += ", %.0f MB"%max_memory
+            print("ERROR: Job %s needs %s, more than the limits of %s"%(
+                job.name, needs, limits))
+            sys.exit(1)
+    queue = sorted(jobs, key=lambda job: -(job.walltime or 0))
+
+    while any(job.status in ("queued", "running") for job in jobs):
+
+        # Check on the running jobs
+        for job in jobs:
+            if job.status == "running" and job.process.poll() is not None:
+                job_finisher(job)
+
+        # Start whatever fits in what's left over
+        running = [job for job in jobs if job.status == "running"]
+        free_cores = max_cores - sum(job.cpus for job in running)
+        free_tokens = max_tokens - sum(job.tokens for job in running)
+        if max_memory:
+            free_memory = max_memory - sum(job.memory or 0 for job in running)
+        for job in queue:
+            if job.status == "queued" and job.cpus <= free_cores and \
+               job.tokens <= free_tokens and \
+               (not max_memory or (job.memory or 0) <= free_memory):
+                if not job_starter(job):
+                    continue
+                free_cores -= job.cpus
+                free_tokens -= job.tokens
+                if max_memory:
+                    free_memory -= job.memory or 0
+
+        if any(job.status == "running" for job in jobs):
+            time.sleep(poll_interval)
+
+    return jobs
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp [bar.inp ...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-c","--cpus",type="int",dest="cpus",default=None,
+                      help="CPUs for each job [%d]"%cpus_per_job)
+    parser.add_option("--cores",type="int",dest="max_cores",default=None,
+                      help="total cores to use at once [%d]"%max_cores)
+    parser.add_option("--tokens",type="int",dest="max_tokens",default=None,
+                      help="total licence tokens to use at once [%d]"%max_tokens)
+    parser.add_option("--command",dest="command",default=None,
+                      help="command to run each job, with %(job)s and %(cpus)d "
+                           "filled in [" + abaqus_command + "]")
+    parser.add_option("--memory",type="float",dest="max_memory",default=None,
+                      help="total memory to use at once, MB [no limit]")
+    parser.add_option("--scratch",dest="scratch",default=None,
+                      help="directory for the jobs' scratch directories [%s]"%scratch_dirname)
+    parser.add_option("-s","--size",action="append",dest="history",default=[],
+                      help="size each job (CPUs, wall time, memory) from the past "
+                           "runs in this directory, e.g. an old scratch directory "
+                           "(can be given more than once)")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.cpus:
+        cpus_per_job = options.cpus
+    if options.max_cores:
+        max_cores = options.max_cores
+    if options.max_tokens:
+        max_tokens = options.max_tokens
+    if options.command:
+        abaqus_command = options.command
+    if options.max_memory:
+        max_memory = options.max_memory
+    if options.scratch:
+        scratch_dirname = options.scratch
+
+    # Predict what each job needs from past runs
+    if options.history:
+        import abq_sizing
+        if options.cpus:
+            abq_sizing.default_cpus = options.cpus
+        abq_sizing.cpu_choices = [cpus for cpus in abq_sizing.cpu_choices
+                                  if cpus <= max_cores] or [max_cores]
+        history = abq_sizing.history_collector(options.history)
+        sizing_model = abq_sizing.model_fitter(history)
+        if verbose_mode:
+            print("Sizing jobs from %d past runs..."%len(history))
+            if sizing_model is None:
+                print("WARNING: Not enough past runs, using %d CPUs for every job"%
+                      abq_sizing.default_cpus)
+
+    # Job names are accepted with or without ".inp", like abaqus itself
+    if len(args) < 1:
+        print("ERROR: Please specify at least one job")
+        sys.exit(1)
+    jobs = []
+    for arg in args:
+        inpfilename = arg if arg.endswith(".inp") else arg + ".inp"
+        if not os.path.exists(inpfilename):
+            print("ERROR: Input file %s not found"%inpfilename)
+            sys.exit(1)
+        if options.history:
+            deck = abq_sizing.deck_scanner(open(inpfilename, 'r'))
+            jobs.append(Job(inpfilename, *abq_sizing.job_sizer(deck, sizing_model)))
+        else:
+            jobs.append(Job(inpfilename, cpus_per_job))
+
+    scheduler(jobs)
+
+    # Summarize
+    print("%-30s %-8s %5s %10s  %s"%("Job", "Status", "Exit", "Time (s)", "Directory"))
+    for job in jobs:
+        print("%-30s %-8s %5d %10.0f  %s"%(job.name, job.status, job.returncode,
+                                          job.end_time - job.start_time,
+                                          job.workdir))
+    sys.exit(0 if all(job.status == "done" for job in jobs) else 1)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# A program to put materials and sections into an Abaqus .inp file straight
+# from its element sets, instead of running material_property_assigner,
+# section_maker and section_assigner (in abq_modeling_helpers.py) in CAE. Every
+# part's "set_foo" element set gets a "section_foo" solid section made of
+# material "foo", and every material gets the dummy variables
+# abq_applymattable.py fills in, e.g.
+#   abq_sections.py foo_nosect.inp
+#   abq_sections.py -m foo_mat.txt foo_nosect.inp
+#   abq_applymattable.py -m foo_mat.txt foo_nomat.inp
+# With a material table (-m), only the sets of materials in the table are
+# given sections, under the table's names for them. abq_builddeck.py can do
+# the same thing as a "sections" stage, ahead of the mattable stage:
+#   abq_builddeck.py -s sections,mattable,loads -m foo_mat.txt foo_nosect.inp
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, re, optparse
+import abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# What suffix is on the incoming file, and what do you want on the newly created
+# file? (abq_applymattable.py looks for "_nomat")
+inp_tag = "_nosect"
+out_tag = "_nomat"
+
+# What comes before the material name in set and section names
+set_prefix = "set_"
+section_prefix = "section_"
+
+# Young's modulus (Pa) and Poisson's ratio of each kind of material, by the
+# start of its name (the longest match wins; "" matches everything)
+elastic_properties = {"": (1.0e11, 0.25)}
+
+# The dummy variables abq_applymattable.py replaces with each material's
+# viscosity, density and thermal expansion
+dummy_creep = "4.2E-42, 1., 0."
+dummy_density = "42.42"
+dummy_expansion = "0.00042"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def set_matcher(set_names, material_names=None):
+    """
+    Matches element sets ("set_foo") up with materials ("foo"), by looking
+    each set up in a dictionary of the materials' (upper-case) names, so it
+    takes one pass over the sets however many materials there are. Without a
+    list of materials, every set with the prefix gets a material of its own
+    name. Returns the (set name, material name) pairs, and the sets with the
+    prefix that didn't match a material.
+    """
+    if material_names is not None:
+        by_name = dict((name.upper(), name) for name in material_names)
+    pairs = []
+    unmatched = []
+    for set_name in set_names:
+        if not set_name.upper().startswith(set_prefix.upper()):
+            continue
+        material_name = set_name[len(set_prefix):]
+        if material_names is not None:
+            material_name = by_name.get(material_name.upper())
+        if material_name:
+            pairs.append((set_name, material_name))
+        else:
+            unmatched.append(set_name)
+    return pairs, unmatched
+
+
+def section_lines(pairs):
+    """
+    Writes a solid section for each (set name, material name) pair, the way
+    CAE does, to go inside the part definition (a line at a time, so the
+    stages after this one see every line)
+    """
+    lines = []
+    for set_name, material_name in pairs:
+        lines.append("** Section: %s%s\n"%(section_prefix, material_name))
+        lines.append("*Solid Section, elset=%s, material=%s\n"%(set_name, material_name))
+        lines.append(",\n")
+    return lines
+
+
+def material_lines(material_names):
+    """
+    Writes a material definition for each material, with its elastic
+    properties (from the longest matching name prefix) and the dummy
+    variables for everything abq_applymattable.py fills in
+    """
+    lines = []
+    for material_name in material_names:
+        lines.append("*Material, name=%s\n"%material_name)
+        lines.append("*Creep, law=TIME\n")
+        lines.append("%s\n"%dummy_creep)
+        lines.append("*Density\n")
+        lines.append("%s,\n"%dummy_density)
+        prefixes = [prefix for prefix in elastic_properties
+                    if material_name.upper().startswith(prefix.upper())]
+        if prefixes:
+            lines.append("*Elastic\n")
+            lines.append("%g, %g\n"%elastic_properties[max(prefixes, key=len)])
+        else:
+            print("WARNING: No elastic properties for %s"%material_name)
+        lines.append("*Expansion\n")
+        lines.append("%s,\n"%dummy_expansion)
+    return lines
+
+
+def section_stage(inpfilelines, material_names=None):
+    """
+    Goes through the lines of an Abaqus .inp file, handing them back with a
+    section for each part's material sets (that don't have one already) put
+    in at the end of the part, and the materials after the assembly, so it can
+    be one stage of abq_builddeck's pipeline
+    """
+
+    set_names = []
+    sectioned = set()
+    written = []
+    for line in inpfilelines:
+
+        # Only keyword lines matter
+        if not line.startswith("*") or line.startswith("**"):
+            yield line
+            continue
+        keyword, parameters = abq_mesh.keyword_parameters(line)
+
+        # Each part's element sets, and the ones that already have a section
+        if keyword == "*PART":
+            set_names = []
+            sectioned = set()
+        elif keyword in ("*ELSET", "*ELEMENT") and "ELSET" in parameters:
+            set_names.append(parameters["ELSET"])
+        elif keyword == "*SOLID SECTION":
+            sectioned.add(parameters["ELSET"].upper())
+
+        # Sections go at the end of the part
+        elif keyword == "*END PART":
+            pairs, unmatched = set_matcher(
+                [name for name in set_names if name.upper() not in sectioned],
+                material_names)
+            if unmatched:
+                print("WARNING: No material in the table for set(s) %s"%
+                      ", ".join(unmatched))
+            for new_line in section_lines(pairs):
+                yield new_line
+            for set_name, material_name in pairs:
+                if material_name not in written:
+                    written.append(material_name)
+
+        # Materials go after the assembly
+        elif keyword == "*END ASSEMBLY" and written:
+            yield line
+            for new_line in ["**\n", "** MATERIALS\n", "**\n"] + \
+                            material_lines(sorted(written)):
+                yield new_line
+            continue
+
+        yield line
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo_nosect.inp"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-m","--mattable",dest="mattable",default=None,
+                      help="material table: only give sections to the sets of "
+                           "its materials (default: every %sfoo set)"%set_prefix)
+    parser.add_option("-e","--elastic",dest="elastic",default=None,
+                      help="file of elastic properties: name prefix, Young's "
+                           "modulus, Poisson's ratio (one per line)")
+    parser.add_option("-o","--output",dest="output",default=None,
+                      help="name of the new file (default: the input file's "
+                           "name, with %s for %s)"%(out_tag, inp_tag))
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.elastic:
+        import abq_mattablegen
+        elastic_properties.update(abq_mattablegen.properties_parser(
+            abq_fileio.open_input(options.elastic)))
+
+    if len(args) != 1:
+        print("ERROR: Please specify one .inp file")
+        sys.exit()
+    inpfilename = args[0]
+    outfilename = options.output or \
+        re.sub(inp_tag, out_tag, abq_fileio.plain_name(inpfilename))
+    if outfilename == abq_fileio.plain_name(inpfilename):
+        print("ERROR: The new file would overwrite %s; please give a name with -o"%
+              inpfilename)
+        sys.exit()
+
+    material_names = None
+    if options.mattable:
+        import abq_applymattable
+        material_names = list(abq_applymattable.mattable_parser(
+            abq_fileio.open_input(options.mattable)).keys())
+
+    if verbose_mode:
+        print("Reading file %s..."%inpfilename)
+        print("Creating (or overwriting!) file %s..."%outfilename)
+    inpfile = abq_fileio.open_input(inpfilename)
+    with abq_fileio.open_output(outfilename) as outfile:
+        outfile.writelines(section_stage(inpfile, material_names))
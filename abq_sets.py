@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# A module for reading the element and node sets (*Elset and *Nset) out of an
+# Abaqus .inp file - including "generate" ranges and sets made up of other
+# sets - so that tools can find out which elements a set like CRUST010 or
+# set_MANTLE050 actually holds, and group elements by set or material, without
+# going back to CAE.
+#
+# Sets are kept as sorted lists of ranges of labels rather than as every label,
+# since they're almost always made of long runs of consecutive elements, and
+# membership, intersections and per-set sums are worked out on whole arrays of
+# labels at once.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, re, optparse
+import numpy as np
+import abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+class RangeSet:
+    """
+    A set of integer labels, kept as sorted, non-overlapping, non-touching
+    ranges [start, stop) of consecutive labels
+    """
+    def __init__(self, starts=None, stops=None):
+        self.starts = np.zeros(0, dtype=int) if starts is None else np.asarray(starts, dtype=int)
+        self.stops = np.zeros(0, dtype=int) if stops is None else np.asarray(stops, dtype=int)
+
+    def __len__(self):
+        return int((self.stops - self.starts).sum())
+
+    def contains(self, labels):
+        """
+        Which of an array of labels are in the set (as a boolean array)
+        """
+        labels = np.asarray(labels)
+        i = np.searchsorted(self.starts, labels, side="right") - 1
+        inside = i >= 0
+        inside[inside] = labels[inside] < self.stops[i[inside]]
+        return inside
+
+    def labels(self):
+        """
+        Every label in the set, in order
+        """
+        if not len(self.starts):
+            return np.zeros(0, dtype=int)
+        lengths = self.stops - self.starts
+        offsets = np.repeat(self.starts - np.concatenate(([0], np.cumsum(lengths)[:-1])),
+                            lengths)
+        return np.arange(lengths.sum()) + offsets
+
+    def union(self, other):
+        return range_combiner([self, other], 1)
+
+    def intersection(self, other):
+        return range_combiner([self, other], 2)
+
+    def difference(self, other):
+        return range_combiner([self, other], 1, negative=1)
+
+
+def range_maker(labels):
+    """
+    Turns an array of labels (in any order, with repeats) into a RangeSet
+    """
+    labels = np.unique(np.asarray(labels, dtype=int))
+    if not len(labels):
+        return RangeSet()
+    breaks = np.nonzero(np.diff(labels) != 1)[0] + 1
+    starts = labels[np.concatenate(([0], breaks))]
+    stops = labels[np.concatenate((breaks - 1, [len(labels) - 1]))] + 1
+    return RangeSet(starts, stops)
+
+
+def range_combiner(rangesets, needed, negative=None):
+    """
+    Combines RangeSets by counting how many of them cover each label: labels
+    covered by at least "needed" of them are kept (1 for a union, all of them
+    for an intersection). If "negative" is the position of one of the sets,
+    labels in that set are taken out instead (for a difference).
+    """
+    positions = []
+    changes = []
+    for i, rangeset in enumerate(rangesets):
+        sign = -1 if i == negative else 1
+        positions.extend((rangeset.starts, rangeset.stops))
+        changes.extend((np.repeat(sign, len(rangeset.starts)),
+                        np.repeat(-sign, len(rangeset.stops))))
+    positions = np.concatenate(positions)
+    changes = np.concatenate(changes)
+    if not len(positions):
+        return RangeSet()
+
+    # Add up the changes at each position, then see where the count is high
+    # enough between one position and the next
+    positions, where = np.unique(positions, return_inverse=True)
+    totals = np.zeros(len(positions), dtype=int)
+    np.add.at(totals, where, changes)
+    covered = np.cumsum(totals) >= needed
+
+    # Ranges start where the coverage goes up past the threshold and stop
+    # where it drops below it
+    edges = np.diff(np.concatenate(([0], covered.astype(int))))
+    return RangeSet(positions[edges == 1], positions[edges == -1])
+
+
+class SetIndex:
+    """
+    The element and node sets of a model, by name (upper case). Sets defined
+    inside a part can also be found as "INSTANCE.SET", for each instance of
+    the part.
+    """
+    def __init__(self):
+        self.elsets = {}
+        self.nsets = {}
+
+    def find(self, name, kind="elset"):
+        """
+        Looks a set up by name, with or without an instance name in front of it
+        """
+        sets = self.elsets if kind == "elset" else self.nsets
+        name = name.upper()
+        if name in sets:
+            return sets[name]
+        if "." in name and name.split(".", 1)[1] in sets:
+            return sets[name.split(".", 1)[1]]
+        raise KeyError("No %s called %s"%(kind, name))
+
+
+def inpfile_parser(inpfile):
+    """
+    Goes through an Abaqus .inp file and grabs every *Elset and *Nset (and the
+    sets made by ELSET=/NSET= on *Element and *Node), returning a SetIndex
+    """
+
+    index = SetIndex()
+    part_sets = {}          # part name -> names of the sets defined in it
+    this_part = None
+    sets = None             # the sets (elsets or nsets) being added to
+    this_set = None
+    generate = False
+    section = None
+
+    for data, line in abq_mesh.data_blocks(inpfile.read()):
+
+        # Data lines
+        if data.strip() and section is not None:
+            if section in ("node", "element"):
+                labels = abq_mesh.table_parser(data, int if section == "element"
+                                               else float)[:, 0].astype(int)
+                members = range_maker(labels)
+            elif generate:
+                members = RangeSet()
+                for values in data.strip().splitlines():
+                    values = [int(value) for value in values.split(",") if value.strip()]
+                    step = values[2] if len(values) > 2 else 1
+                    members = members.union(range_maker(
+                        np.arange(values[0], values[1] + 1, step)))
+            elif re.search("[A-Za-z_]", data):
+                # Sets made of other sets (and maybe some labels too)
+                labels = []
+                members = RangeSet()
+                for value in data.replace("\n", ",").split(","):
+                    value = value.strip()
+                    if not value:
+                        continue
+                    if value[0].isdigit() or value[0] == "-":
+                        labels.append(int(value))
+                    elif value.upper() in sets:
+                        members = members.union(sets[value.upper()])
+                    else:
+                        print("WARNING: Set %s refers to an unknown set %s"%(this_set, value))
+                members = members.union(range_maker(labels))
+            else:
+                members = range_maker(abq_mesh.values_parser(data, int))
+            sets[this_set] = sets[this_set].union(members) if this_set in sets else members
+
+        # Keyword lines decide what the following data lines mean
+        if line is None or line.startswith("**"):
+            continue
+        keyword, parameters = abq_mesh.keyword_parameters(line)
+        section = None
+
+        if keyword == "*PART":
+            this_part = parameters.get("NAME", "").upper()
+            part_sets[this_part] = []
+        elif keyword == "*END PART":
+            this_part = None
+        elif keyword == "*INSTANCE":
+            instance = parameters.get("NAME", "").upper()
+            for kind, name in part_sets.get(parameters.get("PART", "").upper(), []):
+                sets = index.elsets if kind == "elset" else index.nsets
+                sets["%s.%s"%(instance, name)] = sets[name]
+        elif keyword in ("*ELSET", "*NSET", "*ELEMENT", "*NODE"):
+            kind = "elset" if keyword in ("*ELSET", "*ELEMENT") else "nset"
+            this_set = parameters.get(kind.upper())
+            if keyword in ("*ELEMENT", "*NODE"):
+                section = keyword[1:].lower() if this_set else None
+            else:
+                section = kind
+            if this_set is None:
+                continue
+            this_set = this_set.upper()
+            sets = index.elsets if kind == "elset" else index.nsets
+            generate = "GENERATE" in parameters
+            sets.setdefault(this_set, RangeSet())
+            if this_part is not None:
+                part_sets[this_part].append((kind, this_set))
+
+    return index
+
+
+def set_labeller(sets, labels):
+    """
+    Says which of a list of sets each label is in, as an array of positions in
+    the list (-1 for labels in none of them; the last set wins where they
+    overlap). Handy with np.bincount for per-set sums.
+    """
+    which = np.empty(len(labels), dtype=int)
+    which.fill(-1)
+    for i, rangeset in enumerate(sets):
+        which[rangeset.contains(labels)] = i
+    return which
+
+
+def set_aggregator(sets, labels, values):
+    """
+    Adds up values (one per label) over each of a list of sets. Returns arrays
+    of the count, sum, minimum and maximum of the values in each set.
+    """
+    values = np.asarray(values, dtype=float)
+    counts = np.zeros(len(sets), dtype=int)
+    sums = np.zeros(len(sets))
+    minima = np.zeros(len(sets)) + np.nan
+    maxima = np.zeros(len(sets)) + np.nan
+    for i, rangeset in enumerate(sets):
+        these = values[rangeset.contains(labels)]
+        counts[i] = len(these)
+        if len(these):
+            sums[i] = these.sum()
+            minima[i] = these.min()
+            maxima[i] = these.max()
+    return counts, sums, minima, maxima
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-n","--nsets",action="store_true",
+                      dest="nsets",default=False,
+                      help="list node sets instead of element sets")
+    parser.add_option("-q","--query",dest="query",default=None,
+                      help="which sets hold these labels (e.g. 1,17,2000)")
+    parser.add_option("-i","--intersect",dest="intersect",default=None,
+                      help="intersect these sets (e.g. CRUST010,POOL)")
+    parser.add_option("-g","--geometry",action="store_true",
+                      dest="geometry",default=False,
+                      help="add up the area and ring volume (or volume, in 3D) "
+                           "of each element set's elements")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+
+    if len(args) != 1:
+        print("ERROR: Please specify one and only one .inp file")
+        sys.exit()
+    index = inpfile_parser(abq_fileio.open_input(args[0]))
+    kind = "nset" if options.nsets else "elset"
+    sets = index.nsets if options.nsets else index.elsets
+
+    if options.query:
+        labels = np.array([int(label) for label in options.query.split(",")])
+        names = sorted(sets)
+        for label, members in zip(labels, np.array([sets[name].contains(labels)
+                                                    for name in names]).T):
+            print("%d: %s"%(label, ", ".join(name for name, member
+                                             in zip(names, members) if member) or "-"))
+        sys.exit()
+
+    if options.intersect:
+        names = options.intersect.split(",")
+        common = index.find(names[0], kind)
+        for name in names[1:]:
+            common = common.intersection(index.find(name, kind))
+        print("%d in common, in %d ranges"%(len(common), len(common.starts)))
+        for start, stop in zip(common.starts, common.stops):
+            print("    %d-%d"%(start, stop - 1))
+        sys.exit()
+
+    names = sorted(sets)
+    if options.geometry and not options.nsets:
+        mesh = abq_mesh.mesh_loader(args[0])
+        if mesh.coords.shape[1] == 3:
+            labels, centroids, volumes = abq_mesh.element_volumes(mesh)
+            areas = np.zeros(len(labels)) + np.nan
+        else:
+            labels, centroids, areas, volumes = abq_mesh.element_geometry(mesh)
+        area_sums = set_aggregator([sets[name] for name in names], labels, areas)[1]
+        counts, volume_sums, minima, maxima = set_aggregator(
+            [sets[name] for name in names], labels, volumes)
+        print("%-30s %10s %14s %14s"%(kind, "elements", "area", "volume"))
+        for name, count, area, volume in zip(names, counts, area_sums, volume_sums):
+            print("%-30s %10d %14.6g %14.6g"%(name[:30], count, area, volume))
+    else:
+        print("%-30s %10s %8s"%(kind, "members", "ranges"))
+        for name in names:
+            print("%-30s %10d %8d"%(name[:30], len(sets[name]), len(sets[name].starts)))
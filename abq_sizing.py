@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# A program to work out how many CPUs an Abaqus job should get, and how much
+# memory and wall time it will need, from the size of its .inp file. The
+# predictions come from a regression over past runs: each finished job's .inp
+# file is scanned the same way, and matched up with the CPU time and memory
+# reported in its .dat file.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, re, glob, optparse
+import numpy as np
+import abq_runfiles, abq_mesh, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# CPU counts a job can be given
+cpu_choices = (1, 2, 4, 8, 16)
+
+# CPUs to give a job when there aren't enough past runs to predict from
+default_cpus = 8
+
+# Aim to finish each job within this much wall time, using as few CPUs as that
+# takes (more CPUs are used less and less efficiently)
+target_walltime = 3600.0 #s
+
+# Fraction of the work that doesn't go any faster with more CPUs
+serial_fraction = 0.1
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def deck_scanner(inpfile):
+    """
+    Goes through an Abaqus .inp file once, only looking closely at the
+    *KEYWORD lines, and returns a dictionary describing its size: number of
+    nodes and elements, elements of each type, number of steps, visco steps,
+    and materials with creep
+    """
+
+    deck = {"nodes": 0, "elements": 0, "element_types": {}, "steps": 0,
+            "visco_steps": 0, "materials": 0, "creep_materials": 0}
+    counting = None
+    etype = None
+    continuing = False
+    for line in inpfile:
+        if line.startswith("*"):
+            counting = None
+            continuing = False
+            if line.startswith("**"):
+                continue
+            upper = line.upper()
+            if upper.startswith("*NODE") and not upper.startswith("*NODE OUTPUT") \
+               and not upper.startswith("*NODE PRINT") and not upper.startswith("*NODE FILE"):
+                counting = "nodes"
+            elif upper.startswith("*ELEMENT,") or upper.strip() == "*ELEMENT":
+                counting = "elements"
+                etype = "UNKNOWN"
+                for piece in upper.split(","):
+                    if piece.strip().startswith("TYPE"):
+                        etype = piece.split("=")[-1].strip()
+            elif upper.startswith("*STEP"):
+                deck["steps"] += 1
+            elif upper.startswith("*VISCO"):
+                deck["visco_steps"] += 1
+            elif upper.startswith("*MATERIAL"):
+                deck["materials"] += 1
+            elif upper.startswith("*CREEP"):
+                deck["creep_materials"] += 1
+        elif counting and line.strip():
+            # A record carries on over the next line as long as its line ends
+            # in a comma (as with 20-node bricks), and only counts once
+            if not continuing:
+                if counting == "nodes":
+                    deck["nodes"] += 1
+                else:
+                    deck["elements"] += 1
+                    deck["element_types"][etype] = deck["element_types"].get(etype, 0) + 1
+            continuing = line.rstrip().endswith(",")
+    return deck
+
+
+def element_nodes(etype):
+    """
+    The number of nodes an element type has, from the number at the end of
+    its name (e.g. CAX4R -> 4, C3D20 -> 20)
+    """
+    digits = re.search(r"(\d+)$", abq_mesh.element_basetype(etype))
+    return int(digits.group(1)) if digits else 1
+
+
+def feature_vector(deck):
+    """
+    The numbers from a deck that the regression uses. The elements of each
+    type count by how many nodes they have, since bigger (quadratic, 3D)
+    elements cost more to assemble and solve.
+    """
+    element_nodes_total = sum(count*element_nodes(etype) for etype, count
+                              in deck["element_types"].items())
+    return [1.0, np.log(max(deck["nodes"], 1)), np.log(max(element_nodes_total, 1)),
+            deck["steps"], deck["visco_steps"], float(deck["creep_materials"] > 0)]
+
+
+def history_collector(dirnames):
+    """
+    Finds every past run in the given directories (and the directories inside
+    them, e.g. abq_scheduler's scratch directories) that finished and has its
+    .inp file next to its .dat file. Returns a list of (deck, run summary)
+    pairs.
+    """
+
+    history = []
+    for dirname in dirnames:
+        datfilenames = glob.glob(os.path.join(dirname, "*.dat")) + \
+                       glob.glob(os.path.join(dirname, "*", "*.dat"))
+        for datfilename in sorted(datfilenames):
+            basename = datfilename[:-len(".dat")]
+            if not os.path.exists(basename + ".inp"):
+                continue
+            summary = abq_runfiles.run_summary(basename)
+            if summary.get("status") != "completed" or "cpu_time" not in summary:
+                continue
+            history.append((deck_scanner(open(basename + ".inp", 'r')), summary))
+    return history
+
+
+def model_fitter(history):
+    """
+    Fits log(CPU time) and log(memory) as linear functions of the deck features
+    over past runs. Returns a dictionary of coefficients, or None if there
+    aren't enough runs to go on.
+    """
+
+    if not history or len(history) <= len(feature_vector(history[0][0])):
+        return None
+
+    X = np.array([feature_vector(deck) for deck, summary in history])
+    cpu_times = np.array([summary["cpu_time"] for deck, summary in history])
+    memories = np.array([summary.get("io_memory", summary.get("min_memory", 1.0))
+                         for deck, summary in history])
+
+    model = {}
+    for name, values in (("cpu_time", cpu_times), ("memory", memories)):
+        model[name] = np.linalg.lstsq(X, np.log(np.maximum(values, 1e-3)),
+                                      rcond=None)[0]
+    return model
+
+
+def walltime_estimator(cpu_time, cpus):
+    """
+    Wall time for a job with this much CPU time on this many CPUs (Amdahl's law)
+    """
+    return cpu_time * (serial_fraction + (1 - serial_fraction) / cpus)
+
+
+def job_sizer(deck, model):
+    """
+    Predicts (CPUs, wall time in s, memory in MB) for a deck. Without a model,
+    gives the default CPU count and no predictions.
+    """
+
+    if model is None:
+        return default_cpus, None, None
+
+    x = np.array(feature_vector(deck))
+    cpu_time = float(np.exp(np.dot(model["cpu_time"], x)))
+    memory = float(np.exp(np.dot(model["memory"], x)))
+
+    # Take the fewest CPUs that get the job done in time
+    for cpus in cpu_choices:
+        walltime = walltime_estimator(cpu_time, cpus)
+        if walltime <= target_walltime:
+            break
+    return cpus, walltime, memory
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] -d past_runs_dir foo.inp [bar.inp ...]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-d","--history",action="append",
+                      dest="history",default=[],
+                      help="directory of past runs to learn from (can be given "
+                           "more than once)")
+    parser.add_option("-t","--target",type="float",dest="target",default=None,
+                      help="wall time to aim for, s [%g]"%target_walltime)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.target:
+        target_walltime = options.target
+
+    if len(args) < 1:
+        print("ERROR: Please specify at least one .inp file")
+        sys.exit(1)
+
+    history = history_collector(options.history)
+    model = model_fitter(history)
+    if verbose_mode:
+        print("Learning from %d past runs..."%len(history))
+        if model is None:
+            print("WARNING: Not enough past runs, using %d CPUs for every job"%default_cpus)
+
+    print("%-30s %8s %10s %8s %5s %10s %10s"%("Job", "Nodes", "Elements",
+                                             "Creep", "CPUs", "Wall (s)",
+                                             "Mem (MB)"))
+    for inpfilename in args:
+        deck = deck_scanner(abq_fileio.open_input(inpfilename))
+        cpus, walltime, memory = job_sizer(deck, model)
+        print("%-30s %8d %10d %8s %5d %10s %10s"%(
+            os.path.basename(inpfilename)[:30], deck["nodes"], deck["elements"],
+            "yes" if deck["creep_materials"] else "no", cpus,
+            "-" if walltime is None else "%.0f"%walltime,
+            "-" if memory is None else "%.0f"%memory))
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# A stand-in for the abaqus command, for testing the job tools (scheduler,
+# monitor, dispatcher, run statistics) without a licence. Called the same way as
+# abaqus ("abq_standin.py job=foo cpus=8 interactive"), it reads foo.inp from the
+# current directory and slowly writes out foo.sta, foo.msg and foo.dat files that
+# look like the real ones.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, time
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# How long should a "run" take? (can also be set with the ABQ_STANDIN_SECONDS
+# environment variable)
+run_seconds = float(os.environ.get("ABQ_STANDIN_SECONDS", 2.0))
+
+# Number of increments to fake for each step
+increments_per_step = 10
+
+# Fail (exit code 1) if the .inp file contains this line
+fail_marker = "** STANDIN: FAIL"
+
+
+######## Main Program ##########################################################
+
+def inpfile_scanner(inpfile):
+    """
+    Counts nodes and elements, and finds the time period of each step, in an
+    Abaqus .inp file
+    """
+
+    num_nodes = 0
+    num_elements = 0
+    step_periods = []
+    section = None
+    fail = False
+    for line in inpfile:
+        if line.strip() == fail_marker:
+            fail = True
+        if line.startswith("**"):
+            continue
+        if line.startswith("*"):
+            keyword = line.split(",")[0].strip().upper()
+            section = keyword
+            continue
+        if section == "*NODE":
+            num_nodes += 1
+        elif section == "*ELEMENT":
+            num_elements += 1
+        elif section in ("*VISCO", "*STATIC", "*COUPLED TEMPERATURE-DISPLACEMENT"):
+            values = [value for value in line.split(",") if value.strip()]
+            period = float(values[1]) if len(values) > 1 else 1.0
+            step_periods.append(period)
+            section = None
+
+    return num_nodes, num_elements, step_periods or [1.0], fail
+
+
+def run_faker(jobname, cpus):
+    """
+    Writes out the .sta, .msg and .dat files of a pretend run, one increment at
+    a time
+    """
+
+    num_nodes, num_elements, step_periods, fail = \
+        inpfile_scanner(open("%s.inp"%jobname, 'r'))
+    start = time.time()
+    pause = run_seconds / (increments_per_step * len(step_periods))
+
+    stafile = open("%s.sta"%jobname, 'w')
+    msgfile = open("%s.msg"%jobname, 'w')
+    datfile = open("%s.dat"%jobname, 'w')
+
+    stafile.write(" Abaqus/Standard (stand-in)          DATE %s\n"%
+                  time.strftime("%d-%b-%Y TIME %H:%M:%S"))
+    stafile.write(" SUMMARY OF JOB INFORMATION:\n")
+    stafile.write(" STEP  INC ATT SEVERE EQUIL TOTAL  TOTAL      STEP       INC OF       DOF    IF\n")
+    stafile.write("               DISCON ITERS ITERS  TIME/      TIME/LPF    TIME/LPF    MONITOR RIKS\n")
+    stafile.write("               ITERS               FREQ\n")
+
+    datfile.write("\n                                   P R O B L E M   S I Z E\n\n\n")
+    datfile.write("          NUMBER OF ELEMENTS IS %30d\n"%num_elements)
+    datfile.write("          NUMBER OF NODES IS %33d\n"%num_nodes)
+    datfile.write("          TOTAL NUMBER OF VARIABLES IN THE MODEL %14d\n\n"%(2*num_nodes))
+    datfile.write("                   M E M O R Y   E S T I M A T E\n\n")
+    datfile.write(" PROCESS      FLOATING PT       MINIMUM MEMORY        MEMORY TO\n")
+    datfile.write("              OPERATIONS           REQUIRED          MINIMIZE I/O\n")
+    datfile.write("             PER ITERATION           (MB)               (MB)\n\n")
+    datfile.write("     1          %8.2E %18d %18d\n\n"%(4e4*num_nodes, 50 + num_nodes//100,
+                                                         100 + num_nodes//20))
+
+    total_time = 0.0
+    total_increments = 0
+    for step, period in enumerate(step_periods):
+        increment_time = period / increments_per_step
+        step_time = 0.0
+        for increment in range(1, increments_per_step + 1):
+            time.sleep(pause)
+
+            # Every third increment is cut back once
+            if increment % 3 == 0:
+                stafile.write("%5d %5d %3dU %4d %5d %5d  %-10.3g %-11.3g %-11.4g\n"%(
+                    step + 1, increment, 1, 0, 9, 9, total_time, step_time,
+                    increment_time))
+                msgfile.write(" ***WARNING: THE SOLUTION APPEARS TO BE DIVERGING. "
+                              "CONVERGENCE IS JUDGED UNLIKELY.\n")
+                msgfile.write(" ***NOTE: TIME INCREMENT WILL BE ADJUSTED.\n")
+            step_time += increment_time
+            total_time += increment_time
+            total_increments += 1
+            stafile.write("%5d %5d %3d %5d %5d %5d  %-10.3g %-11.3g %-11.4g\n"%(
+                step + 1, increment, 1 + (increment % 3 == 0), 0, 4, 4,
+                total_time, step_time, increment_time))
+            msgfile.write("\n INCREMENT %5d STARTS. ATTEMPT NUMBER  1, TIME INCREMENT %10.3E\n"%(
+                increment, increment_time))
+            stafile.flush()
+            msgfile.flush()
+
+        if fail:
+            stafile.write("\n THE ANALYSIS HAS NOT BEEN COMPLETED\n")
+            msgfile.write("\n ***ERROR: TOO MANY ATTEMPTS MADE FOR THIS INCREMENT\n")
+            break
+
+    wallclock = time.time() - start
+    cputime = wallclock * cpus * 0.9
+    if not fail:
+        stafile.write("\n THE ANALYSIS HAS COMPLETED SUCCESSFULLY\n")
+    datfile.write("\n          ANALYSIS SUMMARY:\n")
+    datfile.write("          TOTAL OF %15d INCREMENTS\n"%total_increments)
+    datfile.write("                   %15d CUTBACKS IN AUTOMATIC INCREMENTATION\n"%
+                  (total_increments // 3))
+    datfile.write("\n          JOB TIME SUMMARY\n")
+    datfile.write("            USER TIME (SEC)      = %10.3f\n"%(cputime * 0.95))
+    datfile.write("            SYSTEM TIME (SEC)    = %10.3f\n"%(cputime * 0.05))
+    datfile.write("            TOTAL CPU TIME (SEC) = %10.3f\n"%cputime)
+    datfile.write("            WALLCLOCK TIME (SEC) = %10d\n"%max(1, round(wallclock)))
+
+    for openfile in (stafile, msgfile, datfile):
+        openfile.close()
+
+    return 1 if fail else 0
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Arguments look like the abaqus command's: job=foo cpus=8 interactive
+    settings = {}
+    for arg in sys.argv[1:]:
+        if "=" in arg:
+            name, value = arg.split("=", 1)
+            settings[name.lower()] = value
+
+    if "job" not in settings:
+        print("ERROR: Please specify a job with job=NAME")
+        sys.exit(1)
+
+    print("Abaqus stand-in: running job %s..."%settings["job"])
+    sys.exit(run_faker(settings["job"], int(settings.get("cpus", 1))))
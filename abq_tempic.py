@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# A program to turn a report of nodal temperatures (NT) into initial
+# temperatures for every node of a mechanical model, instead of making a
+# Temperature predefined field per set in CAE (see thermal_pdf_maker in
+# abq_modeling_helpers.py) and fixing the magnitudes up by hand. The result is
+# an include file holding one *Initial Conditions, type=TEMPERATURE block, e.g.
+#   abq_tempic.py foo.inp foo.NTrpt                   (same mesh, by node label)
+#   abq_tempic.py -p -c foo.inp foo_thermal.NTrpt     (by position: R, theta, NT)
+#   abq_tempic.py -t foo_thermal.inp foo.inp foo_thermal.NTrpt
+# and then, in foo.inp, before the first step:
+#   *Include, input=foo_temperatures.inp
+# (abq_builddeck.py's "temperature" stage puts the block straight into the
+# deck instead.)
+#
+# Temperatures can come from a report on the mechanical mesh itself, from a
+# report with coordinates in it (COORD1, COORD2, NT - the same kind
+# plot_temperatures.gmt.py reads), where each node takes the temperature of
+# the nearest reported point, or from a report on a separate thermal mesh,
+# interpolated with that mesh's shape functions.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, optparse
+import numpy as np
+import abq_mesh, abq_probe, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# Are the coordinates in the report radius and angle from the axis (in
+# radians), instead of x and y?
+curved_mode = False
+
+# File ending for the include file
+include_suffix = "_temperatures.inp"
+
+# How many nodes' lines to format at once
+lines_per_chunk = 100000
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def temperature_mapper(mesh, labels, values, mapping="label", thermal_mesh=None):
+    """
+    Works out the temperature of every node of a mesh from a report of nodal
+    temperatures (the last column of values): by node label ("label"), from
+    the nearest reported point ("position", using the columns before the
+    temperature as coordinates), or by interpolating on the thermal mesh the
+    report came from ("thermal"). Nodes without a temperature get NaN.
+    """
+
+    temperatures = values[:, -1:]
+    if mapping == "thermal":
+        import abq_transfer
+        new_labels, new_values, statistics = abq_transfer.field_transferrer(
+            thermal_mesh, mesh, "node", labels, temperatures)
+        if verbose_mode and statistics["fallbacks"]:
+            print("%d nodes were outside the thermal mesh and took the nearest "
+                  "temperature (at most %g away)"%(statistics["fallbacks"],
+                                                   statistics["fallback distance"]))
+        return new_values[:, 0]
+
+    if mapping == "position":
+        coords = values[:, :-1]
+        if coords.shape[1] != mesh.coords.shape[1]:
+            raise ValueError("The report has %d coordinate columns, but the "
+                             "mesh is %dD"%(coords.shape[1], mesh.coords.shape[1]))
+        if curved_mode:
+            coords = abq_probe.curved_converter(coords)
+        nearest, distances = abq_probe.nearest_finder(coords, mesh.coords)
+        if verbose_mode:
+            print("Nodes were at most %g from the nearest reported point"%distances.max())
+        return temperatures[nearest, 0]
+
+    known = np.isin(labels, mesh.node_ids)
+    if not known.all():
+        print("WARNING: %d reported nodes aren't in the mesh, and are ignored"%
+              (~known).sum())
+    return abq_probe.nodal_arranger(mesh, labels[known], temperatures[known])[:, 0]
+
+
+def tempic_writer(node_labels, temperatures, instance_name=""):
+    """
+    Hands back the lines of an *Initial Conditions, type=TEMPERATURE block,
+    a big chunk of nodes at a time. Nodes without a temperature are left out.
+    """
+
+    yield "** TEMPERATURES\n*Initial Conditions, type=TEMPERATURE\n"
+
+    known = ~np.isnan(temperatures)
+    node_labels = node_labels[known]
+    temperatures = temperatures[known]
+    prefix = instance_name + "." if instance_name else ""
+    line_format = prefix.replace("%", "%%") + "%d, %.8G\n"
+
+    # Filling in one long format string per chunk is much quicker than
+    # formatting every line on its own
+    for start in range(0, len(node_labels), lines_per_chunk):
+        chunk = np.empty((min(lines_per_chunk, len(node_labels) - start), 2),
+                         dtype=object)
+        chunk[:, 0] = node_labels[start:start + lines_per_chunk].tolist()
+        chunk[:, 1] = temperatures[start:start + lines_per_chunk].tolist()
+        yield (line_format*len(chunk))%tuple(chunk.ravel())
+
+
+def tempic_stage(inpfilelines, block):
+    """
+    Goes through the lines of an Abaqus .inp file, handing them back with an
+    initial temperature block (a list of lines) put in right before the first
+    step, so it can be one stage of abq_builddeck's pipeline
+    """
+    written = False
+    for line in inpfilelines:
+        if line.startswith("** STEP") and not written:
+            for block_line in block:
+                yield block_line
+            written = True
+        yield line
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] foo.inp foo.NTrpt"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-p","--position",action="store_true",
+                      dest="position",default=False,
+                      help="match nodes to the nearest reported point, using "
+                           "the coordinates in the report (COORD1, COORD2, NT)")
+    parser.add_option("-c","--curved",action="store_true",
+                      dest="curved",default=False,
+                      help="with -p, the coordinates are radius and angle "
+                           "from the axis (radians)")
+    parser.add_option("-t","--thermal",dest="thermal",default=None,
+                      help="the .inp file of the thermal model the report "
+                           "came from, to interpolate on")
+    parser.add_option("-n","--instance",dest="instance",default=None,
+                      help="part instance name to put in front of node "
+                           "labels (default: the one in foo.inp)")
+    parser.add_option("-o","--output",dest="output",default=None,
+                      help="name of the include file (default: foo%s)"%include_suffix)
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    if options.curved:
+        curved_mode = True
+    mapping = "thermal" if options.thermal else "position" if options.position else "label"
+
+    if len(args) != 2:
+        print("ERROR: Please specify a .inp file and a report of nodal temperatures")
+        sys.exit()
+    inpfilename, rptfilename = args
+    outfilename = options.output or \
+        os.path.splitext(abq_fileio.plain_name(inpfilename))[0] + include_suffix
+
+    if verbose_mode:
+        print("Reading files %s and %s..."%(inpfilename, rptfilename))
+    mesh = abq_mesh.mesh_loader(inpfilename)
+    thermal_mesh = abq_mesh.mesh_loader(options.thermal) if options.thermal else None
+    labels, values, names = abq_probe.rptfile_parser_nodal(abq_fileio.open_input(rptfilename))
+    try:
+        temperatures = temperature_mapper(mesh, labels, values, mapping, thermal_mesh)
+    except ValueError as error:
+        print("ERROR: %s"%error)
+        sys.exit()
+
+    missing = np.isnan(temperatures).sum()
+    if missing:
+        print("WARNING: %d of %d nodes have no temperature, and are left out"%(
+              missing, len(temperatures)))
+    instance_name = options.instance if options.instance is not None else mesh.instance_name
+
+    if verbose_mode:
+        print("Creating (or overwriting!) file %s..."%outfilename)
+    with abq_fileio.open_output(outfilename) as outfile:
+        outfile.writelines(tempic_writer(mesh.node_ids, temperatures, instance_name))
+    if verbose_mode:
+        print("Add \"*Include, input=%s\" to %s before the first step"%(
+              os.path.basename(outfilename), inpfilename))
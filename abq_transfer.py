@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# A program to carry a report's worth of results from one mesh over to
+# another, so that re-meshing a model doesn't mean starting over: element
+# values (e.g. the stresses of a converged prestress iteration) are moved by
+# element centroid, and nodal values (e.g. temperatures) by node position, e.g.
+#   abq_transfer.py coarse_ps0.inp coarse_ps4.rpt fine_ps0.inp
+#   abq_prestress.py -c fine_ps0.inp fine_ps0.rpt
+# The new report (fine_ps0.rpt here) keeps the old one's header, so it can go
+# wherever the old one could.
+#
+# Values are either interpolated with the source mesh's shape functions
+# ("linear"; element values are first averaged onto the nodes, weighted by
+# volume) or taken from the nearest source centroid or node ("nearest").
+# Points outside the source mesh always take the nearest. How well the values
+# survived is checked by carrying them back to the source mesh and comparing.
+#
+# Contact Dave Blair (dblair@purdue.edu) with questions
+#
+# (c) David Blair. This work is licensed under a Creative Commons
+# Attribution-ShareAlike Unported License
+# (http://creativecommons.org/licenses/by-sa/3.0)
+
+from __future__ import division, print_function
+import sys, os, optparse
+import numpy as np
+import abq_mesh, abq_probe, abq_fileio
+
+__version__ = "2026.10.19"
+
+
+######## Options ###############################################################
+
+# How to work out values on the new mesh: "linear" or "nearest"
+method = "linear"
+
+# Print out extra text while running?
+verbose_mode = True
+
+
+######## Main Program ##########################################################
+
+def rptfile_parser(rptfile):
+    """
+    Reads a field output report of element or nodal values. Returns the lines
+    before the values (to be copied into the new report), whether the values
+    are "element" or "node" values (by the first word of the column headings,
+    which CAE may split over two lines, e.g. "Node" above "Label"), the labels,
+    and the values (one row per label).
+    """
+    header = []
+    kind = "element"
+    labels = []
+    values = []
+    for line in rptfile:
+        words = line.split()
+        if words and words[0].isdigit():
+            labels.append(int(words[0]))
+            values.append([float(word) for word in words[1:]])
+        elif not labels:
+            header.append(line)
+            if words and words[0].upper() in ("NODE", "ELEMENT"):
+                kind = words[0].lower()
+    return header, kind, np.array(labels, dtype=int), np.array(values, dtype=float)
+
+
+def element_centroids(mesh):
+    """
+    The labels, centroids and volumes (ring volumes, in axisymmetric models)
+    of every element of a mesh, in the order Mesh.elements() gives them
+    """
+    if mesh.coords.shape[1] == 3:
+        return abq_mesh.element_volumes(mesh)
+    labels, centroids, areas, volumes = abq_mesh.element_geometry(mesh)
+    return labels, centroids, volumes
+
+
+def nodal_averager(index, element_values, weights):
+    """
+    Averages element values onto the nodes, each element counting in
+    proportion to its weight (volume). Collapsed corners only count once.
+    Nodes without any elements get NaN.
+    """
+    conn = index.conn
+    repeats = np.zeros(conn.shape, dtype=bool)
+    for i in range(1, conn.shape[1]):
+        repeats[:, i] = np.any(conn[:, i:i+1] == conn[:, :i], axis=1)
+    elements, corners = np.nonzero(~repeats)
+    nodes = conn[elements, corners]
+
+    totals = np.zeros((len(index.coords), element_values.shape[1]))
+    sums = np.zeros(len(index.coords))
+    np.add.at(totals, nodes, element_values[elements]*weights[elements, None])
+    np.add.at(sums, nodes, weights[elements])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return totals / sums[:, None]
+
+
+def value_transferrer(index, nodal_values, sites, site_values, points):
+    """
+    Works out values at points from a source mesh: interpolated from the
+    nodal values inside the element each point is in ("linear"), or taken
+    from the nearest site (a centroid or node) with a value ("nearest"). Points
+    outside the source mesh always take the nearest site's value. Returns the
+    values, how many points had to fall back on the nearest site, and how far
+    the furthest of those was from it.
+    """
+    values = np.zeros((len(points), site_values.shape[1])) + np.nan
+    if method == "linear":
+        located, where = abq_probe.element_locator(index, points)
+        values = abq_probe.field_interpolator(index, located, where, nodal_values)
+    fallbacks = np.nonzero(np.isnan(values).any(axis=1))[0]
+    distance = 0.0
+    if len(fallbacks):
+        nearest, distances = abq_probe.nearest_finder(sites, points[fallbacks])
+        values[fallbacks] = site_values[nearest]
+        distance = distances.max()
+    if method == "linear":
+        return values, len(fallbacks), distance
+    return values, 0, 0.0
+
+
+def field_transferrer(source, target, kind, labels, values):
+    """
+    Carries reported values (by element or node label) from one mesh to
+    another. Returns the new labels and values, and a dictionary of things to
+    judge the transfer by.
+    """
+
+    source_index = abq_probe.GridIndex(source)
+    target_index = abq_probe.GridIndex(target)
+
+    # Where the values are, and what they're worth at the nodes
+    if kind == "element":
+        source_labels, source_sites, source_weights = element_centroids(source)
+        target_labels, target_sites, target_weights = element_centroids(target)
+        rows = abq_mesh.id_mapper(source_labels)(labels)
+        site_values = np.zeros((len(source_labels), values.shape[1])) + np.nan
+        site_values[rows] = values
+        nodal_values = nodal_averager(source_index, np.nan_to_num(site_values),
+                                      np.where(np.isnan(site_values).any(axis=1),
+                                               0.0, source_weights))
+    else:
+        source_labels, source_sites = source.node_ids, source_index.coords
+        target_labels, target_sites = target.node_ids, target_index.coords
+        source_weights = np.ones(len(source_labels))
+        target_weights = np.ones(len(target_labels))
+        site_values = abq_probe.nodal_arranger(source, labels, values)
+        nodal_values = site_values
+
+    # Only sites that were reported can be the nearest
+    reported = ~np.isnan(site_values).any(axis=1)
+    new_values, fallbacks, distance = value_transferrer(
+        source_index, nodal_values, source_sites[reported], site_values[reported],
+        target_sites)
+
+    # Carry the new values back again, to see how much was lost on the way
+    if kind == "element":
+        target_nodal = nodal_averager(target_index, new_values, target_weights)
+    else:
+        target_nodal = new_values
+    back_values = value_transferrer(target_index, target_nodal, target_sites,
+                                    new_values, source_sites[reported])[0]
+
+    statistics = {"fallbacks": fallbacks,
+                  "fallback distance": distance,
+                  "source mean": np.average(site_values[reported], axis=0,
+                                            weights=source_weights[reported]),
+                  "target mean": np.average(new_values, axis=0, weights=target_weights),
+                  "round trip rms": np.sqrt(((back_values - site_values[reported])**2).mean(axis=0)),
+                  "round trip max": np.abs(back_values - site_values[reported]).max(axis=0),
+                  "source range": np.ptp(site_values[reported], axis=0)}
+    return target_labels, new_values, statistics
+
+
+def rptfile_writer(rptfile, header, instance_name, labels, values):
+    """
+    Writes transferred values as a report with the original report's header
+    (pointed at the new mesh's part instance, if it has one), sorted by label
+    """
+    for line in header:
+        if line.upper().startswith("FIELD OUTPUT REPORTED AT") and instance_name:
+            line = line.rstrip()[:-len(line.split()[-1])] + instance_name + "\n"
+        rptfile.write(line)
+    order = np.argsort(labels)
+    for label, row in zip(labels[order], values[order]):
+        rptfile.write("%16d"%label + "".join("%20.10E"%value for value in row) + "\n")
+
+
+######## Command-line Implementation############################################
+
+if __name__ == "__main__":
+
+    # Start the parser, and define options
+    usage = "%prog [options] source.inp source.rpt target.inp"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option("-v","--verbose",action="store_true",
+                      dest="verbose",default=False,
+                      help="print extra information while running")
+    parser.add_option("-m","--method",dest="method",default=method,
+                      help="linear (shape function) or nearest [%default]")
+    parser.add_option("-o","--output",dest="output",default=None,
+                      help="name of the new report (default: the target "
+                           ".inp file's name, ending in .rpt)")
+
+    # Run the parser, collecting the options and positional arguments
+    (options,args) = parser.parse_args()
+
+    # Deal with processing options
+    if options.verbose:
+        verbose_mode = True
+    method = options.method.lower()
+    if method not in ("linear", "nearest"):
+        print("ERROR: Method not recognized. Please specify linear/nearest")
+        sys.exit()
+
+    if len(args) != 3:
+        print("ERROR: Please specify the source .inp file, its .rpt file, and "
+              "the target .inp file")
+        sys.exit()
+    source_inpfilename, rptfilename, target_inpfilename = args
+    outfilename = options.output or \
+        os.path.splitext(abq_fileio.plain_name(target_inpfilename))[0] + ".rpt"
+    if outfilename == abq_fileio.plain_name(rptfilename):
+        print("ERROR: The new report would overwrite %s; please give a name with -o"%
+              rptfilename)
+        sys.exit()
+
+    if verbose_mode:
+        print("Reading files %s, %s and %s..."%(source_inpfilename, rptfilename,
+                                                 target_inpfilename))
+    source = abq_mesh.mesh_loader(source_inpfilename)
+    target = abq_mesh.mesh_loader(target_inpfilename)
+    header, kind, labels, values = rptfile_parser(abq_fileio.open_input(rptfilename))
+
+    try:
+        new_labels, new_values, statistics = field_transferrer(source, target, kind,
+                                                               labels, values)
+    except KeyError as error:
+        print("ERROR: %s doesn't match %s: %s"%(rptfilename, source_inpfilename,
+                                                error.args[0]))
+        sys.exit()
+
+    if verbose_mode:
+        print("Moved %d %s values onto %d %ss (%s)"%(len(labels), kind,
+                                                    len(new_labels), kind, method))
+        if statistics["fallbacks"]:
+            print("%d of them were outside the old mesh and took the nearest "
+                  "value (at most %g away)"%(statistics["fallbacks"],
+                                             statistics["fallback distance"]))
+        print("%8s %16s %16s %16s %16s"%("column", "old mean", "new mean",
+                                          "round trip rms", "round trip max"))
+        for i in range(values.shape[1]):
+            scale = statistics["source range"][i] or 1.0
+            print("%8d %16.6E %16.6E %15.3E%% %15.3E%%"%(
+                  i + 1, statistics["source mean"][i], statistics["target mean"][i],
+                  100*statistics["round trip rms"][i]/scale,
+                  100*statistics["round trip max"][i]/scale))
+        print("Creating (or overwriting!) file %s..."%outfilename)
+
+    with abq_fileio.open_output(outfilename) as rptfile:
+        rptfile_writer(rptfile, header, target.instance_name, new_labels, new_values)
@@ -12,6 +12,7 @@
 
 from __future__ import division
 import optparse, sys, subprocess, re
+import abq_fileio
 
 __version__ = "2013.05.16"
 
@@ -141,8 +142,8 @@ if __name__ == "__main__":
         print "ERROR: Please specify one and only one coordinates .rpt file"
         sys.exit()
     else:
-        rptfilename = args[0]
-        rptfile = open(rptfilename, 'r')
+        rptfilename = abq_fileio.plain_name(args[0])
+        rptfile = abq_fileio.open_input(args[0])
 
     # Print out status about the files we're acting on
     if verbose_mode:
@@ -9,6 +9,7 @@
 from __future__ import division
 from math import radians, pi
 import optparse, sys, subprocess, re
+import abq_fileio
 
 __version__ = "2015.02.03"
 
@@ -226,10 +227,10 @@ if __name__ == "__main__":
         print "ERROR: Please specify a MOHO and SURFACE .rpt file, in that order"
         sys.exit()
     else:
-        moho_filename = args[0]
-        surface_filename = args[1]
-        moho_file = open(moho_filename, 'r')
-        surface_file = open(surface_filename, 'r')
+        moho_filename = abq_fileio.plain_name(args[0])
+        surface_filename = abq_fileio.plain_name(args[1])
+        moho_file = abq_fileio.open_input(args[0])
+        surface_file = abq_fileio.open_input(args[1])
 
     # Print out status about the files we're acting on
     if verbose_mode:
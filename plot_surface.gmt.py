@@ -10,6 +10,7 @@
 
 from __future__ import division
 import optparse, sys, subprocess, re
+import abq_fileio
 
 __version__ = "2013.02.03"
 #__version__ = "2015.05.15"
@@ -107,8 +108,8 @@ if __name__ == "__main__":
         print "ERROR: Please specify one and only one coordinates .rpt file"
         sys.exit()
     else:
-        rptfilename = args[0]
-        rptfile = open(rptfilename, 'r')
+        rptfilename = abq_fileio.plain_name(args[0])
+        rptfile = abq_fileio.open_input(args[0])
 
     # Print out status about the files we're acting on
     if verbose_mode:
@@ -9,6 +9,7 @@
 
 from __future__ import division
 import optparse, sys, subprocess
+import abq_fileio
 
 __version__ = "2014.01.03"
 
@@ -203,8 +204,8 @@ if __name__ == "__main__":
         print "ERROR: Please specify one and only one a nodal temperature .rpt file"
         sys.exit()
     else:
-        rptfilename = args[0]
-        rptfile = open(rptfilename, 'r')
+        rptfilename = abq_fileio.plain_name(args[0])
+        rptfile = abq_fileio.open_input(args[0])
 
     # Print out status about the files we're acting on
     if verbose_mode:
@@ -39,6 +39,30 @@ run_bouguer_flat () {
     $codedir/grav_anomaly.py -n 51 --GMT --geoidname "$geoidmodel"_acc.xy --bouguer "$model".grav
 }
 
+# In-repo gravity (abq_ringgrav.py): ring-mass kernels are cached per mesh, so
+# every model and state after the first one on a given mesh is nearly free
+run_geoid_acceleration_ring_curved () {
+    $codedir/abq_ringgrav.py -n 51 --curved --acceleration "$geoidmodel".inp
+}
+run_geoid_acceleration_ring_flat () {
+    $codedir/abq_ringgrav.py -n 51 --acceleration "$geoidmodel".inp
+}
+
+# Whole-sphere geoid model from a zonal Legendre expansion (abq_legendre.py);
+# fills the same "$geoidmodel"_acc.xy slot as the runs above
+run_geoid_acceleration_legendre () {
+    $codedir/abq_legendre.py -n 181 --acceleration "$geoidmodel".inp
+}
+
+run_freeair_ring_curved () {
+    $codedir/abq_ringgrav.py -n 51 --curved --geoidname "$geoidmodel"_acc.xy "$model".inp "$model"_ff.Urpt
+    $codedir/abq_ringgrav.py -n 51 --curved --geoidname "$geoidmodel"_acc.xy "$model".inp "$model".Urpt
+}
+run_freeair_ring_flat () {
+    $codedir/abq_ringgrav.py -n 51 --geoidname "$geoidmodel"_acc.xy "$model".inp "$model"_ff.Urpt
+    $codedir/abq_ringgrav.py -n 51 --geoidname "$geoidmodel"_acc.xy "$model".inp "$model".Urpt
+}
+
 run_topo_curved () {
     $codedir/plot_surface_curved.gmt.py "$model"_ff.SURFACErpt
     $codedir/plot_surface_curved.gmt.py "$model".SURFACErpt
@@ -63,6 +87,9 @@ for model in $models; do
     # Curved models:
     #run_geoid_acceleration_curved
     run_freeair_curved
+    #run_geoid_acceleration_ring_curved
+    #run_geoid_acceleration_legendre
+    #run_freeair_ring_curved
     run_bouguer_curved
     run_topo_curved
     run_crust_curved
@@ -70,6 +97,8 @@ for model in $models; do
     # Flat models:
     #run_geoid_acceleration_flat
     #run_freeair_flat
+    #run_geoid_acceleration_ring_flat
+    #run_freeair_ring_flat
     #run_bouguer_flat
     #run_topo_flat
     #run_crust_flat
@@ -81,3 +110,7 @@ for model in $models; do
     sleep 10
     cp $model*{xy,csv,pdf} /project/taylor/a/dave/Dropbox/
 done
+
+# Compare topography and gravity of every model in this directory at once
+#$codedir/abq_admittance.py --curved .
+#$codedir/abq_admittance.py .